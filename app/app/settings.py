@@ -49,7 +49,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.metrics.MetricsMiddleware",
+    "core.slow_queries.SlowQueryMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "core.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -100,6 +103,21 @@ DATABASES = {
 # }
 
 
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+# Flavour change versions (ETags) and rendered responses live here; see
+# FLAVOUR_HTTP_CACHE.
+
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", ""),
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -147,4 +165,100 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 AUTH_USER_MODEL = "core.User"
 
 # Letting Django know to use "drf_spectacular" configuration for Auto API Docs
-REST_FRAMEWORK = {"DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema"}
+# JSON is rendered and parsed with orjson, see core/renderers.py. Clients
+# can ask for MessagePack instead through Accept and Content-Type.
+REST_FRAMEWORK = {
+    "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.renderers.ORJSONRenderer",
+        "core.renderers.MessagePackRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "core.parsers.ORJSONParser",
+        "core.parsers.MessagePackParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+}
+
+# Cursor pagination for the Flavour list endpoint.
+# 'page_size' query param lets clients ask for up to FLAVOUR_MAX_PAGE_SIZE.
+FLAVOUR_PAGE_SIZE = int(os.environ.get("FLAVOUR_PAGE_SIZE", 50))
+FLAVOUR_MAX_PAGE_SIZE = int(os.environ.get("FLAVOUR_MAX_PAGE_SIZE", 500))
+
+# In-process cache of token -> user used by CachedTokenAuthentication.
+AUTH_TOKEN_CACHE_MAX_SIZE = int(os.environ.get("AUTH_TOKEN_CACHE_MAX_SIZE", 10000))
+AUTH_TOKEN_CACHE_TTL = int(os.environ.get("AUTH_TOKEN_CACHE_TTL", 60))
+
+# Lifetimes (seconds) of the signed stateless tokens from 'user.tokens'.
+SIGNED_TOKEN_ACCESS_LIFETIME = int(
+    os.environ.get("SIGNED_TOKEN_ACCESS_LIFETIME", 5 * 60)
+)
+SIGNED_TOKEN_REFRESH_LIFETIME = int(
+    os.environ.get("SIGNED_TOKEN_REFRESH_LIFETIME", 7 * 24 * 60 * 60)
+)
+
+# ETags and the response cache of the flavour list/detail: "on", "off", or
+# "auto" to use them only when CACHE_BACKEND is shared between processes.
+# A process-local cache would let other workers serve stale data after a
+# write, so "on" with LocMemCache is only safe with a single process.
+FLAVOUR_HTTP_CACHE = os.environ.get("FLAVOUR_HTTP_CACHE", "auto")
+
+# Rendered flavour list/detail responses cached per user and query.
+# Set the TTL (seconds) to 0 to turn the response cache off.
+FLAVOUR_RESPONSE_CACHE_TTL = int(os.environ.get("FLAVOUR_RESPONSE_CACHE_TTL", 300))
+FLAVOUR_RESPONSE_CACHE_MAX_BYTES = int(
+    os.environ.get("FLAVOUR_RESPONSE_CACHE_MAX_BYTES", 1024 * 1024)
+)
+FLAVOUR_RESPONSE_CACHE_LOCK_TIMEOUT = float(
+    os.environ.get("FLAVOUR_RESPONSE_CACHE_LOCK_TIMEOUT", 2)
+)
+
+# Most items accepted by one bulk create/update/delete flavour request.
+FLAVOUR_BULK_MAX_ITEMS = int(os.environ.get("FLAVOUR_BULK_MAX_ITEMS", 500))
+
+# Most ids accepted by one flavour multi-get request.
+FLAVOUR_MULTI_GET_MAX_IDS = int(os.environ.get("FLAVOUR_MULTI_GET_MAX_IDS", 100))
+
+# Rows fetched per database round trip by the streaming flavour export.
+FLAVOUR_EXPORT_CHUNK_SIZE = int(os.environ.get("FLAVOUR_EXPORT_CHUNK_SIZE", 2000))
+
+# Response compression, see core/middleware.py. Bodies under the minimum
+# size (bytes) go out as they are; compressed variants of responses with
+# a strong ETag are cached for COMPRESSION_CACHE_TTL seconds (0 disables).
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", 1024))
+COMPRESSION_GZIP_LEVEL = int(os.environ.get("COMPRESSION_GZIP_LEVEL", 6))
+COMPRESSION_BROTLI_QUALITY = int(os.environ.get("COMPRESSION_BROTLI_QUALITY", 5))
+COMPRESSION_CACHE_TTL = int(os.environ.get("COMPRESSION_CACHE_TTL", 300))
+
+# OpenAPI schema artifacts written by 'manage.py generate_schema' at build
+# time and served from memory by core.schema.SchemaView.
+API_VERSION = os.environ.get("API_VERSION", "1.0.0")
+API_SCHEMA_DIR = os.environ.get("API_SCHEMA_DIR", str(BASE_DIR / "schema"))
+
+# Per-route request metrics served at /metrics, see core/metrics.py. Under
+# a preforking server point METRICS_MULTIPROC_DIR at a directory shared by
+# the workers (emptied on deploy); each one dumps its totals there every
+# METRICS_FLUSH_INTERVAL seconds. Empty keeps metrics per process.
+METRICS_MULTIPROC_DIR = os.environ.get("METRICS_MULTIPROC_DIR", "")
+METRICS_FLUSH_INTERVAL = float(os.environ.get("METRICS_FLUSH_INTERVAL", 5))
+
+# Slow query log, see core/slow_queries.py. Statements of a request that
+# take SLOW_QUERY_THRESHOLD_MS or longer (0 disables) are written to a
+# rotating JSON lines log, with their plan at most once per statement
+# shape every SLOW_QUERY_EXPLAIN_INTERVAL seconds.
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get("SLOW_QUERY_THRESHOLD_MS", 200))
+SLOW_QUERY_LOG = os.environ.get(
+    "SLOW_QUERY_LOG", str(BASE_DIR / "logs" / "slow_queries.log")
+)
+SLOW_QUERY_LOG_MAX_BYTES = int(os.environ.get("SLOW_QUERY_LOG_MAX_BYTES", 10485760))
+SLOW_QUERY_LOG_BACKUPS = int(os.environ.get("SLOW_QUERY_LOG_BACKUPS", 5))
+SLOW_QUERY_EXPLAIN_INTERVAL = float(os.environ.get("SLOW_QUERY_EXPLAIN_INTERVAL", 60))
+SLOW_QUERY_STACK_DEPTH = int(os.environ.get("SLOW_QUERY_STACK_DEPTH", 10))
+
+# Request profiling for staff users, see core/profiling.py. Requests with
+# an X-Profile header, plus PROFILER_SAMPLE_PERCENT of the others, are
+# profiled into PROFILER_DIR; list them with 'manage.py profiles'.
+PROFILER_SAMPLE_PERCENT = float(os.environ.get("PROFILER_SAMPLE_PERCENT", 0))
+PROFILER_DIR = os.environ.get("PROFILER_DIR", str(BASE_DIR / "profiles"))
@@ -0,0 +1,268 @@
+"""
+Django command to load test the API in process through the WSGI handler.
+"""
+
+import itertools
+import json
+import math
+import platform
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from io import BytesIO
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.db import connection, connections
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from core.models import Flavour
+
+from .seed_flavours import DEFAULT_PASSWORD
+
+SCENARIOS = ["list", "detail", "create", "token", "me"]
+PERCENTILES = [50, 95, 99]
+
+
+def percentile(sorted_values, percent):
+    """Return the nearest-rank `percent` percentile of `sorted_values`."""
+    if not sorted_values:
+        return None
+    rank = math.ceil(percent / 100 * len(sorted_values))
+    return sorted_values[max(rank, 1) - 1]
+
+
+class WSGIClient:
+    """Call a WSGI application in process, like a server would."""
+
+    def __init__(self, application, host):
+        self.application = application
+        self.host = host
+
+    def request(self, method, path, data=None, token=None, query=None):
+        """Return the status code of `method` `path`, reading the whole body."""
+        body = json.dumps(data).encode() if data is not None else b""
+        environ = {
+            "REQUEST_METHOD": method,
+            "PATH_INFO": path,
+            "QUERY_STRING": urlencode(query or {}),
+            "SERVER_NAME": self.host,
+            "SERVER_PORT": "80",
+            "SERVER_PROTOCOL": "HTTP/1.1",
+            "HTTP_HOST": self.host,
+            "HTTP_ACCEPT": "application/json",
+            "HTTP_ACCEPT_ENCODING": "gzip, br",
+            "CONTENT_TYPE": "application/json",
+            "CONTENT_LENGTH": str(len(body)),
+            "wsgi.input": BytesIO(body),
+            "wsgi.errors": sys.stderr,
+            "wsgi.url_scheme": "http",
+            "wsgi.version": (1, 0),
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+        }
+        if token:
+            environ["HTTP_AUTHORIZATION"] = f"Token {token}"
+
+        status = []
+
+        def start_response(status_line, headers, exc_info=None):
+            status.append(int(status_line.split()[0]))
+
+        result = self.application(environ, start_response)
+        try:
+            for _ in result:
+                pass
+        finally:
+            if hasattr(result, "close"):
+                result.close()
+        return status[0]
+
+
+class Command(BaseCommand):
+    """Django command to measure API latency and throughput."""
+
+    help = (
+        "Drive the real URLconf through the WSGI handler at a fixed "
+        "concurrency and print p50/p95/p99 latency and req/s per scenario "
+        "as JSON. Uses users that own flavours, e.g. from seed_flavours; the "
+        "create scenario adds flavours to them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scenarios",
+            default=",".join(SCENARIOS),
+            help=f"Comma separated, from: {', '.join(SCENARIOS)}.",
+        )
+        parser.add_argument(
+            "--requests", type=int, default=500, help="Requests per scenario."
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=4, help="Concurrent clients."
+        )
+        parser.add_argument(
+            "--warmup", type=int, default=20, help="Unmeasured requests first."
+        )
+        parser.add_argument(
+            "--users", type=int, default=20, help="Users the requests rotate over."
+        )
+        parser.add_argument(
+            "--password",
+            default=DEFAULT_PASSWORD,
+            help="Password of the users, for the token scenario.",
+        )
+        parser.add_argument("--output", help="Write the JSON here, not stdout.")
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        scenarios = [name for name in options["scenarios"].split(",") if name]
+        unknown = set(scenarios) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}.")
+        if options["concurrency"] < 1 or options["requests"] < 1:
+            raise CommandError("--concurrency and --requests must be at least 1.")
+
+        self.options = options
+        self.accounts = self.get_accounts(options["users"])
+        self.client = WSGIClient(get_wsgi_application(), self.get_host())
+
+        report = {
+            "meta": {
+                "time": datetime.now(timezone.utc).isoformat(),
+                "api_version": settings.API_VERSION,
+                "database": connection.vendor,
+                "python": platform.python_version(),
+                "concurrency": options["concurrency"],
+                "requests": options["requests"],
+                "warmup": options["warmup"],
+                "users": len(self.accounts),
+            },
+            "scenarios": {name: self.run(name) for name in scenarios},
+        }
+
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options["output"]:
+            with open(options["output"], "w") as stream:
+                stream.write(output + "\n")
+        else:
+            self.stdout.write(output)
+
+    def get_host(self):
+        """Return a host name ALLOWED_HOSTS accepts."""
+        for host in settings.ALLOWED_HOSTS:
+            if host != "*" and not host.startswith("."):
+                return host
+        return "localhost"
+
+    def get_accounts(self, count):
+        """Return (email, token key, flavour ids) of up to `count` users."""
+        users = (
+            get_user_model()
+            .objects.filter(is_active=True, flavour__isnull=False)
+            .distinct()
+            .order_by("id")[:count]
+        )
+        accounts = []
+        for user in users:
+            token, _ = Token.objects.get_or_create(user=user)
+            ids = list(
+                Flavour.objects.filter(user=user)
+                .order_by("-id")
+                .values_list("id", flat=True)[:100]
+            )
+            accounts.append((user.email, token.key, ids))
+        if not accounts:
+            raise CommandError("No users with flavours, run seed_flavours first.")
+        return accounts
+
+    def make_requests(self, name):
+        """Yield the (method, path, data, token, query) of scenario `name`."""
+        list_url = reverse("flavour:flavour-list")
+        for number in itertools.count():
+            email, token, ids = self.accounts[number % len(self.accounts)]
+            if name == "list":
+                yield "GET", list_url, None, token, None
+            elif name == "detail":
+                flavour_id = ids[number // len(self.accounts) % len(ids)]
+                url = reverse("flavour:flavour-detail", args=[flavour_id])
+                yield "GET", url, None, token, None
+            elif name == "create":
+                data = {
+                    "title": f"Benchmark {number}",
+                    "time_minutes": 10,
+                    "price": "4.50",
+                    "tags": [{"name": "Benchmark"}],
+                }
+                yield "POST", list_url, data, token, None
+            elif name == "token":
+                data = {"email": email, "password": self.options["password"]}
+                yield "POST", reverse("user:token"), data, None, None
+            else:
+                yield "GET", reverse("user:me"), None, token, None
+
+    def run(self, name):
+        """Return the latency and throughput numbers of scenario `name`."""
+        requests = self.make_requests(name)
+        lock = threading.Lock()
+
+        def next_request():
+            with lock:
+                return next(requests)
+
+        for _ in range(self.options["warmup"]):
+            self.client.request(*next_request())
+
+        latencies, errors = [], []
+        remaining = itertools.count()
+
+        def drive():
+            while next(remaining) < self.options["requests"]:
+                request = next_request()
+                start = time.perf_counter()
+                status = self.client.request(*request)
+                latencies.append(time.perf_counter() - start)
+                if status >= 400:
+                    errors.append(status)
+
+        def worker():
+            try:
+                drive()
+            finally:
+                # Each thread opened its own connections.
+                connections.close_all()
+
+        start = time.perf_counter()
+        if self.options["concurrency"] == 1:
+            # In the calling thread, whose connection stays open.
+            drive()
+        else:
+            with ThreadPoolExecutor(self.options["concurrency"]) as executor:
+                futures = [
+                    executor.submit(worker) for _ in range(self.options["concurrency"])
+                ]
+                for future in futures:
+                    future.result()
+        elapsed = time.perf_counter() - start
+
+        latencies.sort()
+        result = {
+            "requests": len(latencies),
+            "errors": len(errors),
+            "seconds": round(elapsed, 3),
+            "req_per_s": round(len(latencies) / elapsed, 1) if elapsed else None,
+            "latency_ms": {
+                f"p{percent}": round(percentile(latencies, percent) * 1000, 3)
+                for percent in PERCENTILES
+            },
+        }
+        result["latency_ms"]["mean"] = round(sum(latencies) / len(latencies) * 1000, 3)
+        result["latency_ms"]["max"] = round(latencies[-1] * 1000, 3)
+        return result
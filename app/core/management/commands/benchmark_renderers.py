@@ -0,0 +1,100 @@
+"""
+Django command to compare the orjson and MessagePack renderers and
+parsers with DRF's JSON ones.
+"""
+
+import io
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.parsers import MessagePackParser, ORJSONParser
+from core.renderers import MessagePackRenderer, ORJSONRenderer
+
+# (name, renderer, parser) pairs compared against the stock JSON pair.
+CANDIDATES = [
+    ("orjson", ORJSONRenderer, ORJSONParser),
+    ("msgpack", MessagePackRenderer, MessagePackParser),
+]
+
+
+def best_of(func, repeat):
+    """Return the fastest wall time of `repeat` calls to `func`."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def make_payload(count):
+    """Return a flavour list page of `count` items as the API renders it."""
+    return {
+        "next": "http://testserver/api/flavour/flavours/?cursor=cD0xMjM0",
+        "previous": None,
+        "results": [
+            {
+                "id": i,
+                "title": f"Flavour {i}",
+                "price": f"{i % 1000 / 10:.2f}",
+                "time_minutes": i % 120,
+                "link": f"https://example.com/flavours/{i}",
+                "tags": [{"id": i % 7, "name": "Vegan"}, {"id": 8, "name": "Süß"}],
+            }
+            for i in range(1, count + 1)
+        ],
+    }
+
+
+class Command(BaseCommand):
+    """Django command to benchmark JSON rendering and parsing."""
+
+    help = (
+        "Compare the orjson and MessagePack renderers and parsers with the "
+        "stock JSONRenderer/JSONParser on flavour list payloads of "
+        "increasing size, reporting payload size and encode/decode time."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=int,
+            nargs="+",
+            default=[100, 1000, 10000, 100000],
+            help="Flavours per payload.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Runs per size; the fastest one is reported.",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        repeat = options["repeat"]
+        self.stdout.write(
+            f"{'items':>8} {'format':>8} {'bytes':>10} {'encode':>9} {'decode':>9}"
+            f" {'speedup':>15}"
+        )
+        for size in options["sizes"]:
+            data = make_payload(size)
+            if ORJSONRenderer().render(data) != JSONRenderer().render(data):
+                self.stderr.write(f"orjson output differs for {size} items.")
+
+            baseline = None
+            for name, renderer, parser in [
+                ("json", JSONRenderer, JSONParser)
+            ] + CANDIDATES:
+                body = renderer().render(data)
+                encode = best_of(lambda: renderer().render(data), repeat)
+                decode = best_of(lambda: parser().parse(io.BytesIO(body)), repeat)
+                baseline = baseline or (encode, decode)
+                self.stdout.write(
+                    f"{size:>8} {name:>8} {len(body):>10}"
+                    f" {encode * 1000:>7.1f}ms {decode * 1000:>7.1f}ms"
+                    f" {baseline[0] / encode:>6.1f}x/{baseline[1] / decode:.1f}x"
+                )
@@ -0,0 +1,68 @@
+"""
+Django command to compare the precomputed schema endpoint with live generation.
+"""
+
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from drf_spectacular.views import SpectacularAPIView
+
+from core.schema import SchemaView, load_schema
+
+SCHEMA_URL = "/api/schema"
+
+
+class Command(BaseCommand):
+    """Django command to measure schema endpoint latency."""
+
+    help = (
+        "Measure startup (first request) and steady-state latency of the "
+        "schema endpoint, live generation against the generated artifact."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=50,
+            help="Requests per view for the steady-state numbers.",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        load_schema.cache_clear()
+        start = time.perf_counter()
+        artifacts = load_schema(settings.API_VERSION)
+        load = time.perf_counter() - start
+        if artifacts is None:
+            raise CommandError("No schema artifact, run generate_schema first.")
+
+        views = [
+            ("live", SpectacularAPIView.as_view()),
+            ("precomputed", SchemaView.as_view()),
+        ]
+        self.stdout.write(f"Artifact load: {load * 1000:.1f}ms")
+        self.stdout.write(f"{'view':>12} {'first':>10} {'median':>10} {'p95':>10}")
+        for name, view in views:
+            if name == "precomputed":
+                load_schema.cache_clear()
+            timings = [self.time_request(view) for _ in range(options["requests"] + 1)]
+            first, steady = timings[0], sorted(timings[1:])
+            p95 = steady[int(len(steady) * 0.95) - 1] if steady else first
+            self.stdout.write(
+                f"{name:>12} {first * 1000:>8.1f}ms"
+                f" {statistics.median(steady or [first]) * 1000:>8.2f}ms"
+                f" {p95 * 1000:>8.2f}ms"
+            )
+
+    def time_request(self, view):
+        """Return the wall time of one gzip accepting GET to `view`."""
+        request = RequestFactory().get(SCHEMA_URL, HTTP_ACCEPT_ENCODING="gzip")
+        start = time.perf_counter()
+        response = view(request)
+        if hasattr(response, "render"):
+            response.render()
+        return time.perf_counter() - start
@@ -0,0 +1,39 @@
+"""
+Django command to generate the OpenAPI schema artifacts served by the API.
+"""
+
+import os
+
+from django.core.management.base import BaseCommand
+
+from core.schema import generate_schema, get_schema_path, load_schema
+
+
+class Command(BaseCommand):
+    """Django command to write the schema of one API version to disk."""
+
+    help = (
+        "Generate the OpenAPI schema as YAML and JSON into API_SCHEMA_DIR. "
+        "Run at build time; the schema endpoint serves these files."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--api-version",
+            help="Version written into the schema and its file names, "
+            "defaults to API_VERSION.",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        version = options["api_version"]
+        for schema_format, content in generate_schema(version).items():
+            path = get_schema_path(schema_format, version)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(f"{path}.tmp", "wb") as stream:
+                stream.write(content)
+            os.replace(f"{path}.tmp", path)
+            self.stdout.write(f"Wrote {path} ({len(content):,} bytes).")
+
+        load_schema.cache_clear()
+        self.stdout.write(self.style.SUCCESS("Schema generated."))
@@ -0,0 +1,294 @@
+"""
+Django command to bulk import flavours and their tags from CSV or JSONL.
+"""
+
+import csv
+import io
+import json
+import os
+import time
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+
+from core.models import Flavour, Tag
+from flavour.caching import bump_version
+
+FIELDS = ["title", "time_minutes", "price", "description", "link"]
+
+
+def read_csv(stream):
+    """Yield row dicts from CSV; tag names are joined with '|'."""
+    for row in csv.DictReader(stream):
+        tags = row.get("tags") or ""
+        row["tags"] = [name for name in tags.split("|") if name]
+        yield row
+
+
+def read_jsonl(stream):
+    """Yield row dicts from JSON lines; tags are names or {"name": ...}.
+
+    A line that isn't a JSON object with valid tags is yielded as a
+    ValidationError, to be reported like any other invalid row.
+    """
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as error:
+            yield ValidationError(f"Invalid JSON: {error}")
+            continue
+        if not isinstance(row, dict):
+            yield ValidationError("Expected a JSON object.")
+            continue
+
+        tags = row.get("tags") or []
+        if not isinstance(tags, list):
+            yield ValidationError("Tags must be a list.")
+            continue
+        try:
+            row["tags"] = [
+                tag["name"] if isinstance(tag, dict) else tag for tag in tags
+            ]
+        except KeyError:
+            yield ValidationError("Tag objects need a name.")
+            continue
+        yield row
+
+
+READERS = {"csv": read_csv, "jsonl": read_jsonl, "ndjson": read_jsonl}
+
+
+def allocate_ids(model, count):
+    """Reserve `count` ids of `model` so related rows can be built up front."""
+    table = model._meta.db_table
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT nextval(pg_get_serial_sequence(%s, 'id'))"
+                " FROM generate_series(1, %s)",
+                [table, count],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    # Other backends have no shareable sequence; SQLite serializes
+    # writers, so reading the current maximum is enough there.
+    last_id = model.objects.aggregate(last=Max("id"))["last"] or 0
+    return list(range(last_id + 1, last_id + 1 + count))
+
+
+def copy_rows(table, columns, rows):
+    """Load `rows` into `table` with PostgreSQL COPY."""
+    buffer = io.StringIO()
+    csv.writer(buffer, quoting=csv.QUOTE_ALL).writerows(rows)
+    buffer.seek(0)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+
+
+class Command(BaseCommand):
+    """Django command to import flavours for one user."""
+
+    help = (
+        "Import flavours from a CSV or JSONL file. Uses PostgreSQL COPY when "
+        "available and chunked bulk_create otherwise. Progress is checkpointed "
+        "after every chunk so a failed import can be resumed with --resume."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or JSONL file to import.")
+        parser.add_argument(
+            "--user", required=True, help="Email of the user owning the flavours."
+        )
+        parser.add_argument(
+            "--format",
+            choices=sorted(READERS),
+            help="File format; guessed from the extension by default.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=5000)
+        parser.add_argument(
+            "--checkpoint",
+            help="Checkpoint file, defaults to '<path>.checkpoint'.",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Skip the rows committed by a previous run.",
+        )
+        parser.add_argument(
+            "--skip-invalid",
+            action="store_true",
+            help="Report and skip invalid rows instead of stopping.",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        path = options["path"]
+        file_format = options["format"] or os.path.splitext(path)[1].lstrip(".")
+        if file_format not in READERS:
+            raise CommandError(f"Unknown file format '{file_format}'.")
+
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be at least 1.")
+
+        try:
+            self.user = get_user_model().objects.get(email=options["user"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"User '{options['user']}' does not exist.")
+
+        self.skip_invalid = options["skip_invalid"]
+        self.fields = {name: Flavour._meta.get_field(name) for name in FIELDS}
+        self.tag_field = Tag._meta.get_field("name")
+        self.use_copy = connection.vendor == "postgresql"
+        checkpoint = options["checkpoint"] or f"{path}.checkpoint"
+        done = self.read_checkpoint(checkpoint) if options["resume"] else 0
+
+        imported = skipped = 0
+        start = time.perf_counter()
+        with open(path, newline="", encoding="utf-8") as stream:
+            rows = enumerate(READERS[file_format](stream), start=1)
+            # Rows committed before the failure are skipped, not re-imported.
+            rows = islice(rows, done, None)
+
+            while True:
+                chunk = list(islice(rows, options["chunk_size"]))
+                if not chunk:
+                    break
+
+                flavours = self.validate(chunk)
+                skipped += len(chunk) - len(flavours)
+                with transaction.atomic():
+                    ids = self.insert(flavours)
+                    # Recorded before the commit: if the run dies before the
+                    # checkpoint below, --resume tells from the first id
+                    # whether this chunk was committed.
+                    self.write_checkpoint(
+                        checkpoint, done, (chunk[-1][0], ids[0] if ids else None)
+                    )
+                done = chunk[-1][0]
+                self.write_checkpoint(checkpoint, done)
+
+                imported += len(flavours)
+                rate = imported / (time.perf_counter() - start)
+                self.stdout.write(
+                    f"Imported {imported} rows ({rate:,.0f} rows/s), "
+                    f"{done} rows of the file done."
+                )
+
+        bump_version(self.user.pk)
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {imported} flavours in {elapsed:.1f}s "
+                f"({imported / elapsed if elapsed else 0:,.0f} rows/s), "
+                f"skipped {skipped} invalid rows."
+            )
+        )
+
+    def validate(self, chunk):
+        """Return (values, tag names) for each valid row of `chunk`."""
+        flavours = []
+        for number, row in chunk:
+            try:
+                if isinstance(row, ValidationError):
+                    # A line the reader couldn't parse.
+                    raise row
+                values = {
+                    name: field.clean(row.get(name, field.get_default()), None)
+                    for name, field in self.fields.items()
+                }
+                tags = [self.clean_tag(name) for name in row["tags"]]
+            except ValidationError as error:
+                msg = f"Row {number} is invalid: {'; '.join(error.messages)}"
+                if not self.skip_invalid:
+                    raise CommandError(msg)
+                self.stderr.write(msg)
+                continue
+            flavours.append((values, tags))
+        return flavours
+
+    def clean_tag(self, name):
+        """Return the tag `name` if it is a valid Tag.name."""
+        if not isinstance(name, str):
+            raise ValidationError(f"Tag {json.dumps(name)} is not a name.")
+        return self.tag_field.clean(name, None)
+
+    def insert(self, flavours):
+        """Insert `flavours` and link their tags. Must run in a transaction.
+
+        Returns the ids of the new flavours.
+        """
+        ids = allocate_ids(Flavour, len(flavours))
+        tags = Tag.objects.resolve(
+            self.user, {name for _, names in flavours for name in names}
+        )
+        links = {
+            (flavour_id, tags[name].pk)
+            for flavour_id, (_, names) in zip(ids, flavours)
+            for name in names
+        }
+
+        if self.use_copy:
+            copy_rows(
+                "core_flavour",
+                ["id", "user_id"] + FIELDS,
+                (
+                    [flavour_id, self.user.pk] + [values[name] for name in FIELDS]
+                    for flavour_id, (values, _) in zip(ids, flavours)
+                ),
+            )
+            copy_rows(
+                Flavour.tags.through._meta.db_table, ["flavour_id", "tag_id"], links
+            )
+            return ids
+
+        Flavour.objects.bulk_create(
+            [
+                Flavour(id=flavour_id, user=self.user, **values)
+                for flavour_id, (values, _) in zip(ids, flavours)
+            ]
+        )
+        FlavourTags = Flavour.tags.through
+        FlavourTags.objects.bulk_create(
+            [FlavourTags(flavour_id=f_id, tag_id=t_id) for f_id, t_id in links]
+        )
+        return ids
+
+    def read_checkpoint(self, checkpoint):
+        """Return the number of rows committed by a previous run.
+
+        A pending chunk counts as committed when its first flavour exists.
+        """
+        if not os.path.exists(checkpoint):
+            return 0
+        with open(checkpoint) as stream:
+            state = json.load(stream)
+        pending = state.get("pending")
+        if pending:
+            rows, first_id = pending
+            if (
+                first_id is None
+                or Flavour.objects.filter(id=first_id, user=self.user).exists()
+            ):
+                return rows
+        return state["rows"]
+
+    def write_checkpoint(self, checkpoint, rows, pending=None):
+        """Atomically record that the first `rows` rows are committed.
+
+        `pending` is (rows, first flavour id) of a chunk being committed.
+        """
+        with open(f"{checkpoint}.tmp", "w") as stream:
+            json.dump({"rows": rows, "pending": pending}, stream)
+        os.replace(f"{checkpoint}.tmp", checkpoint)
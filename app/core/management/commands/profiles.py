@@ -0,0 +1,113 @@
+"""
+Django command to list and aggregate request profiles.
+"""
+
+import io
+import os
+import pstats
+import statistics
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.profiling import parse_profile_name
+
+
+class Command(BaseCommand):
+    """Django command to inspect the profiles in PROFILER_DIR."""
+
+    help = (
+        "List the request profiles, newest first, with per-route timings, "
+        "or merge the matching profiles into one report with --aggregate."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--route", help="Only profiles of this route.")
+        parser.add_argument(
+            "--limit", type=int, default=20, help="Profiles or functions listed."
+        )
+        parser.add_argument(
+            "--aggregate",
+            action="store_true",
+            help="Print the combined profile of the matching files.",
+        )
+        parser.add_argument(
+            "--sort",
+            default="cumulative",
+            help="pstats sort key of the aggregated cProfile report.",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        profiles = self.find_profiles(options["route"])
+        if not profiles:
+            self.stdout.write("No profiles found.")
+            return
+        if options["aggregate"]:
+            self.aggregate(profiles, options)
+        else:
+            self.list(profiles, options["limit"])
+
+    def find_profiles(self, route):
+        """Return (path, info) of the profiles, newest first."""
+        try:
+            names = os.listdir(settings.PROFILER_DIR)
+        except FileNotFoundError:
+            return []
+        profiles = []
+        for name in names:
+            info = parse_profile_name(name)
+            if info is None or (route and info["route"] != route):
+                continue
+            profiles.append((os.path.join(settings.PROFILER_DIR, name), info))
+        return sorted(profiles, key=lambda item: item[1]["time"], reverse=True)
+
+    def list(self, profiles, limit):
+        """Print per-route timings and the newest profiles."""
+        routes = {}
+        for _, info in profiles:
+            routes.setdefault((info["route"], info["method"]), []).append(
+                info["duration_ms"]
+            )
+        self.stdout.write(
+            f"{'route':<32} {'method':<7} {'count':>6} {'median':>10} {'max':>10}"
+        )
+        for (route, method), durations in sorted(routes.items()):
+            self.stdout.write(
+                f"{route:<32} {method:<7} {len(durations):>6}"
+                f" {statistics.median(durations):>8.0f}ms {max(durations):>8.0f}ms"
+            )
+
+        self.stdout.write("")
+        for path, info in profiles[:limit]:
+            self.stdout.write(
+                f"{info['time']}  {info['duration_ms']:>7.0f}ms  "
+                f"{os.path.basename(path)}"
+            )
+
+    def aggregate(self, profiles, options):
+        """Print the merged profile of `profiles`."""
+        paths = [path for path, info in profiles if info["backend"] == "cprofile"]
+        sessions = [path for path, info in profiles if info["backend"] != "cprofile"]
+        if paths:
+            self.stdout.write(f"{len(paths)} cProfile profiles")
+            # pstats print()s piecewise; OutputWrapper would end every piece
+            # with a newline, so collect the report and write it once.
+            report = io.StringIO()
+            stats = pstats.Stats(*paths, stream=report)
+            stats.sort_stats(options["sort"]).print_stats(options["limit"])
+            self.stdout.write(report.getvalue(), ending="")
+        if sessions:
+            try:
+                from pyinstrument.renderers import ConsoleRenderer
+                from pyinstrument.session import Session
+            except ImportError:
+                raise CommandError("pyinstrument is needed to read .pyisession files.")
+
+            session = Session.load(sessions[0])
+            for path in sessions[1:]:
+                session = Session.combine(session, Session.load(path))
+            self.stdout.write(f"{len(sessions)} pyinstrument profiles")
+            self.stdout.write(
+                ConsoleRenderer(unicode=False, color=False).render(session)
+            )
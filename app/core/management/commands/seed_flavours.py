@@ -0,0 +1,187 @@
+"""
+Django command to generate synthetic users, flavours and tags for benchmarks.
+"""
+
+import random
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from core.models import Flavour, Tag
+
+from .import_flavours import FIELDS, allocate_ids, copy_rows
+
+DEFAULT_PASSWORD = "benchmark-pass-123"
+
+# Words titles, descriptions and tags are made of.
+ADJECTIVES = (
+    "Spiced Smoked Roasted Honeyed Salted Frozen Toasted Charred Whipped Candied"
+    " Zesty Creamy Tangy Golden"
+).split()
+INGREDIENTS = (
+    "Mango Cardamom Saffron Pistachio Tamarind Coconut Ginger Rose Chilli Lime"
+    " Cocoa Vanilla Fig Date Almond Cinnamon Jaggery Mint Hazelnut Cherry"
+).split()
+DISHES = (
+    "Lassi Kulfi Sorbet Gelato Halwa Tart Shake Pudding Cheesecake Brownie"
+    " Falooda Custard"
+).split()
+TAG_NAMES = (
+    "Vegan,Vegetarian,Gluten Free,Dairy Free,Nut Free,Spicy,Sweet,Sour,Frozen,"
+    "Baked,Quick,Festive,Summer,Winter,Kids,Low Sugar,High Protein,"
+    "Street Food,Classic,Fusion,Drink,Dessert,Snack,Breakfast"
+).split(",")
+
+
+def insert_rows(table, columns, rows):
+    """Insert `rows` into `table` with one executemany, skipping the ORM."""
+    placeholders = ", ".join(["%s"] * len(columns))
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+            rows,
+        )
+
+
+class Command(BaseCommand):
+    """Django command to seed a database with benchmark data."""
+
+    help = (
+        "Generate users with flavours and tags in bulk. Flavours and tag links "
+        "are loaded with PostgreSQL COPY when available and executemany "
+        "otherwise. "
+        f"Every user gets the password '{DEFAULT_PASSWORD}' unless --password "
+        "is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument(
+            "--flavours", type=int, default=100, help="Flavours per user."
+        )
+        parser.add_argument("--tags", type=int, default=8, help="Tags per user.")
+        parser.add_argument(
+            "--tags-per-flavour",
+            type=int,
+            default=2,
+            help="Tags linked to each flavour, up to --tags.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=20000,
+            help="Flavours inserted per transaction.",
+        )
+        parser.add_argument("--password", default=DEFAULT_PASSWORD)
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Random seed, for repeatable data."
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        if options["tags"] > len(TAG_NAMES):
+            raise CommandError(f"At most {len(TAG_NAMES)} tags per user.")
+        if options["users"] < 1:
+            raise CommandError("--users must be at least 1.")
+
+        self.random = random.Random(options["seed"])
+        self.options = options
+        self.use_copy = connection.vendor == "postgresql"
+        # Hashing is slow by design, so every user shares one hash.
+        self.password = make_password(options["password"])
+
+        users_per_chunk = max(1, options["chunk_size"] // max(1, options["flavours"]))
+        created = {"users": 0, "flavours": 0, "tags": 0}
+        start = time.perf_counter()
+        while created["users"] < options["users"]:
+            count = min(users_per_chunk, options["users"] - created["users"])
+            with transaction.atomic():
+                users, flavours, tags = self.insert_users(count)
+            created["users"] += users
+            created["flavours"] += flavours
+            created["tags"] += tags
+
+            rate = created["flavours"] / (time.perf_counter() - start)
+            self.stdout.write(
+                f"Seeded {created['users']} users, {created['flavours']} flavours "
+                f"({rate:,.0f} flavours/s)."
+            )
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {created['users']} users, {created['flavours']} flavours "
+                f"and {created['tags']} tags in {elapsed:.1f}s."
+            )
+        )
+
+    def insert_users(self, count):
+        """Insert `count` users with their tags and flavours.
+
+        Must run in a transaction. Returns the numbers of users, flavours
+        and tags created.
+        """
+        User = get_user_model()
+        user_ids = allocate_ids(User, count)
+        User.objects.bulk_create(
+            User(
+                id=user_id,
+                email=f"seed-{user_id}@example.com",
+                name=f"Seed User {user_id}",
+                password=self.password,
+            )
+            for user_id in user_ids
+        )
+
+        tag_ids = allocate_ids(Tag, count * self.options["tags"])
+        tags, next_tag_id = {}, iter(tag_ids)
+        for user_id in user_ids:
+            tags[user_id] = [
+                (next(next_tag_id), name)
+                for name in self.random.sample(TAG_NAMES, self.options["tags"])
+            ]
+        Tag.objects.bulk_create(
+            Tag(id=tag_id, user_id=user_id, name=name)
+            for user_id, user_tags in tags.items()
+            for tag_id, name in user_tags
+        )
+
+        flavour_ids = iter(allocate_ids(Flavour, count * self.options["flavours"]))
+        flavours, links = [], []
+        per_flavour = min(self.options["tags_per_flavour"], self.options["tags"])
+        for user_id in user_ids:
+            for _ in range(self.options["flavours"]):
+                flavour_id = next(flavour_ids)
+                flavours.append([flavour_id, user_id] + self.make_flavour(flavour_id))
+                for tag_id, _ in self.random.sample(tags[user_id], per_flavour):
+                    links.append((flavour_id, tag_id))
+
+        FlavourTags = Flavour.tags.through
+        if self.use_copy:
+            copy_rows("core_flavour", ["id", "user_id"] + FIELDS, flavours)
+            copy_rows(FlavourTags._meta.db_table, ["flavour_id", "tag_id"], links)
+        else:
+            insert_rows("core_flavour", ["id", "user_id"] + FIELDS, flavours)
+            insert_rows(FlavourTags._meta.db_table, ["flavour_id", "tag_id"], links)
+        return count, len(flavours), len(tag_ids)
+
+    def make_flavour(self, flavour_id):
+        """Return the FIELDS values of a plausible flavour."""
+        pick = self.random.choice
+        ingredient = pick(INGREDIENTS)
+        title = f"{pick(ADJECTIVES)} {ingredient} {pick(DISHES)}"
+        description = (
+            f"{title} with {pick(INGREDIENTS).lower()} and a hint of "
+            f"{ingredient.lower()}. Serves {self.random.randint(1, 8)}."
+        )
+        return [
+            title,
+            self.random.randint(5, 240),
+            Decimal(self.random.randint(100, 9999)) / 100,
+            description,
+            f"https://example.com/flavours/{flavour_id}",
+        ]
@@ -0,0 +1,85 @@
+"""
+Django command to summarize the slow query log by statement fingerprint.
+"""
+
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from core.slow_queries import read_log
+
+SORT_KEYS = {
+    "total": lambda group: group["total_ms"],
+    "count": lambda group: group["count"],
+    "max": lambda group: group["max_ms"],
+}
+
+
+class Command(BaseCommand):
+    """Django command to list the top slow statements."""
+
+    help = (
+        "Group the slow query log by fingerprint and list the statements "
+        "that cost the most, with their views and latest plan."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--top", type=int, default=10, help="Number of statements listed."
+        )
+        parser.add_argument(
+            "--sort",
+            choices=list(SORT_KEYS),
+            default="total",
+            help="Rank by total time, occurrences or slowest run.",
+        )
+        parser.add_argument("--log", help="Log file, SLOW_QUERY_LOG by default.")
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        groups = {}
+        for entry in read_log(options["log"]):
+            group = groups.setdefault(
+                entry["fingerprint"],
+                {
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "views": Counter(),
+                    "normalized": entry["normalized"],
+                    "explain": None,
+                    "stack": [],
+                },
+            )
+            group["count"] += 1
+            group["total_ms"] += entry["duration_ms"]
+            group["max_ms"] = max(group["max_ms"], entry["duration_ms"])
+            group["views"][entry["view"] or entry["path"] or "-"] += 1
+            group["explain"] = entry["explain"] or group["explain"]
+            group["stack"] = entry["stack"] or group["stack"]
+
+        if not groups:
+            self.stdout.write("No slow queries logged.")
+            return
+
+        ranked = sorted(
+            groups.items(), key=lambda item: SORT_KEYS[options["sort"]](item[1])
+        )
+        self.stdout.write(
+            f"{'fingerprint':<16} {'count':>7} {'total':>11} {'mean':>10}"
+            f" {'max':>10}  views"
+        )
+        for key, group in reversed(ranked[-options["top"] :]):
+            views = ", ".join(
+                f"{view} ({count})" for view, count in group["views"].most_common(3)
+            )
+            self.stdout.write(
+                f"{key:<16} {group['count']:>7} {group['total_ms']:>9.1f}ms"
+                f" {group['total_ms'] / group['count']:>8.1f}ms"
+                f" {group['max_ms']:>8.1f}ms  {views}"
+            )
+            self.stdout.write(f"    {group['normalized'][:300]}")
+            if group["stack"]:
+                self.stdout.write(f"    at {group['stack'][-1]}")
+            for line in group["explain"] or []:
+                self.stdout.write(f"      {line}")
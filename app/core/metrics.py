@@ -0,0 +1,346 @@
+"""
+# app/core/metrics.py
+Per-route request metrics exposed in the Prometheus text format.
+
+Every thread records into its own dict, so the request path takes no
+lock; a scrape sums the dicts of all threads. The dict of a thread that
+exits is folded into a process total, so servers starting a thread per
+connection don't accumulate them. Under a preforking server
+each worker also dumps its totals to METRICS_MULTIPROC_DIR every
+METRICS_FLUSH_INTERVAL seconds and a scrape of any worker adds up the
+files of all the others.
+"""
+
+import atexit
+import glob
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from bisect import bisect_left
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import HttpResponse
+
+from user.authentication import token_cache
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds (seconds) of the request latency histogram buckets.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Positions of the values kept per (route, method, status); the latency
+# bucket counts follow them.
+COUNT, LATENCY, QUERIES, SQL_TIME, RAW_BYTES, COMPRESSED_BYTES, COMPRESS_TIME = range(7)
+BUCKETS = 7
+
+COUNTERS = [
+    (
+        QUERIES,
+        "api_db_queries_total",
+        "SQL queries run while handling requests.",
+    ),
+    (
+        SQL_TIME,
+        "api_db_query_duration_seconds_total",
+        "Time spent in SQL queries while handling requests.",
+    ),
+    (
+        RAW_BYTES,
+        "api_response_uncompressed_bytes_total",
+        "Size of compressed responses before compression.",
+    ),
+    (
+        COMPRESSED_BYTES,
+        "api_response_compressed_bytes_total",
+        "Size of compressed responses after compression.",
+    ),
+    (
+        COMPRESS_TIME,
+        "api_response_compression_cpu_seconds_total",
+        "CPU time spent compressing responses.",
+    ),
+]
+
+_local = threading.local()
+# Metrics dicts of live threads by a per-thread key, and the sum of the
+# dicts of exited threads.
+_registries = {}
+_retired = {}
+_registries_lock = threading.Lock()
+_registry_keys = itertools.count()
+_last_flush = [float("-inf")]
+_flush_lock = threading.Lock()
+
+
+class _ThreadAnchor:
+    """Lives in a thread's locals and is collected when the thread exits."""
+
+
+def get_registry():
+    """Return the metrics dict of the current thread."""
+    try:
+        return _local.registry
+    except AttributeError:
+        registry = _local.registry = {}
+        key = next(_registry_keys)
+        _local.anchor = _ThreadAnchor()
+        weakref.finalize(_local.anchor, retire, key)
+        # Only taken once per thread, never on the request path after that.
+        with _registries_lock:
+            _registries[key] = registry
+        return registry
+
+
+def retire(key):
+    """Fold the dict of an exited thread into the process total."""
+    with _registries_lock:
+        registry = _registries.pop(key, None)
+        if registry:
+            merge(_retired, registry)
+
+
+def reset():
+    """Forget every recorded value of this process."""
+    with _registries_lock:
+        for registry in _registries.values():
+            registry.clear()
+        _retired.clear()
+    _last_flush[0] = float("-inf")
+
+
+# A forked worker must not report what its parent recorded.
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reset)
+
+
+def record(route, method, status, latency, queries, sql_time, compression=None):
+    """Add one request to the current thread's metrics."""
+    registry = get_registry()
+    key = (route, method, status)
+    values = registry.get(key)
+    if values is None:
+        values = registry[key] = [0] * (BUCKETS + len(LATENCY_BUCKETS) + 1)
+
+    values[COUNT] += 1
+    values[LATENCY] += latency
+    values[QUERIES] += queries
+    values[SQL_TIME] += sql_time
+    if compression is not None:
+        values[RAW_BYTES] += compression["original_size"]
+        values[COMPRESSED_BYTES] += compression["compressed_size"]
+        values[COMPRESS_TIME] += compression["cpu_time"]
+    values[BUCKETS + bisect_left(LATENCY_BUCKETS, latency)] += 1
+
+    if settings.METRICS_MULTIPROC_DIR:
+        now = time.monotonic()
+        if now - _last_flush[0] < settings.METRICS_FLUSH_INTERVAL:
+            return
+        # One thread flushes; the others don't wait for it.
+        if not _flush_lock.acquire(blocking=False):
+            return
+        try:
+            _last_flush[0] = now
+            write_snapshot()
+        except OSError:
+            # The request was handled; a failed dump mustn't turn it into a 500.
+            logger.exception("Could not dump the metrics of this worker.")
+        finally:
+            _flush_lock.release()
+
+
+@atexit.register
+def flush_at_exit():
+    """Dump what was recorded since the last flush when a worker exits."""
+    if settings.configured and settings.METRICS_MULTIPROC_DIR:
+        if _retired or any(_registries.values()):
+            flush()
+
+
+def merge(into, registry):
+    """Add the values of `registry` to the `into` dict."""
+    for key, values in registry.items():
+        total = into.get(key)
+        if total is None:
+            into[key] = list(values)
+        else:
+            for i, value in enumerate(values):
+                total[i] += value
+    return into
+
+
+def collect_process():
+    """Return the metrics of all threads of this process."""
+    with _registries_lock:
+        registries = list(_registries.values())
+        totals = merge({}, _retired)
+    for registry in registries:
+        merge(totals, registry.copy())
+    return totals
+
+
+def get_snapshot_path(pid):
+    """Return the file worker `pid` dumps its metrics to."""
+    return os.path.join(settings.METRICS_MULTIPROC_DIR, f"metrics-{pid}.json")
+
+
+def flush():
+    """Dump the metrics of this process for the other workers."""
+    with _flush_lock:
+        write_snapshot()
+
+
+def write_snapshot():
+    """Write the snapshot file of this process. Hold _flush_lock."""
+    path = get_snapshot_path(os.getpid())
+    rows = [list(key) + values for key, values in collect_process().items()]
+    os.makedirs(settings.METRICS_MULTIPROC_DIR, exist_ok=True)
+    with open(f"{path}.tmp", "w") as stream:
+        json.dump(rows, stream)
+    os.replace(f"{path}.tmp", path)
+
+
+def collect():
+    """Return the metrics of this process and, if set up, all other workers.
+
+    Files of exited workers are kept, so counters never go backwards.
+    """
+    totals = collect_process()
+    if not settings.METRICS_MULTIPROC_DIR:
+        return totals
+
+    own = get_snapshot_path(os.getpid())
+    for path in glob.glob(get_snapshot_path("*")):
+        if path == own:
+            continue
+        try:
+            with open(path) as stream:
+                rows = json.load(stream)
+        except (OSError, ValueError):
+            continue
+        merge(totals, {tuple(row[:3]): row[3:] for row in rows})
+    return totals
+
+
+def format_labels(route, method, status, **extra):
+    """Return a Prometheus label set."""
+    labels = {"route": route, "method": method, "status": status, **extra}
+    pairs = []
+    for name, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"')
+        pairs.append('%s="%s"' % (name, value.replace("\n", "\\n")))
+    return "{%s}" % ",".join(pairs)
+
+
+def export():
+    """Return all metrics in the Prometheus text exposition format."""
+    totals = sorted(collect().items())
+    lines = [
+        "# HELP api_request_duration_seconds Request latency by route.",
+        "# TYPE api_request_duration_seconds histogram",
+    ]
+    for key, values in totals:
+        cumulative = 0
+        bounds = [repr(bound) for bound in LATENCY_BUCKETS] + ["+Inf"]
+        for bound, count in zip(bounds, values[BUCKETS:]):
+            cumulative += count
+            labels = format_labels(*key, le=bound)
+            lines.append(f"api_request_duration_seconds_bucket{labels} {cumulative}")
+        labels = format_labels(*key)
+        lines.append(f"api_request_duration_seconds_sum{labels} {values[LATENCY]!r}")
+        lines.append(f"api_request_duration_seconds_count{labels} {values[COUNT]}")
+
+    for index, name, description in COUNTERS:
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} counter")
+        for key, values in totals:
+            lines.append(f"{name}{format_labels(*key)} {values[index]!r}")
+
+    lines += export_token_cache()
+    return "\n".join(lines) + "\n"
+
+
+def export_token_cache():
+    """Return the lines of the token cache counters of this process.
+
+    The cache lives in each worker, so the samples are labelled with the
+    pid rather than summed across workers.
+    """
+    stats = token_cache.stats()
+    labels = '{pid="%d"}' % os.getpid()
+    return [
+        "# HELP api_token_cache_hits_total Token lookups served from the cache.",
+        "# TYPE api_token_cache_hits_total counter",
+        f"api_token_cache_hits_total{labels} {stats['hits']}",
+        "# HELP api_token_cache_misses_total Token lookups that went to the DB.",
+        "# TYPE api_token_cache_misses_total counter",
+        f"api_token_cache_misses_total{labels} {stats['misses']}",
+        "# HELP api_token_cache_entries Tokens held in the cache.",
+        "# TYPE api_token_cache_entries gauge",
+        f"api_token_cache_entries{labels} {stats['size']}",
+    ]
+
+
+class QueryCounter:
+    """Database execute wrapper counting queries and their time."""
+
+    __slots__ = ["count", "duration"]
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+class MetricsMiddleware:
+    """Record latency, SQL query count and SQL time per resolved route.
+
+    Routes are URL names such as 'flavour:flavour-list'; requests that
+    don't resolve are recorded as 'unresolved'. Place it first so the
+    latency covers the whole middleware stack.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = QueryCounter()
+        # Same as connection.execute_wrapper(), minus the context manager.
+        wrappers = connections[DEFAULT_DB_ALIAS].execute_wrappers
+        wrappers.append(queries)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            latency = time.perf_counter() - start
+            wrappers.remove(queries)
+
+        match = request.resolver_match
+        record(
+            match.view_name if match else "unresolved",
+            request.method,
+            response.status_code,
+            latency,
+            queries.count,
+            queries.duration,
+            getattr(request, "compression", None),
+        )
+        return response
+
+
+def metrics_view(request):
+    """Expose the metrics to Prometheus."""
+    return HttpResponse(export(), content_type=CONTENT_TYPE)
@@ -0,0 +1,193 @@
+"""
+# app/core/middleware.py
+Middleware shared by the whole project.
+"""
+
+import gzip
+import hashlib
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from django.utils.text import compress_sequence
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSED_KEY = "compressed:{encoding}:{etag}"
+
+# Content types that are compressed already and don't shrink any further.
+INCOMPRESSIBLE_TYPES = (
+    "image/",
+    "video/",
+    "audio/",
+    "font/woff",
+    "application/gzip",
+    "application/x-gzip",
+    "application/zip",
+    "application/x-brotli",
+)
+
+
+def parse_accept_encoding(header):
+    """Return a dict of content coding -> quality from an Accept-Encoding."""
+    codings = {}
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        if not coding:
+            continue
+        quality = 1.0
+        name, _, value = params.strip().partition("=")
+        if name.strip() == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        codings[coding.strip().lower()] = quality
+    return codings
+
+
+def parse_if_none_match(header):
+    """Return the ETags of an If-None-Match for the weak comparison.
+
+    The W/ prefix is dropped so weak ETags match their strong form.
+    """
+    return [tag[2:] if tag.startswith("W/") else tag for tag in parse_etags(header)]
+
+
+def get_encodings():
+    """Return the encodings the server can produce, most preferred first."""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def negotiate_encoding(header, encodings):
+    """Return the best of `encodings` acceptable per `header`, or None."""
+    codings = parse_accept_encoding(header)
+    best, best_quality = None, 0.0
+    for encoding in encodings:
+        quality = codings.get(encoding, codings.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(encoding, content):
+    """Return `content` compressed with `encoding`."""
+    if encoding == "br":
+        return brotli.compress(content, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    # A fixed mtime makes the output depend on the content only.
+    return gzip.compress(
+        content, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0
+    )
+
+
+class CompressionMiddleware:
+    """Compress responses with brotli (when installed) or gzip.
+
+    Bodies smaller than COMPRESSION_MIN_SIZE, already encoded bodies and
+    incompressible content types are left alone. Responses with a strong
+    ETag identify their bytes, so their compressed variant is cached under
+    the ETag and encoding and a hot cached response is compressed once,
+    not on every hit. The ETag is weakened like GZipMiddleware does, as
+    the encoded bytes differ from the identity ones.
+
+    Each compressed response records its encoding, sizes, ratio and CPU
+    time in `request.compression` and logs them at DEBUG level.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        return self.process_response(request, response)
+
+    def process_response(self, request, response):
+        if response.has_header("Content-Encoding"):
+            return response
+        content_type = response.get("Content-Type", "")
+        if content_type.startswith(INCOMPRESSIBLE_TYPES):
+            return response
+        if not response.streaming:
+            if len(response.content) < settings.COMPRESSION_MIN_SIZE:
+                return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        header = request.META.get("HTTP_ACCEPT_ENCODING", "")
+
+        if response.streaming:
+            # Streamed bodies are compressed on the fly, so only gzip.
+            if negotiate_encoding(header, ["gzip"]) is None:
+                return response
+            response.streaming_content = compress_sequence(response.streaming_content)
+            del response["Content-Length"]
+            self.set_encoding(response, "gzip")
+            return response
+
+        encoding = negotiate_encoding(header, get_encodings())
+        if encoding is None:
+            return response
+
+        start = time.thread_time()
+        content, cached = self.get_compressed(response, encoding)
+        cpu_time = time.thread_time() - start
+
+        original_size = len(response.content)
+        if len(content) >= original_size:
+            return response
+
+        request.compression = {
+            "encoding": encoding,
+            "original_size": original_size,
+            "compressed_size": len(content),
+            "ratio": original_size / len(content),
+            "cpu_time": cpu_time,
+            "cached": cached,
+        }
+        logger.debug(
+            "Compressed %s with %s: %d -> %d bytes (%.1fx) in %.2fms%s",
+            request.path,
+            encoding,
+            original_size,
+            len(content),
+            original_size / len(content),
+            cpu_time * 1000,
+            " (cached)" if cached else "",
+        )
+
+        response.content = content
+        response["Content-Length"] = str(len(content))
+        self.set_encoding(response, encoding)
+        return response
+
+    def get_compressed(self, response, encoding):
+        """Return (compressed content, whether it came from the cache)."""
+        etag = response.get("ETag", "")
+        ttl = settings.COMPRESSION_CACHE_TTL
+        if not ttl or not etag or etag.startswith("W/"):
+            return compress(encoding, response.content), False
+
+        key = COMPRESSED_KEY.format(
+            encoding=encoding, etag=hashlib.md5(etag.encode()).hexdigest()
+        )
+        content = cache.get(key)
+        if content is not None:
+            return content, True
+
+        content = compress(encoding, response.content)
+        cache.set(key, content, ttl)
+        return content, False
+
+    def set_encoding(self, response, encoding):
+        """Mark `response` as encoded and weaken its ETag."""
+        etag = response.get("ETag", "")
+        if etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        response["Content-Encoding"] = encoding
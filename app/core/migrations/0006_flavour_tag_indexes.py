@@ -0,0 +1,23 @@
+# Generated by Django 3.2.25 on 2026-10-18 09:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0005_flavour_tags"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="flavour",
+            index=models.Index(
+                fields=["user", "-id"], name="core_flavour_user_id_desc"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tag",
+            index=models.Index(fields=["user", "name"], name="core_tag_user_name"),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 3.2.25 on 2026-10-18 09:23
+
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def merge_duplicate_tags(apps, schema_editor):
+    """Fold tags sharing (user, name) into the oldest one before the constraint."""
+    Tag = apps.get_model("core", "Tag")
+    FlavourTags = apps.get_model("core", "Flavour").tags.through
+
+    duplicates = (
+        Tag.objects.values("user_id", "name")
+        .annotate(keep_id=Min("id"), count=Count("id"))
+        .filter(count__gt=1)
+    )
+    for duplicate in duplicates:
+        keep_id = duplicate["keep_id"]
+        others = Tag.objects.filter(
+            user_id=duplicate["user_id"], name=duplicate["name"]
+        ).exclude(id=keep_id)
+
+        links = FlavourTags.objects.filter(tag__in=others)
+        tagged = set(
+            FlavourTags.objects.filter(tag_id=keep_id).values_list(
+                "flavour_id", flat=True
+            )
+        )
+        FlavourTags.objects.bulk_create(
+            FlavourTags(flavour_id=flavour_id, tag_id=keep_id)
+            for flavour_id in set(links.values_list("flavour_id", flat=True)) - tagged
+        )
+        links.delete()
+        others.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0007_user_token_generation"),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_tags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.2.25 on 2026-10-18 09:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0008_merge_duplicate_tags"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="tag",
+            name="core_tag_user_name",
+        ),
+        migrations.AddConstraint(
+            model_name="tag",
+            constraint=models.UniqueConstraint(
+                fields=("user", "name"), name="core_tag_unique_user_name"
+            ),
+        ),
+    ]
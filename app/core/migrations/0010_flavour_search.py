@@ -0,0 +1,95 @@
+# Generated by Django 3.2.25 on 2026-10-18 09:36
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+POSTGRESQL_FORWARDS = [
+    "CREATE INDEX core_flavour_search_gin ON core_flavour USING gin (search_vector)",
+    """
+    CREATE TRIGGER core_flavour_search_update
+    BEFORE INSERT OR UPDATE OF title, description ON core_flavour
+    FOR EACH ROW EXECUTE FUNCTION tsvector_update_trigger(
+        search_vector, 'pg_catalog.english', title, description
+    )
+    """,
+    """
+    UPDATE core_flavour SET search_vector = to_tsvector(
+        'pg_catalog.english', coalesce(title, '') || ' ' || coalesce(description, '')
+    )
+    """,
+]
+
+POSTGRESQL_BACKWARDS = [
+    "DROP TRIGGER IF EXISTS core_flavour_search_update ON core_flavour",
+    "DROP INDEX IF EXISTS core_flavour_search_gin",
+]
+
+# SQLite (used in tests and local development) gets an external-content
+# FTS5 table over the same columns, kept in sync by triggers.
+SQLITE_FORWARDS = [
+    """
+    CREATE VIRTUAL TABLE core_flavour_fts USING fts5(
+        title, description, content='core_flavour', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER core_flavour_fts_insert AFTER INSERT ON core_flavour BEGIN
+        INSERT INTO core_flavour_fts (rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER core_flavour_fts_delete AFTER DELETE ON core_flavour BEGIN
+        INSERT INTO core_flavour_fts (core_flavour_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER core_flavour_fts_update AFTER UPDATE ON core_flavour BEGIN
+        INSERT INTO core_flavour_fts (core_flavour_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO core_flavour_fts (rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    "INSERT INTO core_flavour_fts (core_flavour_fts) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARDS = [
+    "DROP TRIGGER IF EXISTS core_flavour_fts_insert",
+    "DROP TRIGGER IF EXISTS core_flavour_fts_delete",
+    "DROP TRIGGER IF EXISTS core_flavour_fts_update",
+    "DROP TABLE IF EXISTS core_flavour_fts",
+]
+
+
+def run_for_vendor(postgresql, sqlite):
+    """Return a RunPython function executing the statements for the backend."""
+
+    def run(apps, schema_editor):
+        statements = {"postgresql": postgresql, "sqlite": sqlite}
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0009_tag_unique_user_name"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="flavour",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(
+            run_for_vendor(POSTGRESQL_FORWARDS, SQLITE_FORWARDS),
+            run_for_vendor(POSTGRESQL_BACKWARDS, SQLITE_BACKWARDS),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.2.25 on 2026-10-18 09:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0010_flavour_search"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="flavour",
+            index=models.Index(
+                fields=["user", "price"], name="core_flavour_user_price"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="flavour",
+            index=models.Index(
+                fields=["user", "time_minutes"], name="core_flavour_user_time"
+            ),
+        ),
+        # Tag filters select flavour_id by tag_id. The FK index on tag_id
+        # alone needs a heap fetch per link; (tag_id, flavour_id) lets the
+        # semi-join read flavour ids with an index-only scan.
+        migrations.RunSQL(
+            "CREATE INDEX core_flavour_tags_tag_flavour "
+            "ON core_flavour_tags (tag_id, flavour_id)",
+            "DROP INDEX core_flavour_tags_tag_flavour",
+        ),
+    ]
@@ -9,6 +9,7 @@ from django.contrib.auth.models import (
     BaseUserManager,
     PermissionsMixin,
 )
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
 
@@ -44,6 +45,8 @@ class User(AbstractBaseUser, PermissionsMixin):
     name = models.CharField(max_length=255)
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
+    # Bumped to revoke every signed access/refresh token issued so far.
+    token_generation = models.PositiveIntegerField(default=0)
 
     # Create the user
     objects = UserManager()
@@ -65,18 +68,68 @@ class Flavour(models.Model):
     description = models.TextField(blank=True)
     link = models.CharField(max_length=255, blank=True)
     tags = models.ManyToManyField("Tag")
+    # Maintained by a database trigger on PostgreSQL, see migration 0010.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Serves the list endpoint: WHERE user_id = ? ORDER BY id DESC
+            models.Index(fields=["user", "-id"], name="core_flavour_user_id_desc"),
+            # Serve the price and time_minutes range filters.
+            models.Index(fields=["user", "price"], name="core_flavour_user_price"),
+            models.Index(
+                fields=["user", "time_minutes"], name="core_flavour_user_time"
+            ),
+        ]
 
     def __str__(self):
         """Returns strings representation of the class."""
         return self.title
 
 
+class TagManager(models.Manager):
+    """Manager for Tag model."""
+
+    def resolve(self, user, names):
+        """Return a dict of name -> Tag for `names`, creating missing tags.
+
+        Takes one query when every tag exists and three otherwise, however
+        many names are given. Safe against concurrent requests creating the
+        same tag: conflicting inserts are skipped and the winner is read back.
+        """
+        names = set(names)
+        if not names:
+            return {}
+
+        tags = {tag.name: tag for tag in self.filter(user=user, name__in=names)}
+        missing = names - tags.keys()
+        if missing:
+            self.bulk_create(
+                [self.model(user=user, name=name) for name in missing],
+                ignore_conflicts=True,
+            )
+            tags.update(
+                (tag.name, tag) for tag in self.filter(user=user, name__in=missing)
+            )
+
+        return tags
+
+
 class Tag(models.Model):
     """Create Tag DB Schema."""
 
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     name = models.CharField(max_length=255)
 
+    objects = TagManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "name"], name="core_tag_unique_user_name"
+            ),
+        ]
+
     def __str__(self):
         """Returns string representation of Tag."""
         return self.name
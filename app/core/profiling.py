@@ -0,0 +1,144 @@
+"""
+# app/core/profiling.py
+Opt-in profiling of single API requests for staff users.
+"""
+
+import cProfile
+import os
+import random
+import time
+from datetime import datetime
+
+from django.conf import settings
+
+try:
+    from pyinstrument import Profiler as SamplingProfiler
+except ImportError:  # pragma: no cover - pyinstrument is optional
+    SamplingProfiler = None
+
+PROFILE_HEADER = "HTTP_X_PROFILE"
+
+# Profile file names: <route>__<method>__<duration>ms__<time>-<pid>.<ext>
+SEPARATOR = "__"
+EXTENSIONS = {"cprofile": "prof", "pyinstrument": "pyisession"}
+
+
+def should_profile(request):
+    """Return whether `request` asked or was sampled to be profiled."""
+    if not request.META.get(PROFILE_HEADER):
+        percent = settings.PROFILER_SAMPLE_PERCENT
+        if not percent or random.random() * 100 >= percent:
+            return False
+    return request.user.is_staff
+
+
+def parse_profile_name(name):
+    """Return the route, method, duration (ms) and time of a profile file.
+
+    Returns None for files not written by RequestProfiler.
+    """
+    stem, _, extension = name.rpartition(".")
+    parts = stem.split(SEPARATOR)
+    if len(parts) != 4 or extension not in EXTENSIONS.values():
+        return None
+    route, method, duration, timestamp = parts
+    return {
+        "route": route.replace(".", ":"),
+        "method": method,
+        "duration_ms": float(duration[:-2]),
+        "time": timestamp.rpartition("-")[0],
+        "backend": "pyinstrument" if extension == "pyisession" else "cprofile",
+    }
+
+
+class RequestProfiler:
+    """Profile the current thread with pyinstrument if installed, else cProfile."""
+
+    def __init__(self):
+        self.backend = "pyinstrument" if SamplingProfiler is not None else "cprofile"
+        self.profiler = None
+        self.started = None
+        self.duration = None
+
+    def start(self):
+        """Start profiling, returning False if another profiler is active."""
+        if self.backend == "pyinstrument":
+            self.profiler = SamplingProfiler()
+            self.profiler.start()
+        else:
+            self.profiler = cProfile.Profile()
+            try:
+                self.profiler.enable()
+            except ValueError:
+                return False
+        self.started = time.perf_counter()
+        return True
+
+    def stop(self):
+        """Stop profiling."""
+        self.duration = time.perf_counter() - self.started
+        if self.backend == "pyinstrument":
+            self.profiler.stop()
+        else:
+            self.profiler.disable()
+
+    def save(self, route, method):
+        """Write the profile to PROFILER_DIR and return its file name."""
+        name = SEPARATOR.join(
+            [
+                route.replace(":", "."),
+                method,
+                f"{self.duration * 1000:.0f}ms",
+                f"{datetime.now():%Y%m%dT%H%M%S%f}-{os.getpid()}",
+            ]
+        )
+        name = f"{name}.{EXTENSIONS[self.backend]}"
+        os.makedirs(settings.PROFILER_DIR, exist_ok=True)
+        path = os.path.join(settings.PROFILER_DIR, name)
+        if self.backend == "pyinstrument":
+            self.profiler.last_session.save(path)
+        else:
+            self.profiler.dump_stats(path)
+        return name
+
+
+class ProfileMixin:
+    """Profile requests of staff users that ask for it or are sampled.
+
+    A staff request with an 'X-Profile' header, or one in
+    PROFILER_SAMPLE_PERCENT of them, is profiled from after authentication
+    to the rendered response. The profile is written to PROFILER_DIR and
+    its file name returned in the 'X-Profile' response header. Other
+    requests only pay for a header lookup.
+    """
+
+    profiler = None
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            response = super().dispatch(request, *args, **kwargs)
+        except BaseException:
+            if self.profiler is not None:
+                self.profiler.stop()
+                self.profiler = None
+            raise
+        if self.profiler is None:
+            return response
+
+        profiler, self.profiler = self.profiler, None
+        # Rendering is part of the cost, so it happens under the profiler.
+        if not getattr(response, "is_rendered", True):
+            response.render()
+        profiler.stop()
+        match = request.resolver_match
+        response["X-Profile"] = profiler.save(
+            match.view_name if match else "unresolved", request.method
+        )
+        return response
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if should_profile(request):
+            profiler = RequestProfiler()
+            if profiler.start():
+                self.profiler = profiler
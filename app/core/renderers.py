@@ -0,0 +1,86 @@
+"""
+# app/core/renderers.py
+Renderers shared by the REST API.
+"""
+
+from decimal import Decimal
+
+import msgpack
+import orjson
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# Escaped like JSONRenderer does, so the output stays a JavaScript subset.
+LINE_SEPARATOR = "\u2028".encode()
+PARAGRAPH_SEPARATOR = "\u2029".encode()
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer producing the same bytes with orjson.
+
+    orjson writes compact UTF-8 like the default JSONRenderer settings.
+    Datetimes, Decimals and everything else orjson has no exact match for
+    are handed to DRF's JSONEncoder, so e.g. UTC datetimes keep the 'Z'
+    suffix and Decimals become numbers. Indented output (the browsable API and
+    '; indent=' media types), non-default JSON settings and values orjson
+    can't encode go through the stock renderer.
+    """
+
+    options = (
+        orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+        | orjson.OPT_NON_STR_KEYS
+    )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Render `data` into JSON, returning a bytestring."""
+        if data is None:
+            return b""
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data, default=self.encoder_class().default, option=self.options
+            )
+        except orjson.JSONEncodeError:
+            # Integers over 64 bits, for example; let json report or handle it.
+            return super().render(data, accepted_media_type, renderer_context)
+
+        return ret.replace(LINE_SEPARATOR, b"\\u2028").replace(
+            PARAGRAPH_SEPARATOR, b"\\u2029"
+        )
+
+
+def msgpack_default(obj):
+    """Encode types MessagePack has no native form for.
+
+    Decimals become strings so no precision is lost, matching the
+    COERCE_DECIMAL_TO_STRING output of DecimalFields. Everything else,
+    including datetimes as ISO 8601 strings, is encoded the way the JSON
+    renderers encode it.
+    """
+    if isinstance(obj, Decimal):
+        return str(obj)
+    return JSONEncoder().default(obj)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Renderer which serializes to MessagePack.
+
+    Maps, arrays, strings, integers, floats, booleans and None use their
+    native MessagePack types; strings are always UTF-8 'str', never 'bin'.
+    """
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Render `data` into MessagePack, returning a bytestring."""
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=msgpack_default, use_bin_type=True)
@@ -0,0 +1,122 @@
+"""
+# app/core/schema.py
+OpenAPI schema generated at build time and served from memory.
+"""
+
+import hashlib
+import os
+from functools import lru_cache
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.views import View
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.views import SpectacularAPIView
+
+from .middleware import (
+    compress,
+    get_encodings,
+    negotiate_encoding,
+    parse_if_none_match,
+)
+
+RENDERERS = {"yaml": OpenApiYamlRenderer, "json": OpenApiJsonRenderer}
+
+
+def get_schema_path(schema_format, version=None):
+    """Return the artifact path of the schema of `version` in `schema_format`."""
+    version = version or settings.API_VERSION
+    return os.path.join(settings.API_SCHEMA_DIR, f"openapi-{version}.{schema_format}")
+
+
+def generate_schema(version=None):
+    """Return {format: rendered bytes} of the schema of the whole API."""
+    version = version or settings.API_VERSION
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS(api_version=version)
+    schema = generator.get_schema(request=None, public=True)
+    schema["info"]["version"] = version
+    return {
+        schema_format: renderer().render(schema, renderer_context={})
+        for schema_format, renderer in RENDERERS.items()
+    }
+
+
+class SchemaArtifact:
+    """A rendered schema with its ETag and precompressed variants."""
+
+    def __init__(self, content, content_type):
+        self.content = content
+        self.content_type = content_type
+        self.etag = '"%s"' % hashlib.sha256(content).hexdigest()[:32]
+        self.encoded = {
+            encoding: compress(encoding, content) for encoding in get_encodings()
+        }
+
+
+@lru_cache(maxsize=None)
+def load_schema(version):
+    """Return {format: SchemaArtifact} for `version`, or None if not generated."""
+    artifacts = {}
+    for schema_format, renderer in RENDERERS.items():
+        try:
+            with open(get_schema_path(schema_format, version), "rb") as stream:
+                content = stream.read()
+        except FileNotFoundError:
+            return None
+        artifacts[schema_format] = SchemaArtifact(content, renderer.media_type)
+    return artifacts
+
+
+class SchemaView(View):
+    """Serve the schema artifacts of `generate_schema` from memory.
+
+    YAML is served by default and JSON for `?format=json` or a JSON
+    Accept header, like SpectacularAPIView. Responses carry a strong ETag
+    and are sent precompressed when the client accepts it. Without an
+    artifact the schema is generated per request in DEBUG only, and 503
+    is returned otherwise.
+    """
+
+    http_method_names = ["get", "head"]
+    live_view = staticmethod(SpectacularAPIView.as_view())
+
+    def get(self, request, *args, **kwargs):
+        artifacts = load_schema(settings.API_VERSION)
+        if artifacts is None:
+            if settings.DEBUG:
+                return self.live_view(request, *args, **kwargs)
+            return HttpResponse(
+                "The API schema has not been generated.",
+                status=503,
+                content_type="text/plain",
+            )
+
+        artifact = artifacts[self.get_format(request)]
+        if_none_match = parse_if_none_match(request.META.get("HTTP_IF_NONE_MATCH", ""))
+        if artifact.etag in if_none_match:
+            response = HttpResponse(status=304)
+            response["ETag"] = artifact.etag
+            return response
+
+        encoding = negotiate_encoding(
+            request.META.get("HTTP_ACCEPT_ENCODING", ""), list(artifact.encoded)
+        )
+        if encoding is None:
+            response = HttpResponse(artifact.content)
+            response["ETag"] = artifact.etag
+        else:
+            response = HttpResponse(artifact.encoded[encoding])
+            response["Content-Encoding"] = encoding
+            response["ETag"] = "W/" + artifact.etag
+        response["Content-Type"] = artifact.content_type
+        patch_vary_headers(response, ("Accept", "Accept-Encoding"))
+        return response
+
+    def get_format(self, request):
+        """Return 'json' or 'yaml' from the format param or Accept header."""
+        requested = request.GET.get("format", "")
+        if requested:
+            return "json" if "json" in requested else "yaml"
+        return "json" if "json" in request.META.get("HTTP_ACCEPT", "") else "yaml"
@@ -0,0 +1,233 @@
+"""
+# app/core/slow_queries.py
+Log of SQL statements slower than SLOW_QUERY_THRESHOLD_MS.
+
+Each slow statement is written as one JSON line to the rotating
+SLOW_QUERY_LOG with its fingerprint, the view that ran it, a stack
+trimmed to project code and, at most once per fingerprint every
+SLOW_QUERY_EXPLAIN_INTERVAL seconds, its query plan.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+import traceback
+from datetime import datetime, timezone
+from functools import lru_cache
+from logging.handlers import RotatingFileHandler
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+# Literals and parameter placeholders replaced by '?' in fingerprints, and
+# lists of them collapsed so IN clauses of any length match.
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%s|\?")
+VALUE_LISTS = re.compile(r"\(\?(?:\s*,\s*\?)*\)")
+WHITESPACE = re.compile(r"\s+")
+
+EXPLAINABLE = ("select", "with")
+
+_explained = {}
+
+
+def fingerprint(sql):
+    """Return (normalized SQL, short hash) identifying the statement shape."""
+    normalized = LITERALS.sub("?", sql)
+    normalized = VALUE_LISTS.sub("(...)", normalized)
+    normalized = WHITESPACE.sub(" ", normalized).strip()
+    return normalized, hashlib.sha1(normalized.encode()).hexdigest()[:16]
+
+
+def get_stack():
+    """Return the calling frames in project code, innermost last."""
+    base_dir = str(settings.BASE_DIR)
+    frames = [
+        f"{os.path.relpath(frame.filename, base_dir)}:{frame.lineno} in {frame.name}"
+        for frame in traceback.extract_stack()
+        if frame.filename.startswith(base_dir)
+        and "site-packages" not in frame.filename
+        and frame.filename != __file__
+    ]
+    return frames[-settings.SLOW_QUERY_STACK_DEPTH :]
+
+
+def should_explain(key):
+    """Return whether the statement `key` is due a new EXPLAIN."""
+    now = time.monotonic()
+    if now - _explained.get(key, float("-inf")) < settings.SLOW_QUERY_EXPLAIN_INTERVAL:
+        return False
+    if len(_explained) >= 1000:
+        _explained.clear()
+    _explained[key] = now
+    return True
+
+
+def explain(connection, sql, params):
+    """Return the plan of `sql` as text lines, without running it.
+
+    PostgreSQL gets EXPLAIN (ANALYZE off) and SQLite EXPLAIN QUERY PLAN.
+    The backend cursor is used directly, so the statement skips the
+    execute wrappers, and a savepoint keeps a failure from aborting the
+    transaction of the request.
+    """
+    if connection.vendor == "postgresql":
+        statement = f"EXPLAIN (ANALYZE off) {sql}"
+    elif connection.vendor == "sqlite":
+        statement = f"EXPLAIN QUERY PLAN {sql}"
+    else:
+        return None
+
+    savepoint = connection.vendor == "postgresql" and connection.in_atomic_block
+    cursor = connection.create_cursor()
+    try:
+        # Even the savepoint fails when the transaction is already aborted.
+        if savepoint:
+            cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            cursor.execute(statement, params)
+            rows = cursor.fetchall()
+        except DatabaseError as error:
+            if savepoint:
+                cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            return [f"EXPLAIN failed: {error}"]
+        if savepoint:
+            cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+    except DatabaseError as error:
+        return [f"EXPLAIN failed: {error}"]
+    finally:
+        cursor.close()
+    return [" ".join(str(column) for column in row) for row in rows]
+
+
+@lru_cache(maxsize=None)
+def get_handler(path):
+    """Return the rotating file handler writing the log at `path`."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    handler = RotatingFileHandler(
+        path,
+        maxBytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+        backupCount=settings.SLOW_QUERY_LOG_BACKUPS,
+        delay=True,
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    return handler
+
+
+def write(entry):
+    """Append `entry` as a JSON line to SLOW_QUERY_LOG."""
+    record = logging.makeLogRecord(
+        {"msg": json.dumps(entry), "levelno": logging.WARNING}
+    )
+    get_handler(settings.SLOW_QUERY_LOG).handle(record)
+
+
+def read_log(path=None):
+    """Yield the entries of the log and its rotated files, oldest first."""
+    path = path or settings.SLOW_QUERY_LOG
+    paths = [f"{path}.{i}" for i in range(settings.SLOW_QUERY_LOG_BACKUPS, 0, -1)]
+    for name in paths + [path]:
+        try:
+            with open(name) as stream:
+                lines = list(stream)
+        except FileNotFoundError:
+            continue
+        for line in lines:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+class SlowQueryLogger:
+    """Database execute wrapper logging the statements of a slow request."""
+
+    __slots__ = ["request"]
+
+    def __init__(self, request=None):
+        self.request = request
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            result = execute(sql, params, many, context)
+        except Exception as error:
+            # Statements cancelled by statement_timeout are slow queries too.
+            self.log_if_slow(sql, params, many, context, start, error)
+            raise
+        self.log_if_slow(sql, params, many, context, start)
+        return result
+
+    def log_if_slow(self, sql, params, many, context, start, error=None):
+        """Log the statement `sql` if it ran past the threshold."""
+        duration = (time.perf_counter() - start) * 1000
+        if duration < settings.SLOW_QUERY_THRESHOLD_MS:
+            return
+        try:
+            self.log(sql, params, many, context, duration, error)
+        except Exception:
+            # A missing log directory or a full disk must not fail the query.
+            logger.exception("Could not log a slow query (%.1fms).", duration)
+
+    def log(self, sql, params, many, context, duration, error=None):
+        """Write the entry of the statement `sql` that took `duration` ms.
+
+        A statement that raised `error` isn't explained: on PostgreSQL its
+        transaction may already be aborted.
+        """
+        connection = context["connection"]
+        normalized, key = fingerprint(sql)
+        plan = None
+        if (
+            error is None
+            and not many
+            and sql.lstrip().lower().startswith(EXPLAINABLE)
+            and should_explain(key)
+        ):
+            plan = explain(connection, sql, params)
+
+        request = self.request
+        match = getattr(request, "resolver_match", None)
+        entry = {
+            "time": datetime.now(timezone.utc).isoformat(),
+            "duration_ms": round(duration, 3),
+            "fingerprint": key,
+            "normalized": normalized,
+            "sql": sql[:2000],
+            "vendor": connection.vendor,
+            "view": match.view_name if match else None,
+            "method": getattr(request, "method", None),
+            "path": getattr(request, "path", None),
+            "stack": get_stack(),
+            "explain": plan,
+            "error": str(error)[:500] if error is not None else None,
+        }
+        write(entry)
+        logger.warning("Slow query (%.1fms) in %s [%s]", duration, entry["view"], key)
+
+
+class SlowQueryMiddleware:
+    """Log the SQL statements of each request slower than the threshold.
+
+    Not loaded when SLOW_QUERY_THRESHOLD_MS is 0.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SLOW_QUERY_THRESHOLD_MS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        wrapper = SlowQueryLogger(request)
+        # Same as connection.execute_wrapper(), minus the context manager.
+        wrappers = connections[DEFAULT_DB_ALIAS].execute_wrappers
+        wrappers.append(wrapper)
+        try:
+            return self.get_response(request)
+        finally:
+            wrappers.remove(wrapper)
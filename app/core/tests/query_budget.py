@@ -0,0 +1,223 @@
+"""
+Harness asserting a fixed SQL query budget per API endpoint.
+
+A QueryBudgetTestCase subclass lists Endpoint objects and gets one test
+per endpoint. Each test requests the endpoint against datasets of every
+size in `sizes`, with and without tags, and fails when a request runs
+more queries than the budget or when the count changes with the number
+of rows (an N+1). Caches are cleared before each request so the cold
+path is counted. A per-endpoint report is printed after the class.
+"""
+
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.metrics import QueryCounter
+from core.models import Flavour, Tag
+from user.authentication import token_cache
+
+PASSWORD = "testPass123"
+TAGS_PER_FLAVOUR = 2
+
+
+class Endpoint:
+    """One route and method with its query budget.
+
+    `url` is a URL name or a callable taking the Dataset; `data` and
+    `params` are callables taking the Dataset. Endpoints with
+    `auth=False` are requested without credentials. `per_item` queries
+    are allowed on top of the budget for each item of a list payload,
+    for writes a backend can only do row by row.
+    """
+
+    def __init__(
+        self,
+        name,
+        method,
+        url,
+        budget,
+        data=None,
+        params=None,
+        status=200,
+        auth=True,
+        per_item=0,
+    ):
+        self.name = name
+        self.method = method
+        self.url = url
+        self.budget = budget
+        self.data = data
+        self.params = params
+        self.status = status
+        self.auth = auth
+        self.per_item = per_item
+
+    def __str__(self):
+        return f"{self.method} {self.name}"
+
+    def get_url(self, dataset):
+        """Return the URL of the endpoint for `dataset`."""
+        return self.url(dataset) if callable(self.url) else reverse(self.url)
+
+
+class Dataset:
+    """A user owning `size` flavours and some tags, linked when `tagged`."""
+
+    def __init__(self, size, tagged):
+        self.size = size
+        self.tagged = tagged
+        self.label = f"{size}{'+tags' if tagged else ''}"
+        self.user = get_user_model().objects.create_user(
+            email=f"budget-{self.label}@example.com", password=PASSWORD
+        )
+        self.token = Token.objects.create(user=self.user)
+
+        Flavour.objects.bulk_create(
+            Flavour(user=self.user, title=f"Flavour {i}", time_minutes=i, price=1)
+            for i in range(size)
+        )
+        self.flavour_ids = list(
+            Flavour.objects.filter(user=self.user)
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+        Tag.objects.bulk_create(
+            Tag(user=self.user, name=f"Tag {i}") for i in range(TAGS_PER_FLAVOUR)
+        )
+        self.tag_ids = list(
+            Tag.objects.filter(user=self.user).values_list("id", flat=True)
+        )
+        if tagged:
+            FlavourTags = Flavour.tags.through
+            FlavourTags.objects.bulk_create(
+                FlavourTags(flavour_id=flavour_id, tag_id=tag_id)
+                for flavour_id in self.flavour_ids
+                for tag_id in self.tag_ids
+            )
+
+    def sample(self, limit=100):
+        """Return up to `limit` flavour ids, as many as there are rows."""
+        return self.flavour_ids[:limit]
+
+    def tags(self):
+        """Return nested tag input matching the dataset."""
+        return [{"name": "Tag 0"}, {"name": "New"}] if self.tagged else []
+
+
+class QueryBudgetTestCase(TestCase):
+    """Generate a query budget test for each endpoint in `endpoints`."""
+
+    sizes = (1, 10, 1000)
+    endpoints = []
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for endpoint in cls.endpoints:
+            name = f"test_{endpoint.name}_{endpoint.method}".lower()
+            name = name.replace(":", "_").replace("-", "_")
+            test = cls.make_test(endpoint)
+            test.__name__ = name
+            test.__doc__ = f"Test {endpoint} stays within {endpoint.budget} queries."
+            setattr(cls, name, test)
+
+    @staticmethod
+    def make_test(endpoint):
+        def test(self):
+            self.check_budget(endpoint)
+
+        return test
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.datasets = [
+            Dataset(size, tagged) for tagged in (False, True) for size in cls.sizes
+        ]
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.report = {}
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.print_report()
+        super().tearDownClass()
+
+    def measure(self, endpoint, dataset):
+        """Request `endpoint` for `dataset` and return (response, queries).
+
+        List payload items beyond the first count `per_item` queries less.
+        """
+        client = APIClient()
+        if endpoint.auth:
+            client.credentials(HTTP_AUTHORIZATION=f"Token {dataset.token.key}")
+        url = endpoint.get_url(dataset)
+        if endpoint.params:
+            url = f"{url}?{endpoint.params(dataset)}"
+        data = endpoint.data(dataset) if endpoint.data else None
+
+        cache.clear()
+        token_cache.clear()
+        queries = QueryCounter()
+        with connections[DEFAULT_DB_ALIAS].execute_wrapper(queries):
+            response = getattr(client, endpoint.method.lower())(
+                url, data, format="json"
+            )
+            if response.streaming:
+                b"".join(response.streaming_content)
+        items = len(data) if isinstance(data, list) else 1
+        return response, queries.count - endpoint.per_item * (items - 1)
+
+    def check_budget(self, endpoint):
+        """Assert `endpoint` runs a constant number of queries within budget."""
+        counts = self.report.setdefault(endpoint, {})
+        for dataset in self.datasets:
+            response, counts[dataset.label] = self.measure(endpoint, dataset)
+            self.assertEqual(
+                response.status_code,
+                endpoint.status,
+                f"{endpoint} on {dataset.label}: {getattr(response, 'data', '')}",
+            )
+
+        for dataset in self.datasets:
+            self.assertLessEqual(
+                counts[dataset.label],
+                endpoint.budget,
+                f"{endpoint} is over its query budget: {counts}",
+            )
+        for tagged in (False, True):
+            scaling = {
+                counts[dataset.label]
+                for dataset in self.datasets
+                if dataset.tagged == tagged
+            }
+            self.assertEqual(
+                len(scaling), 1, f"{endpoint} queries grow with rows: {counts}"
+            )
+
+    @classmethod
+    def print_report(cls):
+        """Write the query counts of every endpoint to stderr."""
+        if not cls.report:
+            return
+        labels = [f"{size}{suffix}" for suffix in ("", "+tags") for size in cls.sizes]
+        lines = [
+            "",
+            f"{'endpoint':<36} {'budget':>6} "
+            + " ".join(f"{label:>10}" for label in labels),
+        ]
+        for endpoint, counts in sorted(
+            cls.report.items(), key=lambda item: str(item[0])
+        ):
+            lines.append(
+                f"{str(endpoint):<36} {endpoint.budget:>6} "
+                + " ".join(f"{counts.get(label, '-'):>10}" for label in labels)
+            )
+        sys.stderr.write("\n".join(lines) + "\n")
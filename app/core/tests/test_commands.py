@@ -2,13 +2,24 @@
 Test custom Django management commands.
 """
 
+import json
+import os
+import tempfile
+from io import StringIO
 from unittest.mock import patch
 
-from django.core.management import call_command
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
 from django.db.utils import OperationalError
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, TestCase
 from psycopg2 import OperationalError as Psycopg2Error
 
+from core.management.commands import import_flavours
+from core.management.commands.benchmark_api import SCENARIOS, percentile
+from core.models import Flavour, Tag
+
 
 @patch("core.management.commands.wait_for_db.Command.check")
 class CommandTests(SimpleTestCase):
@@ -33,3 +44,293 @@ class CommandTests(SimpleTestCase):
 
         self.assertEqual(patched_check.call_count, 6)
         patched_check.assert_called_with(databases=["default"])
+
+
+class ImportFlavoursCommandTests(TestCase):
+    """Test the import_flavours command."""
+
+    def setUp(self):
+        """Create the importing user and a scratch directory."""
+        self.user = get_user_model().objects.create_user(
+            email="import@example.com", password="testing@123"
+        )
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def write(self, name, content):
+        """Write `content` to a scratch file and return its path."""
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, "w", newline="") as stream:
+            stream.write(content)
+        return path
+
+    def import_flavours(self, path, *args):
+        """Run the command quietly for the test user."""
+        call_command(
+            "import_flavours", path, "--user", self.user.email, *args, stdout=StringIO()
+        )
+
+    def test_import_csv_with_tags(self):
+        """Test importing CSV rows creates flavours, tags and links."""
+        path = self.write(
+            "flavours.csv",
+            "title,time_minutes,price,description,link,tags\n"
+            "Mango,5,1.50,Sweet,,Drink|Sweet\n"
+            "Chai,10,2.00,,https://example.com,Drink\n",
+        )
+
+        self.import_flavours(path)
+
+        flavours = Flavour.objects.filter(user=self.user).order_by("id")
+        self.assertEqual([f.title for f in flavours], ["Mango", "Chai"])
+        self.assertEqual(
+            sorted(t.name for t in flavours[0].tags.all()), ["Drink", "Sweet"]
+        )
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 2)
+        self.assertFalse(os.path.exists(path + ".checkpoint"))
+
+    def test_import_jsonl(self):
+        """Test importing JSON lines, including exported tag objects."""
+        rows = [
+            {"title": "Mango", "time_minutes": 5, "price": "1.50", "tags": ["Drink"]},
+            {
+                "id": 99,
+                "title": "Chai",
+                "time_minutes": 10,
+                "price": 2,
+                "tags": [{"id": 1, "name": "Drink"}],
+            },
+        ]
+        path = self.write("flavours.jsonl", "\n".join(json.dumps(r) for r in rows))
+
+        self.import_flavours(path)
+
+        self.assertEqual(Flavour.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(Flavour.tags.through.objects.count(), 2)
+
+    def test_resume_after_invalid_row(self):
+        """Test a failed import resumes after the last committed chunk."""
+        path = self.write(
+            "flavours.csv",
+            "title,time_minutes,price\n"
+            "First,5,1.50\n"
+            "Second,5,1.50\n"
+            "Broken,soon,1.50\n",
+        )
+
+        with self.assertRaises(CommandError):
+            self.import_flavours(path, "--chunk-size", "2")
+        self.assertEqual(Flavour.objects.count(), 2)
+
+        self.write(
+            "flavours.csv",
+            "title,time_minutes,price\n"
+            "First,5,1.50\n"
+            "Second,5,1.50\n"
+            "Fixed,5,1.50\n",
+        )
+        self.import_flavours(path, "--chunk-size", "2", "--resume")
+
+        titles = list(Flavour.objects.order_by("id").values_list("title", flat=True))
+        self.assertEqual(titles, ["First", "Second", "Fixed"])
+
+    def test_resume_after_crash_following_commit(self):
+        """Test a chunk committed just before a crash isn't imported twice."""
+        path = self.write(
+            "flavours.csv", "title,time_minutes,price\nFirst,5,1.50\nSecond,5,1.50\n"
+        )
+        write_checkpoint = import_flavours.Command.write_checkpoint
+
+        def crash_after_commit(command, checkpoint, rows, pending=None):
+            if pending is None:
+                raise KeyboardInterrupt
+            write_checkpoint(command, checkpoint, rows, pending)
+
+        with patch.object(
+            import_flavours.Command, "write_checkpoint", crash_after_commit
+        ), self.assertRaises(KeyboardInterrupt):
+            self.import_flavours(path, "--chunk-size", "1")
+        self.import_flavours(path, "--chunk-size", "1", "--resume")
+
+        titles = list(Flavour.objects.order_by("id").values_list("title", flat=True))
+        self.assertEqual(titles, ["First", "Second"])
+
+    def test_skip_invalid_rows(self):
+        """Test --skip-invalid imports the valid rows only."""
+        path = self.write(
+            "flavours.csv",
+            "title,time_minutes,price\n" "Good,5,1.50\n" ",5,1.50\n" "Bad,5,10000\n",
+        )
+
+        call_command(
+            "import_flavours",
+            path,
+            "--user",
+            self.user.email,
+            "--skip-invalid",
+            stdout=StringIO(),
+            stderr=StringIO(),
+        )
+
+        self.assertEqual(
+            list(Flavour.objects.values_list("title", flat=True)), ["Good"]
+        )
+
+    def test_malformed_jsonl_lines(self):
+        """Test lines that aren't JSON objects are reported as invalid rows."""
+        path = self.write(
+            "flavours.jsonl",
+            '{"title": "Mango", "time_minutes": 5, "price": "1.50"}\n'
+            "{not json\n"
+            "[1, 2]\n"
+            '{"title": "Chai", "time_minutes": 5, "price": 1, "tags": [{}]}\n',
+        )
+
+        with self.assertRaisesMessage(CommandError, "Row 2 is invalid"):
+            self.import_flavours(path)
+
+        stderr = StringIO()
+        call_command(
+            "import_flavours",
+            path,
+            "--user",
+            self.user.email,
+            "--skip-invalid",
+            stdout=StringIO(),
+            stderr=stderr,
+        )
+
+        self.assertEqual(
+            list(Flavour.objects.values_list("title", flat=True)), ["Mango"]
+        )
+        for number in (2, 3, 4):
+            self.assertIn(f"Row {number} is invalid", stderr.getvalue())
+
+    def test_invalid_jsonl_tags(self):
+        """Test tags that aren't valid names make their row invalid."""
+        rows = [
+            {"title": "Mango", "time_minutes": 5, "price": 1, "tags": ["Sweet"]},
+            {"title": "Number", "time_minutes": 5, "price": 1, "tags": [1]},
+            {"title": "List", "time_minutes": 5, "price": 1, "tags": [[1]]},
+            {"title": "Long", "time_minutes": 5, "price": 1, "tags": ["x" * 300]},
+        ]
+        path = self.write("flavours.jsonl", "\n".join(json.dumps(r) for r in rows))
+        stderr = StringIO()
+
+        call_command(
+            "import_flavours",
+            path,
+            "--user",
+            self.user.email,
+            "--skip-invalid",
+            stdout=StringIO(),
+            stderr=stderr,
+        )
+
+        self.assertEqual(
+            list(Flavour.objects.values_list("title", flat=True)), ["Mango"]
+        )
+        self.assertEqual(list(Tag.objects.values_list("name", flat=True)), ["Sweet"])
+        for number in (2, 3, 4):
+            self.assertIn(f"Row {number} is invalid", stderr.getvalue())
+        self.assertIn("at most 255 characters", stderr.getvalue())
+
+    def test_chunk_size_must_be_positive(self):
+        """Test a chunk size below 1 is refused."""
+        path = self.write("flavours.csv", "title,time_minutes,price\nA,5,1\n")
+
+        with self.assertRaises(CommandError):
+            self.import_flavours(path, "--chunk-size", "0")
+        self.assertFalse(Flavour.objects.exists())
+
+
+class SeedFlavoursCommandTests(TestCase):
+    """Test the seed_flavours command."""
+
+    def test_seed_users_flavours_and_tags(self):
+        """Test seeding creates every user with their flavours and tags."""
+        call_command(
+            "seed_flavours",
+            "--users",
+            "3",
+            "--flavours",
+            "4",
+            "--tags",
+            "5",
+            "--chunk-size",
+            "8",
+            stdout=StringIO(),
+        )
+
+        users = get_user_model().objects.all()
+        self.assertEqual(users.count(), 3)
+        self.assertTrue(users[0].check_password("benchmark-pass-123"))
+        for user in users:
+            self.assertEqual(Flavour.objects.filter(user=user).count(), 4)
+            self.assertEqual(Tag.objects.filter(user=user).count(), 5)
+        links = Flavour.tags.through.objects.select_related("flavour", "tag")
+        self.assertEqual(links.count(), 3 * 4 * 2)
+        for link in links:
+            self.assertEqual(link.flavour.user_id, link.tag.user_id)
+
+    def test_too_many_tags(self):
+        """Test asking for more tags than there are names fails."""
+        with self.assertRaises(CommandError):
+            call_command("seed_flavours", "--tags", "1000", stdout=StringIO())
+
+
+class BenchmarkApiCommandTests(TestCase):
+    """Test the benchmark_api command."""
+
+    def setUp(self):
+        """Seed a few users and keep the test connection open between requests."""
+        call_command(
+            "seed_flavours", "--users", "2", "--flavours", "3", stdout=StringIO()
+        )
+        # As the test client does, since requests run inside the test transaction.
+        request_started.disconnect(close_old_connections)
+        request_finished.disconnect(close_old_connections)
+        self.addCleanup(request_started.connect, close_old_connections)
+        self.addCleanup(request_finished.connect, close_old_connections)
+
+    def test_percentile(self):
+        """Test percentiles use the nearest rank."""
+        values = list(range(1, 101))
+
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7], 95), 7)
+        self.assertIsNone(percentile([], 50))
+
+    def test_benchmark_reports_json(self):
+        """Test every scenario runs without errors and reports its numbers."""
+        out = StringIO()
+
+        call_command(
+            "benchmark_api",
+            "--requests",
+            "4",
+            "--warmup",
+            "1",
+            "--concurrency",
+            "1",
+            stdout=out,
+        )
+
+        report = json.loads(out.getvalue())
+        self.assertEqual(report["meta"]["users"], 2)
+        self.assertEqual(sorted(report["scenarios"]), sorted(SCENARIOS))
+        for name, result in report["scenarios"].items():
+            self.assertEqual(result["requests"], 4, name)
+            self.assertEqual(result["errors"], 0, name)
+            self.assertEqual(
+                sorted(result["latency_ms"]), ["max", "mean", "p50", "p95", "p99"]
+            )
+        self.assertEqual(
+            Flavour.objects.filter(title__startswith="Benchmark").count(), 5
+        )
+
+    def test_unknown_scenario(self):
+        """Test an unknown scenario name fails."""
+        with self.assertRaises(CommandError):
+            call_command("benchmark_api", "--scenarios", "list,nope")
@@ -0,0 +1,237 @@
+"""
+Tests for MessagePack content negotiation on the flavour and user APIs.
+"""
+
+import datetime
+import io
+import json
+from decimal import Decimal
+
+import msgpack
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.test import APIClient
+
+from core.models import Flavour, Tag
+from core.parsers import MessagePackParser
+from core.renderers import MessagePackRenderer
+from user.authentication import token_cache
+
+FORMATS = {
+    "json": ("application/json", lambda data: json.dumps(data).encode(), json.loads),
+    "msgpack": ("application/msgpack", msgpack.packb, msgpack.unpackb),
+}
+
+# Values that legitimately differ between two runs of the same requests.
+VOLATILE_KEYS = {"id", "email", "token", "access", "refresh", "deleted"}
+
+FLAVOUR = {
+    "title": "Mango Lassi",
+    "price": "5.25",
+    "time_minutes": 5,
+    "description": "Süß",
+    "tags": [{"name": "Vegan"}],
+}
+
+
+def normalize(data):
+    """Blank out VOLATILE_KEYS anywhere in `data`."""
+    if isinstance(data, dict):
+        return {
+            key: None if key in VOLATILE_KEYS else normalize(value)
+            for key, value in data.items()
+        }
+    if isinstance(data, (list, tuple)):
+        return [normalize(item) for item in data]
+    return data
+
+
+class MessagePackRendererTests(SimpleTestCase):
+    """Test the MessagePack encodings of non-native types."""
+
+    def test_decimal_and_datetimes_are_strings(self):
+        """Test Decimals keep their digits and datetimes are ISO 8601."""
+        data = {
+            "price": Decimal("10.50"),
+            "created": datetime.datetime(
+                2024, 7, 15, 20, 2, 3, 123456, tzinfo=datetime.timezone.utc
+            ),
+            "date": datetime.date(2024, 7, 15),
+        }
+
+        decoded = msgpack.unpackb(MessagePackRenderer().render(data))
+
+        self.assertEqual(
+            decoded,
+            {
+                "price": "10.50",
+                "created": "2024-07-15T20:02:03.123456Z",
+                "date": "2024-07-15",
+            },
+        )
+
+    def test_invalid_body_fails(self):
+        """Test truncated MessagePack raises ParseError."""
+        body = msgpack.packb({"title": "Kulfi"})[:-2]
+
+        with self.assertRaises(ParseError):
+            MessagePackParser().parse(io.BytesIO(body))
+
+
+class RoundTripTests(TestCase):
+    """Test every endpoint answers the same data in JSON and MessagePack.
+
+    Each scenario runs once per format for a fresh user, sending bodies
+    and asking for responses in that format.
+    """
+
+    def setUp(self):
+        """Clear caches shared between the runs."""
+        cache.clear()
+        token_cache.clear()
+
+    def run_scenario(self, scenario):
+        """Run `scenario` in both formats and compare the decoded results."""
+        results = {}
+        for fmt in FORMATS:
+            user = get_user_model().objects.create_user(
+                email=f"{fmt}@example.com", password="testPass123"
+            )
+            client = APIClient()
+            client.force_authenticate(user)
+            results[fmt] = scenario(lambda *args: self.call(client, fmt, *args), user)
+
+        self.assertEqual(normalize(results["msgpack"]), normalize(results["json"]))
+        return results["msgpack"]
+
+    def call(self, client, fmt, method, url, data=None):
+        """Send `data` to `url` in `fmt` and return (status, decoded body)."""
+        media_type, encode, decode = FORMATS[fmt]
+        kwargs = {"HTTP_ACCEPT": media_type}
+        if data is not None:
+            kwargs.update(data=encode(data), content_type=media_type)
+
+        response = getattr(client, method)(url, **kwargs)
+
+        if not response.content:
+            return response.status_code, None
+        self.assertEqual(response["Content-Type"], media_type)
+        return response.status_code, decode(response.content)
+
+    def create_flavour(self, user, title="Kulfi"):
+        """Create a flavour with one tag for `user`."""
+        flavour = Flavour.objects.create(
+            user=user, title=title, price=Decimal("3.50"), time_minutes=10
+        )
+        flavour.tags.add(Tag.objects.create(user=user, name=f"{title} tag"))
+        return flavour
+
+    def test_flavour_list_and_detail(self):
+        """Test list, detail and multi-get."""
+
+        def scenario(call, user):
+            flavour = self.create_flavour(user)
+            detail = reverse("flavour:flavour-detail", args=[flavour.id])
+            multi = reverse("flavour:flavour-multi-get")
+            return [
+                call("get", reverse("flavour:flavour-list")),
+                call("get", detail),
+                call("get", f"{multi}?ids={flavour.id},999999"),
+            ]
+
+        results = self.run_scenario(scenario)
+
+        self.assertEqual(results[1][1]["price"], "3.50")
+
+    def test_flavour_writes(self):
+        """Test create, partial and full update and delete."""
+
+        def scenario(call, user):
+            list_url = reverse("flavour:flavour-list")
+            status_code, created = call("post", list_url, FLAVOUR)
+            detail = reverse("flavour:flavour-detail", args=[created["id"]])
+            return [
+                (status_code, created),
+                call("patch", detail, {"title": "Rose Lassi", "tags": []}),
+                call("put", detail, dict(FLAVOUR, title="Chai")),
+                call("delete", detail),
+            ]
+
+        results = self.run_scenario(scenario)
+
+        self.assertEqual(results[0][0], status.HTTP_201_CREATED)
+        self.assertEqual(results[0][1]["description"], "Süß")
+
+    def test_flavour_bulk(self):
+        """Test bulk create, update and delete."""
+
+        def scenario(call, user):
+            url = reverse("flavour:flavour-bulk-create")
+            status_code, created = call("post", url, [FLAVOUR, FLAVOUR])
+            ids = [item["id"] for item in created]
+            return [
+                (status_code, created),
+                call("patch", url, [{"id": ids[0], "price": "1.25"}]),
+                call("delete", url, {"ids": ids}),
+            ]
+
+        results = self.run_scenario(scenario)
+
+        self.assertEqual(results[1][1][0]["price"], "1.25")
+
+    def test_flavour_errors(self):
+        """Test validation errors are encoded in the requested format."""
+
+        def scenario(call, user):
+            return [
+                call("post", reverse("flavour:flavour-list"), {"title": ""}),
+                call("get", reverse("flavour:flavour-list") + "?fields=secret"),
+            ]
+
+        results = self.run_scenario(scenario)
+
+        self.assertEqual(results[0][0], status.HTTP_400_BAD_REQUEST)
+
+    def test_tags(self):
+        """Test tag list, create, update and delete."""
+
+        def scenario(call, user):
+            url = reverse("flavour:tag-list")
+            status_code, created = call("post", url, {"name": "Vegan"})
+            detail = reverse("flavour:tag-detail", args=[created["id"]])
+            return [
+                (status_code, created),
+                call("patch", detail, {"name": "Sweet"}),
+                call("get", url),
+                call("delete", detail),
+            ]
+
+        self.run_scenario(scenario)
+
+    def test_user_endpoints(self):
+        """Test sign up, tokens, profile and logout."""
+
+        def scenario(call, user):
+            credentials = {"email": user.email, "password": "testPass123"}
+            signed = call("post", reverse("user:token-signed"), credentials)
+            return [
+                call(
+                    "post",
+                    reverse("user:create"),
+                    {"email": f"new-{user.email}", "password": "pass12345"},
+                ),
+                call("post", reverse("user:token"), credentials),
+                signed,
+                call("post", reverse("user:token-refresh"), signed[1]),
+                call("get", reverse("user:me")),
+                call("patch", reverse("user:me"), {"name": "Moosa"}),
+                call("post", reverse("user:logout")),
+            ]
+
+        results = self.run_scenario(scenario)
+
+        self.assertEqual(results[5][1]["name"], "Moosa")
@@ -0,0 +1,213 @@
+"""
+Tests for the per-route request metrics.
+"""
+
+import json
+import os
+import tempfile
+import threading
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core import metrics
+from core.models import Flavour
+from user.authentication import token_cache
+
+METRICS_URL = reverse("metrics")
+
+
+def get_samples(text):
+    """Return {sample name with labels: value} of a Prometheus text page."""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, _, value = line.rpartition(" ")
+            samples[name] = float(value)
+    return samples
+
+
+class MetricsTests(SimpleTestCase):
+    """Test recording and exporting of the metrics."""
+
+    def setUp(self):
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test latencies land in the right buckets and add up."""
+        metrics.record("flavour:flavour-list", "GET", 200, 0.003, 2, 0.001)
+        metrics.record("flavour:flavour-list", "GET", 200, 0.2, 3, 0.002)
+        metrics.record("flavour:flavour-list", "GET", 200, 30, 1, 0.001)
+
+        samples = get_samples(metrics.export())
+
+        labels = 'route="flavour:flavour-list",method="GET",status="200"'
+        bucket = 'api_request_duration_seconds_bucket{%s,le="%s"}'
+        self.assertEqual(samples[bucket % (labels, "0.005")], 1)
+        self.assertEqual(samples[bucket % (labels, "0.1")], 1)
+        self.assertEqual(samples[bucket % (labels, "0.25")], 2)
+        self.assertEqual(samples[bucket % (labels, "10.0")], 2)
+        self.assertEqual(samples[bucket % (labels, "+Inf")], 3)
+        self.assertEqual(samples["api_request_duration_seconds_count{%s}" % labels], 3)
+        self.assertAlmostEqual(
+            samples["api_request_duration_seconds_sum{%s}" % labels], 30.203
+        )
+        self.assertEqual(samples["api_db_queries_total{%s}" % labels], 6)
+
+    def test_exited_threads_folded_into_total(self):
+        """Test the dicts of exited threads are merged, not kept per thread."""
+
+        def handle_request():
+            metrics.record("user:me", "GET", 200, 0.01, 1, 0.001)
+
+        for _ in range(50):
+            thread = threading.Thread(target=handle_request)
+            thread.start()
+            thread.join()
+
+        self.assertLessEqual(len(metrics._registries), 1)
+        samples = get_samples(metrics.export())
+        labels = 'route="user:me",method="GET",status="200"'
+        self.assertEqual(samples["api_request_duration_seconds_count{%s}" % labels], 50)
+
+    def test_compression_recorded(self):
+        """Test the sizes and CPU time of compressed responses are summed."""
+        compression = {"original_size": 4000, "compressed_size": 1000, "cpu_time": 1}
+
+        metrics.record("user:me", "GET", 200, 0.01, 1, 0.001, compression)
+        metrics.record("user:me", "GET", 200, 0.01, 1, 0.001, compression)
+
+        samples = get_samples(metrics.export())
+        labels = '{route="user:me",method="GET",status="200"}'
+        self.assertEqual(
+            samples["api_response_uncompressed_bytes_total" + labels], 8000
+        )
+        self.assertEqual(samples["api_response_compressed_bytes_total" + labels], 2000)
+        self.assertEqual(
+            samples["api_response_compression_cpu_seconds_total" + labels], 2
+        )
+
+    def test_labels_escaped(self):
+        """Test quotes, backslashes and newlines in labels are escaped."""
+        labels = metrics.format_labels('a"b\\c\nd', "GET", 200)
+
+        self.assertEqual(labels, '{route="a\\"b\\\\c\\nd",method="GET",status="200"}')
+
+    def test_workers_aggregated(self):
+        """Test the snapshots of other workers are added to the own metrics."""
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(METRICS_MULTIPROC_DIR=directory):
+                metrics.record("user:token", "POST", 200, 0.01, 2, 0.001)
+                metrics.flush()
+                with open(metrics.get_snapshot_path(os.getpid())) as stream:
+                    rows = json.load(stream)
+                os.rename(
+                    metrics.get_snapshot_path(os.getpid()),
+                    metrics.get_snapshot_path(os.getpid() + 1),
+                )
+
+                samples = get_samples(metrics.export())
+
+        self.assertEqual(rows[0][:3], ["user:token", "POST", 200])
+        labels = '{route="user:token",method="POST",status="200"}'
+        self.assertEqual(samples["api_request_duration_seconds_count" + labels], 2)
+        self.assertEqual(samples["api_db_queries_total" + labels], 4)
+
+    def test_flushed_on_interval(self):
+        """Test a worker dumps its metrics once the interval has passed."""
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(
+                METRICS_MULTIPROC_DIR=directory, METRICS_FLUSH_INTERVAL=3600
+            ):
+                metrics.record("user:me", "GET", 200, 0.01, 1, 0.001)
+                metrics.record("user:me", "GET", 200, 0.01, 1, 0.001)
+
+                with open(metrics.get_snapshot_path(os.getpid())) as stream:
+                    rows = json.load(stream)
+
+        # Only the first request was due a flush.
+        self.assertEqual(rows[0][3 + metrics.COUNT], 1)
+
+    def test_failed_flush_does_not_raise(self):
+        """Test a snapshot that can't be written is logged, not raised."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "missing", "file")
+            with override_settings(METRICS_MULTIPROC_DIR=path), patch(
+                "core.metrics.os.makedirs", side_effect=PermissionError
+            ), self.assertLogs("core.metrics", "ERROR"):
+                metrics.record("user:me", "GET", 200, 0.01, 1, 0.001)
+
+    def test_concurrent_flushes_skipped(self):
+        """Test a thread doesn't flush while another thread is flushing."""
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(METRICS_MULTIPROC_DIR=directory), patch(
+                "core.metrics.write_snapshot"
+            ) as write_snapshot:
+                with metrics._flush_lock:
+                    metrics.record("user:me", "GET", 200, 0.01, 1, 0.001)
+
+        write_snapshot.assert_not_called()
+
+
+class MetricsMiddlewareTests(TestCase):
+    """Test requests are recorded under their route."""
+
+    def setUp(self):
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com", password="testPass123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_route_queries_and_sql_time(self):
+        """Test a list request is recorded with its SQL queries."""
+        Flavour.objects.create(user=self.user, title="Mango", time_minutes=5, price=1)
+        url = reverse("flavour:flavour-list")
+
+        queries = metrics.QueryCounter()
+        with connection.execute_wrapper(queries):
+            self.client.get(url)
+
+        samples = get_samples(self.client.get(METRICS_URL).content.decode())
+
+        labels = '{route="flavour:flavour-list",method="GET",status="200"}'
+        self.assertEqual(samples["api_request_duration_seconds_count" + labels], 1)
+        self.assertEqual(samples["api_db_queries_total" + labels], queries.count)
+        self.assertGreater(samples["api_db_query_duration_seconds_total" + labels], 0)
+
+    def test_token_cache_counters(self):
+        """Test token cache hits and misses are exported for this worker."""
+        token_cache.clear()
+        self.addCleanup(token_cache.clear)
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=self.user).key}"
+        )
+        client.get(reverse("user:me"))
+        client.get(reverse("user:me"))
+
+        samples = get_samples(self.client.get(METRICS_URL).content.decode())
+
+        labels = '{pid="%d"}' % os.getpid()
+        self.assertEqual(samples["api_token_cache_misses_total" + labels], 1)
+        self.assertEqual(samples["api_token_cache_hits_total" + labels], 1)
+        self.assertEqual(samples["api_token_cache_entries" + labels], 1)
+
+    def test_unresolved_route(self):
+        """Test requests to unknown URLs share one route label."""
+        self.client.get("/no-such-page/")
+
+        response = self.client.get(METRICS_URL)
+
+        self.assertEqual(response["Content-Type"], metrics.CONTENT_TYPE)
+        self.assertIn(
+            'route="unresolved",method="GET",status="404"', response.content.decode()
+        )
@@ -0,0 +1,181 @@
+"""
+Tests for the response compression middleware.
+"""
+
+import gzip
+from unittest import skipIf
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import middleware
+from core.middleware import CompressionMiddleware, negotiate_encoding
+from core.models import Flavour
+
+BODY = b'{"title":"Mango Lassi"}' * 100
+
+
+def respond(response):
+    """Return a CompressionMiddleware wrapping a view returning `response`."""
+    return CompressionMiddleware(lambda request: response)
+
+
+@override_settings(COMPRESSION_MIN_SIZE=200, COMPRESSION_CACHE_TTL=300)
+class CompressionMiddlewareTests(SimpleTestCase):
+    """Test negotiation, thresholds and cached compressed variants."""
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+
+    def get(self, response, accept_encoding="gzip"):
+        """Run `response` through the middleware for a GET request."""
+        request = self.factory.get("/", HTTP_ACCEPT_ENCODING=accept_encoding)
+        return request, respond(response)(request)
+
+    def test_negotiate_encoding(self):
+        """Test quality values, wildcards and server preference."""
+        cases = [
+            ("gzip", ["br", "gzip"], "gzip"),
+            ("gzip, br", ["br", "gzip"], "br"),
+            ("br;q=0.5, gzip", ["br", "gzip"], "gzip"),
+            ("*", ["br", "gzip"], "br"),
+            ("gzip;q=0, *", ["gzip"], None),
+            ("identity", ["gzip"], None),
+            ("", ["gzip"], None),
+        ]
+        for header, encodings, expected in cases:
+            with self.subTest(header=header):
+                self.assertEqual(negotiate_encoding(header, encodings), expected)
+
+    @patch.object(middleware, "brotli", None)
+    def test_gzip(self):
+        """Test a large body is gzipped and headers are updated."""
+        request, response = self.get(HttpResponse(BODY))
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), BODY)
+        self.assertEqual(response["Content-Length"], str(len(response.content)))
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(request.compression["original_size"], len(BODY))
+        self.assertGreater(request.compression["ratio"], 1)
+        self.assertGreaterEqual(request.compression["cpu_time"], 0)
+
+    @skipIf(middleware.brotli is None, "brotli isn't installed.")
+    def test_brotli_preferred_when_installed(self):
+        """Test brotli is used when both the client and server support it."""
+        _, response = self.get(HttpResponse(BODY), "gzip, br")
+
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(middleware.brotli.decompress(response.content), BODY)
+
+    @patch.object(middleware, "brotli", None)
+    def test_brotli_skipped_when_missing(self):
+        """Test clients asking for br only get gzip without brotli."""
+        _, response = self.get(HttpResponse(BODY), "br")
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_small_body_not_compressed(self):
+        """Test bodies under COMPRESSION_MIN_SIZE are sent as they are."""
+        _, response = self.get(HttpResponse(b"small"))
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response.content, b"small")
+
+    def test_encoded_and_incompressible_bodies_skipped(self):
+        """Test already encoded bodies and images are left alone."""
+        encoded = HttpResponse(BODY)
+        encoded["Content-Encoding"] = "br"
+        image = HttpResponse(BODY, content_type="image/png")
+
+        for response in [encoded, image]:
+            with self.subTest(response=response):
+                _, result = self.get(response)
+
+                self.assertEqual(result.content, BODY)
+
+    def test_client_without_accept_encoding(self):
+        """Test clients that don't accept gzip get the identity body."""
+        _, response = self.get(HttpResponse(BODY), "")
+
+        self.assertEqual(response.content, BODY)
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+    def test_streaming_response(self):
+        """Test streamed bodies are gzipped on the fly."""
+        _, response = self.get(StreamingHttpResponse([BODY, BODY]))
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        content = b"".join(response.streaming_content)
+        self.assertEqual(gzip.decompress(content), BODY * 2)
+
+    @patch.object(middleware, "brotli", None)
+    def test_compressed_variant_cached_by_etag(self):
+        """Test responses with the same strong ETag are compressed once."""
+
+        def tagged():
+            response = HttpResponse(BODY)
+            response["ETag"] = '"abc"'
+            return response
+
+        _, first = self.get(tagged())
+        with patch.object(middleware, "compress") as compress:
+            request, second = self.get(tagged())
+
+        compress.assert_not_called()
+        self.assertTrue(request.compression["cached"])
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second["ETag"], 'W/"abc"')
+
+    def test_weak_etag_not_cached(self):
+        """Test weak ETags, which don't identify bytes, skip the cache."""
+        response = HttpResponse(BODY)
+        response["ETag"] = 'W/"abc"'
+        self.get(response)
+
+        with patch.object(middleware, "compress", wraps=middleware.compress) as mock:
+            response = HttpResponse(BODY)
+            response["ETag"] = 'W/"abc"'
+            self.get(response)
+
+        mock.assert_called_once()
+
+
+@override_settings(COMPRESSION_MIN_SIZE=200, FLAVOUR_HTTP_CACHE="on")
+class FlavourCompressionTests(TestCase):
+    """Test compression of the flavour API end to end."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com", password="testPass123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        Flavour.objects.bulk_create(
+            Flavour(user=self.user, title=f"F{i}", time_minutes=i, price=1)
+            for i in range(20)
+        )
+
+    def test_list_is_compressed_and_revalidates(self):
+        """Test a compressed list still answers 304 to its weak ETag."""
+        url = reverse("flavour:flavour-list")
+        plain = self.client.get(url)
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertEqual(response["ETag"], "W/" + plain["ETag"])
+
+        response = self.client.get(
+            url, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
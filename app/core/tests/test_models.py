@@ -6,6 +6,7 @@ Testing models.
 
 # Default user model for Auth
 from decimal import Decimal
+from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
 from django.test import TestCase
@@ -96,3 +97,32 @@ class ModelTests(TestCase):
         tag = models.Tag.objects.create(user=user, name="TestTag1")
 
         self.assertEqual(str(tag), tag.name)
+
+    def test_resolve_tags(self):
+        """Test resolving tag names reuses existing and creates missing tags."""
+        user = ModelTests.create_user()
+        existing = models.Tag.objects.create(user=user, name="Vegan")
+
+        tags = models.Tag.objects.resolve(user, ["Vegan", "Spicy", "Spicy"])
+
+        self.assertEqual(tags["Vegan"], existing)
+        self.assertEqual(tags["Spicy"].name, "Spicy")
+        self.assertEqual(models.Tag.objects.filter(user=user).count(), 2)
+
+    def test_resolve_tags_concurrent_create(self):
+        """Test a tag created by a concurrent request is read back."""
+        user = ModelTests.create_user()
+        bulk_create = models.Tag.objects.bulk_create
+
+        def racing_bulk_create(objs, **kwargs):
+            winner = models.Tag.objects.create(user=user, name="Spicy")
+            bulk_create(objs, **kwargs)
+            return [winner]
+
+        with patch.object(
+            models.Tag.objects, "bulk_create", side_effect=racing_bulk_create
+        ):
+            tags = models.Tag.objects.resolve(user, ["Spicy"])
+
+        self.assertEqual(models.Tag.objects.filter(user=user).count(), 1)
+        self.assertEqual(tags["Spicy"], models.Tag.objects.get(user=user))
@@ -0,0 +1,124 @@
+"""
+Tests for the opt-in request profiler.
+"""
+
+import os
+import re
+import tempfile
+from io import StringIO
+from unittest import skipIf
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core import profiling
+from core.models import Flavour
+from core.profiling import parse_profile_name
+
+FLAVOURS_URL = reverse("flavour:flavour-list")
+ME_URL = reverse("user:me")
+
+
+class ProfileMixinTests(TestCase):
+    """Test which requests get profiled and how profiles are stored."""
+
+    def setUp(self):
+        profile_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(profile_dir.cleanup)
+        self.profile_dir = profile_dir.name
+        settings = override_settings(PROFILER_DIR=self.profile_dir)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        self.staff = get_user_model().objects.create_user(
+            email="staff@example.com", password="testPass123", is_staff=True
+        )
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="testPass123"
+        )
+        Flavour.objects.create(user=self.staff, title="Mango", time_minutes=5, price=1)
+
+    def get(self, user, url, **extra):
+        """GET `url` as `user`."""
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.get(url, **extra)
+
+    @patch.object(profiling, "SamplingProfiler", None)
+    def test_staff_header_writes_cprofile(self):
+        """Test a staff request with the header is profiled with cProfile."""
+        response = self.get(self.staff, FLAVOURS_URL, HTTP_X_PROFILE="1")
+
+        self.assertEqual(response.status_code, 200)
+        name = response["X-Profile"]
+        self.assertTrue(os.path.exists(os.path.join(self.profile_dir, name)))
+        info = parse_profile_name(name)
+        self.assertEqual(info["route"], "flavour:flavour-list")
+        self.assertEqual(info["method"], "GET")
+        self.assertEqual(info["backend"], "cprofile")
+        self.assertGreaterEqual(info["duration_ms"], 0)
+
+    @skipIf(profiling.SamplingProfiler is None, "pyinstrument isn't installed.")
+    def test_sampling_profiler_preferred_when_installed(self):
+        """Test pyinstrument is used when it is installed."""
+        response = self.get(self.staff, ME_URL, HTTP_X_PROFILE="1")
+
+        info = parse_profile_name(response["X-Profile"])
+        self.assertEqual(info["route"], "user:me")
+        self.assertEqual(info["backend"], "pyinstrument")
+
+    def test_non_staff_not_profiled(self):
+        """Test the header is ignored for users who aren't staff."""
+        response = self.get(self.user, FLAVOURS_URL, HTTP_X_PROFILE="1")
+
+        self.assertFalse(response.has_header("X-Profile"))
+        self.assertEqual(os.listdir(self.profile_dir), [])
+
+    def test_sampled_requests(self):
+        """Test PROFILER_SAMPLE_PERCENT profiles staff requests without header."""
+        with override_settings(PROFILER_SAMPLE_PERCENT=100):
+            sampled = self.get(self.staff, ME_URL)
+            user = self.get(self.user, ME_URL)
+        with override_settings(PROFILER_SAMPLE_PERCENT=0):
+            unsampled = self.get(self.staff, ME_URL)
+
+        self.assertTrue(sampled.has_header("X-Profile"))
+        self.assertFalse(user.has_header("X-Profile"))
+        self.assertFalse(unsampled.has_header("X-Profile"))
+
+    @patch.object(profiling, "SamplingProfiler", None)
+    def test_profiles_command(self):
+        """Test profiles are listed per route and aggregated."""
+        self.get(self.staff, FLAVOURS_URL, HTTP_X_PROFILE="1")
+        self.get(self.staff, FLAVOURS_URL, HTTP_X_PROFILE="1")
+        self.get(self.staff, ME_URL, HTTP_X_PROFILE="1")
+        out = StringIO()
+
+        call_command("profiles", stdout=out)
+
+        rows = [line.split() for line in out.getvalue().splitlines()]
+        self.assertIn(["flavour:flavour-list", "GET", "2"], [row[:3] for row in rows])
+        self.assertIn(["user:me", "GET", "1"], [row[:3] for row in rows])
+
+        out = StringIO()
+        call_command(
+            "profiles", "--aggregate", "--route", "flavour:flavour-list", stdout=out
+        )
+
+        self.assertIn("2 cProfile profiles", out.getvalue())
+        lines = [line.strip() for line in out.getvalue().splitlines()]
+        self.assertTrue(
+            any(
+                re.match(r"\d+ function calls .*in [\d.]+ seconds", line)
+                for line in lines
+            )
+        )
+        # The first stats row is on one line, under the column headers.
+        header = lines.index(
+            "ncalls  tottime  percall  cumtime  percall filename:lineno(function)"
+        )
+        self.assertEqual(len(lines[header + 1].split(None, 5)), 6, lines[header + 1])
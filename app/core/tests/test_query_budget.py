@@ -0,0 +1,165 @@
+"""
+Query budgets of every API endpoint.
+"""
+
+from django.db import connection
+from django.urls import reverse
+
+from user import tokens
+
+from .query_budget import PASSWORD, Endpoint, QueryBudgetTestCase
+
+
+def flavour_url(dataset):
+    return reverse("flavour:flavour-detail", args=[dataset.flavour_ids[0]])
+
+
+def tag_url(dataset):
+    return reverse("flavour:tag-detail", args=[dataset.tag_ids[0]])
+
+
+def flavour_payload(dataset, **extra):
+    return {
+        "title": "Budget",
+        "time_minutes": 5,
+        "price": "2.50",
+        "tags": dataset.tags(),
+        **extra,
+    }
+
+
+def ids_param(dataset):
+    return "ids=" + ",".join(str(i) for i in dataset.sample())
+
+
+class FlavourQueryBudgetTests(QueryBudgetTestCase):
+    """Query budgets of the flavour and tag endpoints."""
+
+    endpoints = [
+        Endpoint("flavour:flavour-list", "GET", "flavour:flavour-list", 3),
+        Endpoint(
+            "flavour:flavour-list",
+            "POST",
+            "flavour:flavour-list",
+            11,
+            data=flavour_payload,
+            status=201,
+        ),
+        Endpoint("flavour:flavour-detail", "GET", flavour_url, 3),
+        Endpoint(
+            "flavour:flavour-detail", "PUT", flavour_url, 15, data=flavour_payload
+        ),
+        Endpoint(
+            "flavour:flavour-detail",
+            "PATCH",
+            flavour_url,
+            15,
+            data=lambda dataset: {"price": "3.00", "tags": dataset.tags()},
+        ),
+        Endpoint("flavour:flavour-detail", "DELETE", flavour_url, 5, status=204),
+        Endpoint(
+            "flavour:flavour-bulk-create",
+            "POST",
+            "flavour:flavour-bulk-create",
+            11,
+            data=lambda dataset: [flavour_payload(dataset)] * len(dataset.sample()),
+            status=201,
+            # Without INSERT ... RETURNING flavours are saved one by one.
+            per_item=0 if connection.features.can_return_rows_from_bulk_insert else 1,
+        ),
+        Endpoint(
+            "flavour:flavour-bulk-create",
+            "PATCH",
+            "flavour:flavour-bulk-create",
+            14,
+            data=lambda dataset: [
+                {"id": i, "price": "4.00", "tags": dataset.tags()}
+                for i in dataset.sample()
+            ],
+        ),
+        Endpoint(
+            "flavour:flavour-bulk-create",
+            "DELETE",
+            "flavour:flavour-bulk-create",
+            8,
+            data=lambda dataset: {"ids": dataset.sample()},
+        ),
+        Endpoint("flavour:flavour-export", "GET", "flavour:flavour-export", 3),
+        Endpoint(
+            "flavour:flavour-multi-get",
+            "GET",
+            "flavour:flavour-multi-get",
+            3,
+            params=ids_param,
+        ),
+        Endpoint("flavour:tag-list", "GET", "flavour:tag-list", 2),
+        Endpoint(
+            "flavour:tag-list",
+            "POST",
+            "flavour:tag-list",
+            3,
+            data=lambda dataset: {"name": "Budget"},
+            status=201,
+        ),
+        Endpoint(
+            "flavour:tag-detail",
+            "PATCH",
+            tag_url,
+            4,
+            data=lambda dataset: {"name": "Renamed"},
+        ),
+        Endpoint("flavour:tag-detail", "DELETE", tag_url, 4, status=204),
+        Endpoint("flavour:api-root", "GET", "flavour:api-root", 0),
+    ]
+
+
+class UserQueryBudgetTests(QueryBudgetTestCase):
+    """Query budgets of the user endpoints."""
+
+    endpoints = [
+        Endpoint(
+            "user:create",
+            "POST",
+            "user:create",
+            2,
+            data=lambda dataset: {
+                "email": f"new-{dataset.label}@example.com",
+                "password": PASSWORD,
+                "name": "New",
+            },
+            status=201,
+            auth=False,
+        ),
+        Endpoint(
+            "user:token",
+            "POST",
+            "user:token",
+            2,
+            data=lambda dataset: {"email": dataset.user.email, "password": PASSWORD},
+            auth=False,
+        ),
+        Endpoint(
+            "user:token-signed",
+            "POST",
+            "user:token-signed",
+            1,
+            data=lambda dataset: {"email": dataset.user.email, "password": PASSWORD},
+            auth=False,
+        ),
+        Endpoint(
+            "user:token-refresh",
+            "POST",
+            "user:token-refresh",
+            1,
+            data=lambda dataset: {
+                tokens.REFRESH: tokens.issue_token(dataset.user, tokens.REFRESH)
+            },
+            auth=False,
+        ),
+        Endpoint("user:logout", "POST", "user:logout", 5, status=204),
+        Endpoint("user:me", "GET", "user:me", 1),
+        Endpoint(
+            "user:me", "PATCH", "user:me", 2, data=lambda dataset: {"name": "Renamed"}
+        ),
+        Endpoint("metrics", "GET", "metrics", 0, auth=False),
+    ]
@@ -0,0 +1,202 @@
+"""
+# app/core/tests/test_query_plans.py
+Query plan regression tests for hot API queries.
+
+These run EXPLAIN against PostgreSQL, so they are skipped on other backends.
+"""
+
+from decimal import Decimal
+from unittest import skipUnless
+from unittest.mock import Mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+
+from flavour.filters import FlavourAttributeFilter, FlavourSearchFilter
+
+from .. import models
+
+
+@skipUnless(connection.vendor == "postgresql", "EXPLAIN checks need PostgreSQL.")
+class QueryPlanTests(TestCase):
+    """Test hot queries are answered from an index without a sort."""
+
+    def setUp(self):
+        """Create a user with some flavours and tags."""
+        self.user = get_user_model().objects.create_user(
+            email="plans@example.com", password="testing@123"
+        )
+        models.Flavour.objects.bulk_create(
+            models.Flavour(
+                user=self.user,
+                title=f"Flavour {i}",
+                description="Spiced mango" if i % 10 == 0 else "Rose",
+                time_minutes=i,
+                price=Decimal(i) / 4,
+            )
+            for i in range(50)
+        )
+        models.Tag.objects.bulk_create(
+            models.Tag(user=self.user, name=f"Tag {i}") for i in range(10)
+        )
+        self.tags = list(models.Tag.objects.filter(user=self.user))
+        for flavour in models.Flavour.objects.filter(user=self.user):
+            flavour.tags.add(*self.tags[: flavour.time_minutes % 4])
+
+        # Rows of another user, so an index without user_id first has to
+        # filter its way through them.
+        other = get_user_model().objects.create_user(
+            email="other@example.com", password="testing@123"
+        )
+        models.Flavour.objects.bulk_create(
+            models.Flavour(user=other, title=f"Other {i}", time_minutes=i, price=1)
+            for i in range(1000)
+        )
+        models.Tag.objects.bulk_create(
+            models.Tag(user=other, name=f"Tag {i}") for i in range(200)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE core_flavour")
+            cursor.execute("ANALYZE core_tag")
+            cursor.execute("ANALYZE core_flavour_tags")
+            # Tiny test tables always favour a seq scan, so force the planner
+            # to show whether a usable index exists at all.
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def assertIndexedPlan(self, queryset, index):
+        """Fail if the plan of `queryset` doesn't use `index` or sorts."""
+        plan = queryset.explain()
+
+        self.assertIn(index, plan, plan)
+        self.assertNotIn("Seq Scan", plan, plan)
+        self.assertNotIn("Sort", plan, plan)
+
+    def test_flavour_list_uses_user_id_index(self):
+        """Test first page of the flavour list walks the composite index."""
+        queryset = models.Flavour.objects.filter(user=self.user).order_by("-id")
+
+        self.assertIndexedPlan(queryset[:51], "core_flavour_user_id_desc")
+
+    def test_flavour_list_cursor_page_uses_user_id_index(self):
+        """Test a later cursor page of the flavour list walks the index."""
+        queryset = models.Flavour.objects.filter(user=self.user, id__lt=10**9)
+
+        self.assertIndexedPlan(
+            queryset.order_by("-id")[:51], "core_flavour_user_id_desc"
+        )
+
+    def test_tag_lookup_by_name_uses_index(self):
+        """Test looking up a user's tags by name uses the unique index."""
+        queryset = models.Tag.objects.filter(user=self.user, name="Tag 1")
+
+        self.assertIndexedPlan(queryset, "core_tag_unique_user_name")
+
+    def test_flavour_search_uses_gin_index(self):
+        """Test full-text search is answered from the GIN index."""
+        request = Mock(query_params={"search": "mango"})
+        queryset = FlavourSearchFilter().filter_queryset(
+            request, models.Flavour.objects.filter(user=self.user), None
+        )
+
+        plan = queryset[:51].explain()
+
+        self.assertIn("core_flavour_search_gin", plan, plan)
+        self.assertNotIn("Seq Scan", plan, plan)
+
+
+@skipUnless(connection.vendor == "postgresql", "EXPLAIN checks need PostgreSQL.")
+class FilterQueryPlanTests(TransactionTestCase):
+    """Test each flavour filter is answered from the index made for it.
+
+    Enough rows are created, and vacuumed, for the planner to cost the
+    indexes as on a real table; VACUUM can't run in a transaction, hence
+    TransactionTestCase.
+    """
+
+    def setUp(self):
+        """Create a user with many flavours, a few of them matching."""
+        self.user = get_user_model().objects.create_user(
+            email="plans@example.com", password="testing@123"
+        )
+        models.Flavour.objects.bulk_create(
+            models.Flavour(
+                user=self.user,
+                title=f"Flavour {i}",
+                time_minutes=i,
+                price=Decimal(i) / 4,
+            )
+            for i in range(2000)
+        )
+        models.Tag.objects.bulk_create(
+            models.Tag(user=self.user, name=f"Tag {i}") for i in range(10)
+        )
+        self.tags = list(models.Tag.objects.filter(user=self.user).order_by("id"))
+
+        # Every 100th flavour has the first two tags, the rest one other tag.
+        FlavourTags = models.Flavour.tags.through
+        links = []
+        for i, flavour_id in enumerate(
+            models.Flavour.objects.order_by("id").values_list("id", flat=True)
+        ):
+            tags = self.tags[:2] if i % 100 == 0 else [self.tags[2 + i % 8]]
+            links += [FlavourTags(flavour_id=flavour_id, tag=tag) for tag in tags]
+        FlavourTags.objects.bulk_create(links)
+
+        with connection.cursor() as cursor:
+            cursor.execute("VACUUM ANALYZE core_flavour")
+            cursor.execute("VACUUM ANALYZE core_flavour_tags")
+            cursor.execute("SET enable_seqscan = off")
+        self.addCleanup(self.reset_seqscan)
+
+    def reset_seqscan(self):
+        with connection.cursor() as cursor:
+            cursor.execute("RESET enable_seqscan")
+
+    def get_plan(self, params):
+        """Return the plan of the list query filtered by `params`."""
+        request = Mock(query_params=params)
+        queryset = FlavourAttributeFilter().filter_queryset(
+            request, models.Flavour.objects.filter(user=self.user), None
+        )
+        plan = queryset.order_by("-id")[:51].explain()
+        self.assertNotIn("Seq Scan", plan, plan)
+        return plan
+
+    def test_flavour_price_range_uses_index(self):
+        """Test price range filters are answered from the (user, price) index."""
+        plan = self.get_plan({"price_min": "2", "price_max": "2.5"})
+
+        self.assertIn("core_flavour_user_price", plan, plan)
+
+    def test_flavour_time_range_uses_index(self):
+        """Test preparation time filters use the (user, time_minutes) index."""
+        plan = self.get_plan({"time_max": "10"})
+
+        self.assertIn("core_flavour_user_time", plan, plan)
+
+    def test_flavour_any_tag_uses_index(self):
+        """Test filtering by any of some tags semi-joins on the tag index."""
+        plan = self.get_plan({"tags": f"{self.tags[0].id},{self.tags[1].id}"})
+
+        self.assertIn("core_flavour_tags_tag_flavour", plan, plan)
+
+    def test_flavour_all_tags_uses_index(self):
+        """Test filtering by all of some tags semi-joins on the tag index."""
+        tags = f"{self.tags[0].id},{self.tags[1].id}"
+        plan = self.get_plan({"tags": tags, "tags_match": "all"})
+
+        self.assertIn("core_flavour_tags_tag_flavour", plan, plan)
+
+    def test_flavour_combined_filters_use_index(self):
+        """Test tags, price and time filters together use a filter index."""
+        plan = self.get_plan(
+            {"tags": str(self.tags[0].id), "price_max": "5", "time_max": "10"}
+        )
+
+        indexes = [
+            "core_flavour_user_price",
+            "core_flavour_user_time",
+            "core_flavour_tags_tag_flavour",
+        ]
+        self.assertTrue(any(index in plan for index in indexes), plan)
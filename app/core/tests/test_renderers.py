@@ -0,0 +1,135 @@
+"""
+Tests for the orjson renderer and parser.
+"""
+
+import datetime
+import io
+import uuid
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+from core.parsers import ORJSONParser
+from core.renderers import ORJSONRenderer
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    """Test ORJSONRenderer output is byte for byte that of JSONRenderer."""
+
+    def assertSameBytes(self, data, accepted_media_type=None, context=None):
+        """Assert both renderers produce identical bytes for `data`."""
+        expected = JSONRenderer().render(data, accepted_media_type, context)
+        actual = ORJSONRenderer().render(data, accepted_media_type, context)
+
+        self.assertEqual(actual, expected)
+
+    def test_flavour_payload(self):
+        """Test a flavour list page renders identically."""
+        self.assertSameBytes(
+            {
+                "next": None,
+                "previous": None,
+                "results": [
+                    {
+                        "id": 1,
+                        "title": "Mango Lassi",
+                        "price": "10.50",
+                        "time_minutes": 5,
+                        "link": "",
+                        "tags": [{"id": 2, "name": "Süß"}],
+                    }
+                ],
+            }
+        )
+
+    def test_decimal(self):
+        """Test Decimals are rendered as numbers like the stock encoder."""
+        self.assertSameBytes({"price": Decimal("10.50"), "zero": Decimal("0")})
+
+    def test_datetimes(self):
+        """Test datetimes, dates, times and durations match the encoder."""
+        aware = datetime.datetime(
+            2024, 7, 15, 20, 2, 3, 123456, tzinfo=datetime.timezone.utc
+        )
+        self.assertSameBytes(
+            {
+                "aware": aware,
+                "offset": aware.astimezone(
+                    datetime.timezone(datetime.timedelta(hours=5))
+                ),
+                "naive": datetime.datetime(2024, 7, 15, 20, 2, 3),
+                "date": datetime.date(2024, 7, 15),
+                "time": datetime.time(20, 2, 3, 999),
+                "duration": datetime.timedelta(minutes=90),
+            }
+        )
+
+    def test_other_types(self):
+        """Test UUIDs, lazy strings, tuples and non-string keys."""
+        self.assertSameBytes(
+            {
+                "uuid": uuid.UUID(int=1),
+                "lazy": gettext_lazy("This field is required."),
+                "tuple": (1, 2),
+                1: "integer key",
+                "floats": [0.1, 1.5, -2.0],
+            }
+        )
+
+    def test_serializer_data(self):
+        """Test ReturnDict from serializer.data renders identically."""
+        self.assertSameBytes(ReturnDict({"title": "Kulfi"}, serializer=None))
+
+    def test_line_separators_escaped(self):
+        """Test U+2028 and U+2029 are escaped like the stock renderer."""
+        self.assertSameBytes({"title": "a\u2028b\u2029c"})
+
+    def test_big_integers(self):
+        """Test integers orjson can't encode fall back to the stock renderer."""
+        self.assertSameBytes({"id": 2**70})
+
+    def test_indent(self):
+        """Test indented output, as the browsable API asks for, is identical."""
+        data = {"results": [{"id": 1, "title": "Kulfi"}]}
+
+        self.assertSameBytes(data, "application/json; indent=4")
+        self.assertSameBytes(data, context={"indent": 4})
+
+    def test_none(self):
+        """Test no data renders as an empty body."""
+        self.assertEqual(ORJSONRenderer().render(None), b"")
+
+    def test_browsable_api_uses_it(self):
+        """Test the browsable API picks the orjson renderer for its content."""
+        view = type("View", (), {"renderer_classes": [ORJSONRenderer]})()
+
+        renderer = BrowsableAPIRenderer().get_default_renderer(view)
+
+        self.assertIsInstance(renderer, ORJSONRenderer)
+
+
+class ORJSONParserTests(SimpleTestCase):
+    """Test ORJSONParser parses like the stock JSONParser."""
+
+    def parse(self, parser, body):
+        return parser.parse(io.BytesIO(body), "application/json", {})
+
+    def test_parse(self):
+        """Test a bulk payload parses to the same data."""
+        body = '[{"title":"Süß","price":"10.50","time_minutes":5,"x":1.5}]'.encode()
+
+        self.assertEqual(
+            self.parse(ORJSONParser(), body), self.parse(JSONParser(), body)
+        )
+
+    def test_invalid_json_fails(self):
+        """Test malformed JSON, NaN and Infinity raise ParseError."""
+        for body in [b"{", b'{"price": NaN}', b"[Infinity]"]:
+            with self.subTest(body=body):
+                with self.assertRaises(ParseError):
+                    self.parse(ORJSONParser(), body)
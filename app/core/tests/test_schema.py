@@ -0,0 +1,122 @@
+"""
+Tests for the precomputed OpenAPI schema.
+"""
+
+import gzip
+import json
+import os
+import tempfile
+from contextlib import redirect_stderr
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from core.schema import get_schema_path, load_schema
+
+SCHEMA_URL = reverse("api-schema")
+
+
+class SchemaTestCase(SimpleTestCase):
+    """Point API_SCHEMA_DIR at a temporary directory."""
+
+    def setUp(self):
+        self.schema_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.schema_dir.cleanup)
+        settings = override_settings(
+            API_SCHEMA_DIR=self.schema_dir.name, API_VERSION="1.2.3"
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        load_schema.cache_clear()
+        self.addCleanup(load_schema.cache_clear)
+
+    def write_artifacts(self):
+        """Write small YAML and JSON artifacts for the current version."""
+        for schema_format, content in [
+            ("yaml", b"openapi: 3.0.3\n" + b"# padding\n" * 200),
+            ("json", json.dumps({"openapi": "3.0.3", "pad": "x" * 2000}).encode()),
+        ]:
+            with open(get_schema_path(schema_format), "wb") as stream:
+                stream.write(content)
+
+
+class GenerateSchemaCommandTests(SchemaTestCase):
+    """Test the generate_schema management command."""
+
+    def test_writes_versioned_artifacts(self):
+        """Test YAML and JSON artifacts named after the version are written."""
+        with redirect_stderr(StringIO()):
+            call_command("generate_schema", stdout=StringIO())
+
+        with open(os.path.join(self.schema_dir.name, "openapi-1.2.3.json")) as f:
+            schema = json.load(f)
+        self.assertEqual(schema["info"]["version"], "1.2.3")
+        self.assertIn("/api/flavour/flavours/", schema["paths"])
+        self.assertTrue(
+            os.path.exists(os.path.join(self.schema_dir.name, "openapi-1.2.3.yaml"))
+        )
+
+
+class SchemaViewTests(SchemaTestCase):
+    """Test the schema endpoint serves the artifacts from memory."""
+
+    def test_serves_yaml_by_default_and_json_on_request(self):
+        """Test content negotiation between the two artifacts."""
+        self.write_artifacts()
+
+        yaml_response = self.client.get(SCHEMA_URL)
+        json_response = self.client.get(SCHEMA_URL, {"format": "json"})
+        accept_response = self.client.get(SCHEMA_URL, HTTP_ACCEPT="application/json")
+
+        self.assertEqual(yaml_response["Content-Type"], "application/vnd.oai.openapi")
+        self.assertTrue(yaml_response.content.startswith(b"openapi: 3.0.3"))
+        self.assertEqual(json.loads(json_response.content)["openapi"], "3.0.3")
+        self.assertEqual(accept_response.content, json_response.content)
+
+    def test_not_modified(self):
+        """Test a matching If-None-Match answers 304."""
+        self.write_artifacts()
+        etag = self.client.get(SCHEMA_URL)["ETag"]
+
+        response = self.client.get(SCHEMA_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_precompressed(self):
+        """Test gzip clients get the precompressed artifact."""
+        self.write_artifacts()
+        plain = self.client.get(SCHEMA_URL)
+
+        response = self.client.get(SCHEMA_URL, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertEqual(response["ETag"], "W/" + plain["ETag"])
+
+    def test_artifact_read_once(self):
+        """Test the files are only read on the first request."""
+        self.write_artifacts()
+        self.client.get(SCHEMA_URL)
+        os.remove(get_schema_path("yaml"))
+
+        response = self.client.get(SCHEMA_URL)
+
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(DEBUG=True)
+    def test_missing_artifact_generates_live_in_debug(self):
+        """Test DEBUG falls back to generating the schema per request."""
+        with redirect_stderr(StringIO()):
+            response = self.client.get(SCHEMA_URL, {"format": "json"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("/api/flavour/flavours/", json.loads(response.content)["paths"])
+
+    @override_settings(DEBUG=False)
+    def test_missing_artifact_fails_in_production(self):
+        """Test a missing artifact is a 503 outside of DEBUG."""
+        response = self.client.get(SCHEMA_URL)
+
+        self.assertEqual(response.status_code, 503)
@@ -0,0 +1,192 @@
+"""
+Tests for the slow query log.
+"""
+
+import os
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core import slow_queries
+from core.models import Flavour
+from core.slow_queries import fingerprint, read_log, write
+
+
+class SlowQueryLogMixin:
+    """Point SLOW_QUERY_LOG at a temporary directory."""
+
+    def setUp(self):
+        log_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(log_dir.cleanup)
+        self.log = os.path.join(log_dir.name, "slow.log")
+        settings = override_settings(SLOW_QUERY_LOG=self.log)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        slow_queries._explained.clear()
+        self.addCleanup(self.close_handlers)
+
+    def close_handlers(self):
+        """Close the log files opened by the test."""
+        slow_queries.get_handler(self.log).close()
+        slow_queries.get_handler.cache_clear()
+
+
+class FingerprintTests(SimpleTestCase):
+    """Test statements of the same shape share a fingerprint."""
+
+    def test_literals_and_value_lists_normalized(self):
+        """Test literals, placeholders and IN lists are collapsed."""
+        normalized, key = fingerprint(
+            "SELECT * FROM core_flavour WHERE id IN (%s, %s) AND title = 'a'"
+        )
+        _, same_key = fingerprint(
+            "SELECT *  FROM core_flavour\nWHERE id IN (%s) AND title = 'it''s'"
+        )
+        _, other_key = fingerprint("SELECT * FROM core_tag WHERE id IN (%s)")
+
+        self.assertEqual(
+            normalized, "SELECT * FROM core_flavour WHERE id IN (...) AND title = ?"
+        )
+        self.assertEqual(key, same_key)
+        self.assertNotEqual(key, other_key)
+
+
+class SlowQueryMiddlewareTests(SlowQueryLogMixin, TestCase):
+    """Test slow statements of requests are logged with their context."""
+
+    def setUp(self):
+        super().setUp()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com", password="testPass123"
+        )
+        Flavour.objects.create(user=self.user, title="Mango", time_minutes=5, price=1)
+
+    def get_list(self):
+        """Request the flavour list, bypassing the list cache."""
+        cache.clear()
+        client = APIClient()
+        client.force_authenticate(self.user)
+        return client.get(reverse("flavour:flavour-list"))
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0.000001)
+    def test_statement_logged_with_view_stack_and_plan(self):
+        """Test an entry records the view, project frames and the plan."""
+        with self.assertLogs("core.slow_queries", "WARNING"):
+            self.get_list()
+
+        entries = [
+            entry for entry in read_log() if "core_flavour" in entry["normalized"]
+        ]
+        entry = entries[0]
+        self.assertEqual(entry["view"], "flavour:flavour-list")
+        self.assertEqual(entry["method"], "GET")
+        self.assertTrue(any("flavour/" in frame for frame in entry["stack"]))
+        self.assertFalse(any("site-packages" in frame for frame in entry["stack"]))
+        if entry["vendor"] in ("sqlite", "postgresql"):
+            self.assertTrue(entry["explain"])
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0.000001)
+    def test_explain_rate_limited(self):
+        """Test a statement shape is only explained once per interval."""
+        with self.assertLogs("core.slow_queries", "WARNING"):
+            self.get_list()
+            self.get_list()
+
+        by_key = {}
+        for entry in read_log():
+            by_key.setdefault(entry["fingerprint"], []).append(entry["explain"])
+        plans = [plans for plans in by_key.values() if len(plans) == 2]
+        self.assertTrue(plans)
+        for _, second in plans:
+            self.assertIsNone(second)
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0.000001)
+    def test_failed_statement_logged_without_plan(self):
+        """Test a statement that raised is logged unexplained and re-raised."""
+
+        def execute(sql, params, many, context):
+            raise OperationalError("canceling statement due to statement timeout")
+
+        logger = slow_queries.SlowQueryLogger()
+        context = {"connection": connection}
+        with self.assertLogs("core.slow_queries", "WARNING"), self.assertRaises(
+            OperationalError
+        ):
+            logger(execute, "SELECT * FROM core_flavour", [], False, context)
+
+        (entry,) = read_log()
+        self.assertIsNone(entry["explain"])
+        self.assertIn("statement timeout", entry["error"])
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0.000001)
+    def test_unwritable_log_does_not_fail_request(self):
+        """Test a log that can't be written is reported, not raised."""
+        with patch.object(
+            slow_queries, "write", side_effect=OSError("No space left on device")
+        ), self.assertLogs("core.slow_queries", "ERROR"):
+            response = self.get_list()
+
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=60000)
+    def test_fast_statements_not_logged(self):
+        """Test statements under the threshold leave the log empty."""
+        self.get_list()
+
+        self.assertEqual(list(read_log()), [])
+        self.assertFalse(os.path.exists(self.log))
+
+
+class SlowQueriesCommandTests(SlowQueryLogMixin, SimpleTestCase):
+    """Test the slow_queries summary command."""
+
+    def write_entry(self, key, duration, view):
+        """Log one statement with fingerprint `key`."""
+        write(
+            {
+                "fingerprint": key,
+                "normalized": f"SELECT {key}",
+                "duration_ms": duration,
+                "view": view,
+                "path": None,
+                "stack": ["flavour/views.py:10 in list"],
+                "explain": ["SCAN core_flavour"] if view else None,
+            }
+        )
+
+    def test_groups_ranked_by_total_time(self):
+        """Test fingerprints are grouped and the costliest listed first."""
+        self.write_entry("aaaa", 300, "flavour:flavour-list")
+        self.write_entry("aaaa", 300, "flavour:flavour-list")
+        self.write_entry("bbbb", 500, "user:me")
+        out = StringIO()
+
+        call_command("slow_queries", stdout=out)
+
+        lines = out.getvalue().splitlines()
+        rows = [line for line in lines if line.startswith(("aaaa", "bbbb"))]
+        self.assertTrue(rows[0].startswith("aaaa"))
+        self.assertIn("flavour:flavour-list (2)", rows[0])
+        self.assertIn("SCAN core_flavour", out.getvalue())
+
+        out = StringIO()
+        call_command("slow_queries", "--sort", "max", "--top", "1", stdout=out)
+
+        self.assertIn("bbbb", out.getvalue())
+        self.assertNotIn("aaaa", out.getvalue())
+
+    def test_empty_log(self):
+        """Test a missing log is reported."""
+        out = StringIO()
+
+        call_command("slow_queries", stdout=out)
+
+        self.assertIn("No slow queries", out.getvalue())
@@ -0,0 +1,189 @@
+"""
+# app/flavour/caching.py
+Per-user change versions, conditional GET and response caching for
+Flavour APIs.
+"""
+
+import hashlib
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.response import Response
+
+from core.middleware import parse_if_none_match
+
+VERSION_KEY = "flavour:version:{user_id}"
+RESPONSE_KEY = "flavour:response:{etag}"
+LOCK_KEY = "flavour:response-lock:{etag}"
+
+# How often a request waiting on another request's rebuild polls the cache.
+LOCK_POLL_INTERVAL = 0.01
+
+
+def get_version(user_id):
+    """Return the current change version of `user_id`'s flavours.
+
+    Versions are random tokens rather than counters, so a version that was
+    evicted from the cache comes back as a new value and can never match
+    an ETag handed out before.
+    """
+    key = VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(user_id):
+    """Mark every cached representation of `user_id`'s flavours as stale.
+
+    Inside a transaction the bump waits for the commit: a read between an
+    earlier bump and the commit would cache the old rows under the new
+    version and serve them until the next write.
+    """
+    key = VERSION_KEY.format(user_id=user_id)
+    transaction.on_commit(lambda: cache.set(key, uuid.uuid4().hex, timeout=None))
+
+
+# Cache backends whose entries other worker processes can't see.
+PROCESS_LOCAL_BACKENDS = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+
+
+def http_cache_enabled():
+    """Return whether ETags and the response cache are in use.
+
+    Versions bumped in one process must be seen by every worker, so with
+    FLAVOUR_HTTP_CACHE = "auto" a process-local cache backend turns both off.
+    """
+    mode = settings.FLAVOUR_HTTP_CACHE
+    if mode == "auto":
+        return settings.CACHES["default"]["BACKEND"] not in PROCESS_LOCAL_BACKENDS
+    return mode == "on"
+
+
+def make_etag(request):
+    """Return the ETag of the representation `request` asks for."""
+    user_id = request.user.pk
+    raw = ":".join(
+        [
+            str(user_id),
+            get_version(user_id),
+            request.get_full_path(),
+            request.accepted_media_type or "",
+        ]
+    )
+    return '"%s"' % hashlib.md5(raw.encode()).hexdigest()
+
+
+class CachedReadMixin:
+    """Serve list and retrieve from the per-user change version.
+
+    A client whose ETag is current gets a 304. The ETag is derived from
+    the per-user change version only, so a 304 is returned before the
+    queryset or the serializer run. Other reads are served from rendered
+    bytes cached under the ETag; a version bump changes every ETag of the
+    user, which is what invalidates them. Both are skipped unless
+    http_cache_enabled().
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        """Return 304 for a matching If-None-Match, else call `handler`."""
+        if not http_cache_enabled():
+            return handler(request, *args, **kwargs)
+
+        # Read the version before the queryset so a concurrent write can
+        # only ever make the ETag older than the data, never newer.
+        etag = make_etag(request)
+
+        # If-None-Match uses the weak comparison, so the W/ ETags of
+        # compressed responses match too.
+        if_none_match = parse_if_none_match(request.META.get("HTTP_IF_NONE_MATCH", ""))
+        if etag in if_none_match:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+        def build():
+            response = handler(request, *args, **kwargs)
+            return self.finalize_response(request, response, *args, **kwargs)
+
+        response = self.cached_response(request, etag, build)
+        if response.status_code == status.HTTP_200_OK:
+            # '*' matches any current representation, so only a 200 has one.
+            if "*" in if_none_match:
+                return Response(
+                    status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+                )
+            response["ETag"] = etag
+        return response
+
+    def cached_response(self, request, etag, build):
+        """Return the response cached under `etag` or store what `build` makes.
+
+        Only one request rebuilds a missing entry; the others wait for it
+        while the rebuild lock is held, up to
+        FLAVOUR_RESPONSE_CACHE_LOCK_TIMEOUT, and otherwise build their own
+        response without storing it.
+        """
+        ttl = settings.FLAVOUR_RESPONSE_CACHE_TTL
+        # The browsable API embeds the user and a CSRF token, never cache it.
+        if not ttl or request.accepted_renderer.format == "api":
+            return build()
+
+        key = RESPONSE_KEY.format(etag=etag)
+        entry = cache.get(key)
+        if entry is None:
+            lock_key = LOCK_KEY.format(etag=etag)
+            lock_timeout = settings.FLAVOUR_RESPONSE_CACHE_LOCK_TIMEOUT
+            if cache.add(lock_key, True, timeout=lock_timeout):
+                try:
+                    response = build().render()
+                    self.store_response(key, response, ttl)
+                finally:
+                    cache.delete(lock_key)
+                return response
+
+            entry = self.wait_for_entry(key, lock_key, lock_timeout)
+            if entry is None:
+                return build()
+
+        content_type, content = entry
+        return HttpResponse(content, content_type=content_type)
+
+    def store_response(self, key, response, ttl):
+        """Cache the rendered body of a 200 `response` if it isn't too big."""
+        if response.status_code != status.HTTP_200_OK:
+            return
+        if len(response.content) > settings.FLAVOUR_RESPONSE_CACHE_MAX_BYTES:
+            return
+        cache.set(key, (response["Content-Type"], response.content), ttl)
+
+    def wait_for_entry(self, key, lock_key, timeout):
+        """Poll the cache for `key` while `lock_key` is held.
+
+        Gives up after `timeout` seconds, or as soon as the lock is released
+        without an entry, e.g. when the rebuilt response wasn't cacheable.
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+            # The entry is stored before the lock is released.
+            found = cache.get_many([key, lock_key])
+            if key in found:
+                return found[key]
+            if lock_key not in found:
+                return None
+        return None
@@ -0,0 +1,98 @@
+"""
+# app/flavour/exports.py
+Streaming exports of all flavours of a user.
+"""
+
+import csv
+import io
+import json
+from itertools import islice
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+
+from .serializers import FlavourDetailSerializer, get_fast_serializer
+
+CONTENT_TYPES = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def get_serializer():
+    """Return the fast serializer exports are written with."""
+    return get_fast_serializer(FlavourDetailSerializer)
+
+
+def iter_chunks(queryset):
+    """Yield lists of serialized flavours, one per database fetch.
+
+    `.iterator()` uses a server-side cursor on PostgreSQL, so at most one
+    chunk of rows is held in memory at a time.
+    """
+    serializer = get_serializer()
+    chunk_size = settings.FLAVOUR_EXPORT_CHUNK_SIZE
+    rows = serializer.values(queryset).iterator(chunk_size=chunk_size)
+
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield serializer.to_representation(chunk)
+
+
+def dumps(item):
+    """Encode `item` the way the compact JSONRenderer does."""
+    return json.dumps(item, ensure_ascii=False, separators=(",", ":"))
+
+
+def export_json(chunks):
+    """Yield a single JSON array."""
+    yield "["
+    separator = ""
+    for chunk in chunks:
+        yield separator + ",".join(dumps(item) for item in chunk)
+        separator = ","
+    yield "]"
+
+
+def export_ndjson(chunks):
+    """Yield one JSON document per line."""
+    for chunk in chunks:
+        yield "".join(dumps(item) + "\n" for item in chunk)
+
+
+def export_csv(chunks):
+    """Yield CSV with a header row; tag names are joined with '|'."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    header = [name for name, _ in get_serializer().converters]
+    writer.writerow(header)
+
+    for chunk in chunks:
+        for item in chunk:
+            item["tags"] = "|".join(tag["name"] for tag in item["tags"])
+            writer.writerow(item[name] for name in header)
+
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    # Flush the rest, which is just the header when there were no rows.
+    yield buffer.getvalue()
+
+
+EXPORTERS = {
+    "json": export_json,
+    "ndjson": export_ndjson,
+    "csv": export_csv,
+}
+
+
+def export_response(queryset, export_format):
+    """Return a StreamingHttpResponse of `queryset` in `export_format`."""
+    content = EXPORTERS[export_format](iter_chunks(queryset))
+    response = StreamingHttpResponse(content, content_type=CONTENT_TYPES[export_format])
+    response["Content-Disposition"] = f'attachment; filename="flavours.{export_format}"'
+    return response
@@ -0,0 +1,147 @@
+"""
+# app/flavour/filters.py
+Filter backends for Flavour APIs.
+"""
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import Count, F, Q, Value
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import BaseFilterBackend
+
+from core.models import Flavour
+
+from .serializers import FlavourFilterSerializer
+
+# Rows matching a search are ordered by this annotation instead of by id.
+SEARCH_RANK = "search_rank"
+
+SQLITE_MATCH = "SELECT rowid FROM core_flavour_fts WHERE core_flavour_fts MATCH %s"
+SQLITE_RANK = (
+    "SELECT -bm25(core_flavour_fts) FROM core_flavour_fts "
+    "WHERE core_flavour_fts MATCH %s AND rowid = core_flavour.id"
+)
+
+
+def fts5_query(terms):
+    """Quote every term so user input can't use FTS5 query syntax."""
+    return " ".join('"%s"' % term.replace('"', '""') for term in terms.split())
+
+
+class FlavourSearchFilter(BaseFilterBackend):
+    """Ranked full-text search over flavour title and description.
+
+    PostgreSQL matches `?search=` against the trigger-maintained, GIN
+    indexed `search_vector` column using websearch syntax. SQLite uses the
+    FTS5 table created by the same migration and ranks with bm25. Other
+    backends fall back to an unranked case-insensitive substring match.
+    """
+
+    search_param = "search"
+
+    def filter_queryset(self, request, queryset, view):
+        terms = request.query_params.get(self.search_param, "").strip()
+        if not terms:
+            return queryset
+
+        if connection.vendor == "postgresql":
+            query = SearchQuery(terms, config="english", search_type="websearch")
+            queryset = queryset.filter(search_vector=query).annotate(
+                **{SEARCH_RANK: SearchRank(F("search_vector"), query)}
+            )
+        elif connection.vendor == "sqlite":
+            match = fts5_query(terms)
+            queryset = queryset.filter(id__in=RawSQL(SQLITE_MATCH, [match])).annotate(
+                **{SEARCH_RANK: RawSQL(SQLITE_RANK, [match])}
+            )
+        else:
+            queryset = queryset.filter(
+                Q(title__icontains=terms) | Q(description__icontains=terms)
+            ).annotate(**{SEARCH_RANK: Value(1.0)})
+
+        return queryset.order_by(f"-{SEARCH_RANK}", "-id")
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.search_param,
+                "required": False,
+                "in": "query",
+                "description": "Full-text search over title and description; "
+                "results are ordered by relevance.",
+                "schema": {"type": "string"},
+            }
+        ]
+
+
+class FlavourAttributeFilter(BaseFilterBackend):
+    """Filter flavours by tag ids, price range and preparation time.
+
+    `?tags=1,2` keeps flavours with any of the tags, or all of them with
+    `tags_match=all`; both are a semi-join on the (tag_id, flavour_id)
+    index of the through table. `price_min`/`price_max` and
+    `time_min`/`time_max` are inclusive ranges served by the (user, price)
+    and (user, time_minutes) indexes.
+    """
+
+    ranges = {
+        "price_min": "price__gte",
+        "price_max": "price__lte",
+        "time_min": "time_minutes__gte",
+        "time_max": "time_minutes__lte",
+    }
+
+    def filter_queryset(self, request, queryset, view):
+        params = FlavourFilterSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+
+        lookups = {
+            lookup: data[param]
+            for param, lookup in self.ranges.items()
+            if param in data
+        }
+        if lookups:
+            queryset = queryset.filter(**lookups)
+
+        tag_ids = data.get("tags")
+        if tag_ids:
+            queryset = queryset.filter(
+                id__in=self.tagged_flavour_ids(tag_ids, data["tags_match"])
+            )
+        return queryset
+
+    def tagged_flavour_ids(self, tag_ids, match):
+        """Return a subquery of the flavour ids with any or all of `tag_ids`."""
+        links = Flavour.tags.through.objects.filter(tag_id__in=tag_ids)
+        if match == "any":
+            return links.values("flavour_id")
+
+        # (flavour_id, tag_id) is unique, so a flavour has all tags when it
+        # has as many matching links as there are tags.
+        return (
+            links.values("flavour_id")
+            .annotate(matched=Count("tag_id"))
+            .filter(matched=len(tag_ids))
+            .values("flavour_id")
+        )
+
+    def get_schema_operation_parameters(self, view):
+        descriptions = {
+            "tags": ("string", "Comma separated tag ids."),
+            "tags_match": ("string", "Match 'any' (default) or 'all' of the tags."),
+            "price_min": ("number", "Minimum price, inclusive."),
+            "price_max": ("number", "Maximum price, inclusive."),
+            "time_min": ("integer", "Minimum time in minutes, inclusive."),
+            "time_max": ("integer", "Maximum time in minutes, inclusive."),
+        }
+        return [
+            {
+                "name": name,
+                "required": False,
+                "in": "query",
+                "description": description,
+                "schema": {"type": schema_type},
+            }
+            for name, (schema_type, description) in descriptions.items()
+        ]
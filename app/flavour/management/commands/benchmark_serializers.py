@@ -0,0 +1,83 @@
+"""
+Django command to compare flavour list serializer throughput.
+"""
+
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+
+from core.management.commands.benchmark_renderers import best_of
+from core.models import Flavour
+
+from ...serializers import FastFlavourListSerializer, FlavourSerializer
+
+
+def make_rows(count):
+    """Return `count` synthetic rows shaped like FlavourSerializer input."""
+    return [
+        {
+            "id": i,
+            "title": f"Flavour {i}",
+            "price": Decimal(i % 1000) / 10,
+            "time_minutes": i % 120,
+            "link": f"https://example.com/flavours/{i}",
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+class FastListSerializer(FastFlavourListSerializer):
+    """Fast serializer whose tags come from memory instead of the database."""
+
+    def get_tags(self, flavour_ids):
+        return {}
+
+
+class Command(BaseCommand):
+    """Django command to benchmark flavour list serialization."""
+
+    help = "Compare FlavourSerializer with the fast list serializer."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=int,
+            nargs="+",
+            default=[1000, 10000, 100000],
+            help="Row counts to serialize.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="Runs per size; the fastest one is reported.",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        fast = FastListSerializer(FlavourSerializer)
+
+        self.stdout.write(
+            f"{'rows':>8} {'serializer rows/s':>18} {'fast rows/s':>12} {'speedup':>8}"
+        )
+        for size in options["sizes"]:
+            rows = make_rows(size)
+
+            def model_serializer():
+                # Instantiating models is part of the cost the fast path avoids.
+                flavours = []
+                for row in rows:
+                    flavour = Flavour(**row)
+                    flavour._prefetched_objects_cache = {"tags": []}
+                    flavours.append(flavour)
+                return FlavourSerializer(flavours, many=True).data
+
+            def fast_serializer():
+                return fast.to_representation(rows)
+
+            slow = best_of(model_serializer, options["repeat"])
+            quick = best_of(fast_serializer, options["repeat"])
+            self.stdout.write(
+                f"{size:>8} {size / slow:>18,.0f} {size / quick:>12,.0f}"
+                f" {slow / quick:>7.1f}x"
+            )
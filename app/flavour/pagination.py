@@ -0,0 +1,73 @@
+"""
+# app/flavour/pagination.py
+Pagination classes for Flavour APIs.
+"""
+
+from django.conf import settings
+from rest_framework.pagination import Cursor, CursorPagination
+
+from .filters import SEARCH_RANK
+
+
+class FlavourCursorPagination(CursorPagination):
+    """Keyset pagination over the '-id' ordering of the flavour list.
+
+    The cursor only encodes the last seen id, so every page is a single
+    'WHERE id < <cursor> ORDER BY id DESC LIMIT <page_size>' query and
+    rows inserted while a client is paging never shift later pages.
+    """
+
+    ordering = "-id"
+    page_size_query_param = "page_size"
+
+    def get_page_size(self, request):
+        """Read page size limits from settings so they can be tuned per deploy."""
+        self.page_size = settings.FLAVOUR_PAGE_SIZE
+        self.max_page_size = settings.FLAVOUR_MAX_PAGE_SIZE
+        return super().get_page_size(request)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Page search results by an offset kept in the cursor.
+
+        A keyset cursor needs a unique, stable ordering; relevance is a
+        float the database recomputes on every query and that need not
+        compare equal to the value a client sends back. Ranked results are
+        sorted in full to cut any page, so skipping to an offset adds
+        little, and the usual offset cutoff doesn't apply.
+        """
+        self.offset = None
+        if SEARCH_RANK not in queryset.query.annotations:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.base_url = request.build_absolute_uri()
+        self.request = request
+        self.offset_cutoff = None
+        cursor = self.decode_cursor(request)
+        self.offset = cursor.offset if cursor else 0
+
+        # One extra row tells whether there is a next page.
+        results = list(queryset[self.offset : self.offset + self.page_size + 1])
+        self.page = results[: self.page_size]
+        self.has_next = len(results) > self.page_size
+        self.has_previous = self.offset > 0
+        return self.page
+
+    def get_next_link(self):
+        if self.offset is None:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        return self.encode_cursor(
+            Cursor(offset=self.offset + self.page_size, reverse=False, position=None)
+        )
+
+    def get_previous_link(self):
+        if self.offset is None:
+            return super().get_previous_link()
+        if not self.has_previous:
+            return None
+        offset = max(self.offset - self.page_size, 0)
+        return self.encode_cursor(Cursor(offset=offset, reverse=False, position=None))
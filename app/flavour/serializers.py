@@ -3,19 +3,145 @@
 Serializers for recipe APIs.
 """
 
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.translation import gettext as _
 from rest_framework import serializers
 
-from core.models import Flavour
+from core.models import Flavour, Tag
+
+from .caching import bump_version
+
+
+class TagSerializer(serializers.ModelSerializer):
+    """Serializer for Tag API."""
+
+    class Meta:
+        model = Tag
+        fields = ["id", "name"]
+        read_only_fields = ["id"]
+
+    def validate_name(self, value):
+        """Reject a name the user already has, unless nested in a flavour."""
+        if self.parent is not None:
+            return value
+
+        queryset = Tag.objects.filter(user=self.context["request"].user, name=value)
+        if self.instance is not None:
+            queryset = queryset.exclude(pk=self.instance.pk)
+        if queryset.exists():
+            raise serializers.ValidationError(_("Tag with this name already exists."))
+
+        return value
+
+
+def set_flavour_tags(user, flavour_tags, replace=True):
+    """Link each flavour in `flavour_tags` to its list of nested tag dicts.
+
+    `flavour_tags` is a list of (flavour, tags) pairs; pairs whose tags are
+    None are left alone. Tag names across all flavours are resolved in one
+    batch and the links are written with one bulk insert, plus one delete
+    of the old links when `replace` is set.
+    """
+    flavour_tags = [
+        (flavour, tags) for flavour, tags in flavour_tags if tags is not None
+    ]
+    if not flavour_tags:
+        return
+
+    names = {tag["name"] for flavour, tags in flavour_tags for tag in tags}
+    resolved = Tag.objects.resolve(user, names)
+
+    FlavourTags = Flavour.tags.through
+    links = {
+        (flavour.pk, resolved[tag["name"]].pk)
+        for flavour, tags in flavour_tags
+        for tag in tags
+    }
+    with transaction.atomic():
+        if replace:
+            FlavourTags.objects.filter(
+                flavour_id__in=[flavour.pk for flavour, tags in flavour_tags]
+            ).delete()
+        FlavourTags.objects.bulk_create(
+            [FlavourTags(flavour_id=f_id, tag_id=t_id) for f_id, t_id in links],
+            ignore_conflicts=True,
+        )
+
+    for flavour, tags in flavour_tags:
+        # Drop tags prefetched before the links changed.
+        flavour._prefetched_objects_cache = {}
+    # Writing the through table directly doesn't send m2m_changed.
+    bump_version(user.pk)
+
+
+def select_fields(query_params, allowed, default):
+    """Return the field names picked by `?fields=` and `?exclude=`.
+
+    `fields` replaces `default` with a subset of `allowed` and `exclude`
+    removes names from the result. The names come back in `allowed` order.
+    """
+    selected = set(default)
+    errors = {}
+    for param in ["fields", "exclude"]:
+        if param not in query_params:
+            continue
+        names = {name for name in query_params[param].split(",") if name}
+        unknown = names - set(allowed)
+        if unknown:
+            errors[param] = [
+                _("Unknown fields: %(names)s.") % {"names": ", ".join(sorted(unknown))}
+            ]
+        elif param == "fields":
+            selected = names
+        else:
+            selected -= names
+
+    if errors:
+        raise serializers.ValidationError(errors)
+    return tuple(name for name in allowed if name in selected)
 
 
 class FlavourSerializer(serializers.ModelSerializer):
-    """Serializer for Flavour API."""
+    """Serializer for Flavour API.
+
+    Pass `fields` to render only a subset of the declared fields.
+    """
+
+    tags = TagSerializer(many=True, required=False)
 
     class Meta:
         model = Flavour
-        fields = ["id", "title", "price", "time_minutes", "link"]
+        fields = ["id", "title", "price", "time_minutes", "link", "tags"]
         read_only_fields = ["id"]
 
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    def create(self, validated_data):
+        """Create a flavour together with its nested tags."""
+        tags = validated_data.pop("tags", [])
+        with transaction.atomic():
+            flavour = Flavour.objects.create(**validated_data)
+            set_flavour_tags(flavour.user, [(flavour, tags)], replace=False)
+
+        return flavour
+
+    def update(self, instance, validated_data):
+        """Update a flavour, replacing its tags if they were provided."""
+        tags = validated_data.pop("tags", None)
+        with transaction.atomic():
+            instance = super().update(instance, validated_data)
+            set_flavour_tags(instance.user, [(instance, tags)])
+
+        return instance
+
 
 class FlavourDetailSerializer(FlavourSerializer):
     """Serializes single flavour details."""
@@ -24,3 +150,148 @@ class FlavourDetailSerializer(FlavourSerializer):
         """Inherite attributes from 'cls: FlavourSerializer' to build this class."""
 
         fields = FlavourSerializer.Meta.fields + ["description"]
+
+
+class FastFlavourListSerializer:
+    """Read-only serializer producing `serializer_class` output from .values() rows.
+
+    Converters are compiled once from the fields of `serializer_class`:
+    integer and char columns come out of the database in their output type
+    and pass through, the rest (price) go through the field's own
+    to_representation, so the rendered JSON is identical. Nested tags are
+    read with one query on the through table. `fields` narrows both the
+    columns read and the output, like the `fields` of FlavourSerializer.
+    """
+
+    def __init__(self, serializer_class, fields=None):
+        self.converters = []
+        for name, field in serializer_class(fields=fields).fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, (serializers.IntegerField, serializers.CharField)):
+                self.converters.append((name, None))
+            else:
+                self.converters.append((name, field.to_representation))
+
+        self.columns = [name for name, _ in self.converters if name != "tags"]
+        self.with_tags = len(self.columns) != len(self.converters)
+        if "id" not in self.columns:
+            # Tags are looked up and pages are cut by flavour id, even when
+            # it isn't rendered.
+            self.columns.append("id")
+
+    def values(self, queryset):
+        """Return `queryset` narrowed to the columns this serializer reads."""
+        return queryset.prefetch_related(None).values(*self.columns)
+
+    def get_tags(self, flavour_ids):
+        """Return a dict of flavour id -> list of serialized tags."""
+        tags = defaultdict(list)
+        links = (
+            Flavour.tags.through.objects.filter(flavour_id__in=flavour_ids)
+            .order_by("tag_id")
+            .values_list("flavour_id", "tag_id", "tag__name")
+        )
+        for flavour_id, tag_id, name in links:
+            tags[flavour_id].append({"id": tag_id, "name": name})
+        return tags
+
+    def to_representation(self, rows):
+        """Convert .values() `rows` to a list of output dicts."""
+        tags = {}
+        if self.with_tags:
+            tags = self.get_tags([row["id"] for row in rows])
+
+        data = []
+        for row in rows:
+            item = {}
+            for name, convert in self.converters:
+                if name == "tags":
+                    item[name] = tags.get(row["id"], [])
+                    continue
+                value = row[name]
+                if convert is not None and value is not None:
+                    value = convert(value)
+                item[name] = value
+            data.append(item)
+        return data
+
+
+@lru_cache(maxsize=None)
+def get_fast_serializer(serializer_class, fields=None):
+    """Return the compiled FastFlavourListSerializer for `serializer_class`.
+
+    `fields` must be hashable, a tuple as returned by select_fields().
+    """
+    return FastFlavourListSerializer(serializer_class, fields)
+
+
+# Largest value a BigAutoField primary key can hold.
+MAX_ID = 2**63 - 1
+
+
+class FlavourBulkDeleteSerializer(serializers.Serializer):
+    """Serializes the id list of a bulk flavour delete."""
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1, max_value=MAX_ID)
+    )
+
+
+def parse_ids(value, message):
+    """Return the ids of comma separated `value`, in order, without repeats.
+
+    Raises a ValidationError with `message` if an id isn't a number, and
+    when one is outside the range of a primary key.
+    """
+    try:
+        ids = list(dict.fromkeys(int(i) for i in value.split(",") if i))
+    except ValueError:
+        raise serializers.ValidationError(message)
+    if any(not 1 <= i <= MAX_ID for i in ids):
+        raise serializers.ValidationError(
+            _("Ensure every id is between 1 and %(max)d.") % {"max": MAX_ID}
+        )
+    return ids
+
+
+class FlavourMultiGetSerializer(serializers.Serializer):
+    """Validates the `ids` query param of a flavour multi-get."""
+
+    ids = serializers.CharField()
+
+    def validate_ids(self, value):
+        """Convert comma separated ids to a list without repeats, in order."""
+        ids = parse_ids(value, _("Expected a comma separated list of flavour ids."))
+
+        max_ids = settings.FLAVOUR_MULTI_GET_MAX_IDS
+        if len(ids) > max_ids:
+            raise serializers.ValidationError(
+                _("Ensure there are no more than %(max)d ids.") % {"max": max_ids}
+            )
+        return ids
+
+
+class FlavourFilterSerializer(serializers.Serializer):
+    """Validates the query params of the flavour list filters."""
+
+    tags = serializers.CharField(required=False)
+    tags_match = serializers.ChoiceField(choices=["any", "all"], default="any")
+    price_min = serializers.DecimalField(max_digits=5, decimal_places=2, required=False)
+    price_max = serializers.DecimalField(max_digits=5, decimal_places=2, required=False)
+    time_min = serializers.IntegerField(required=False)
+    time_max = serializers.IntegerField(required=False)
+
+    def validate_tags(self, value):
+        """Convert a comma separated list of tag ids to a set of ints."""
+        return set(parse_ids(value, _("Expected a comma separated list of tag ids.")))
+
+    def validate(self, attrs):
+        """Reject ranges whose minimum is above their maximum."""
+        for name in ["price", "time"]:
+            low, high = attrs.get(f"{name}_min"), attrs.get(f"{name}_max")
+            if low is not None and high is not None and low > high:
+                raise serializers.ValidationError(
+                    {f"{name}_min": _("Must not be greater than the maximum.")}
+                )
+        return attrs
@@ -0,0 +1,27 @@
+"""
+# app/flavour/signals.py
+Signal handlers keeping Flavour API caches in step with the database.
+"""
+
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from core.models import Flavour, Tag
+
+from .caching import bump_version
+
+
+@receiver(post_save, sender=Flavour)
+@receiver(post_delete, sender=Flavour)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def bump_version_on_write(sender, instance, **kwargs):
+    """Bump the owner's change version when a flavour or tag changes."""
+    bump_version(instance.user_id)
+
+
+@receiver(m2m_changed, sender=Flavour.tags.through)
+def bump_version_on_tags_changed(sender, instance, action, **kwargs):
+    """Bump the owner's change version when flavour tags are changed."""
+    if action in ("post_add", "post_remove", "post_clear"):
+        bump_version(instance.user_id)
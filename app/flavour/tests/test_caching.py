@@ -0,0 +1,267 @@
+"""
+Tests for conditional GET and caching of flavour APIs.
+"""
+
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Tag
+
+from ..caching import LOCK_KEY, RESPONSE_KEY, http_cache_enabled
+from .test_flavour_api import (
+    FLAVOUR_URL,
+    create_flavour,
+    create_user,
+    flavour_detail_url,
+)
+
+
+@override_settings(FLAVOUR_HTTP_CACHE="on")
+class ConditionalGetTests(TestCase):
+    """Test ETags and 304 responses on flavour list and detail."""
+
+    def setUp(self):
+        """Setting up testing environment."""
+        cache.clear()
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.flavour = create_flavour(user=self.user)
+
+    def assertNotModified(self, url, etag):
+        """Assert `url` answers 304 for `etag` without touching the DB."""
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+    def assertModified(self, url, etag):
+        """Assert `url` answers 200 with a new ETag for `etag`."""
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_list_not_modified(self):
+        """Test list answers 304 while nothing changed."""
+        etag = self.client.get(FLAVOUR_URL)["ETag"]
+
+        self.assertNotModified(FLAVOUR_URL, etag)
+
+    def test_detail_not_modified(self):
+        """Test detail answers 304 while nothing changed."""
+        url = flavour_detail_url(self.flavour.id)
+        etag = self.client.get(url)["ETag"]
+
+        self.assertNotModified(url, etag)
+
+    def test_create_update_delete_change_etag(self):
+        """Test every flavour write invalidates earlier ETags."""
+        etag = self.client.get(FLAVOUR_URL)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            other = create_flavour(user=self.user, title="Other")
+        self.assertModified(FLAVOUR_URL, etag)
+
+        etag = self.client.get(FLAVOUR_URL)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(flavour_detail_url(other.id), {"title": "Changed"})
+        self.assertModified(FLAVOUR_URL, etag)
+
+        etag = self.client.get(FLAVOUR_URL)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(flavour_detail_url(other.id))
+        self.assertModified(FLAVOUR_URL, etag)
+
+    def test_etag_changes_after_commit(self):
+        """Test a write only changes the ETag once its transaction commits."""
+        etag = self.client.get(FLAVOUR_URL)["ETag"]
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            create_flavour(user=self.user, title="Other")
+        self.assertNotModified(FLAVOUR_URL, etag)
+
+        for callback in callbacks:
+            callback()
+        self.assertModified(FLAVOUR_URL, etag)
+
+    def test_tag_changes_change_etag(self):
+        """Test adding a tag to a flavour invalidates earlier ETags."""
+        tag = Tag.objects.create(user=self.user, name="Vegan")
+        url = flavour_detail_url(self.flavour.id)
+        etag = self.client.get(url)["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.flavour.tags.add(tag)
+
+        self.assertModified(url, etag)
+
+    def test_any_etag_needs_a_representation(self):
+        """Test If-None-Match: * is a 304 only for what would be a 200."""
+        url = flavour_detail_url(self.flavour.id)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH="*")
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = self.client.get(flavour_detail_url(99999), HTTP_IF_NONE_MATCH="*")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.get(
+            FLAVOUR_URL, {"fields": "secret"}, HTTP_IF_NONE_MATCH="*"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_other_user_writes_keep_etag(self):
+        """Test another user's writes don't invalidate this user's ETag."""
+        etag = self.client.get(FLAVOUR_URL)["ETag"]
+
+        other_user = create_user(email="other@example.com")
+        create_flavour(user=other_user)
+
+        self.assertNotModified(FLAVOUR_URL, etag)
+
+    def test_etag_differs_per_query(self):
+        """Test different query strings get different ETags."""
+        first = self.client.get(FLAVOUR_URL)["ETag"]
+        second = self.client.get(FLAVOUR_URL, {"page_size": 1})["ETag"]
+
+        self.assertNotEqual(first, second)
+
+
+@override_settings(FLAVOUR_HTTP_CACHE="on")
+class ResponseCacheTests(TestCase):
+    """Test rendered flavour responses are cached and invalidated."""
+
+    def setUp(self):
+        """Setting up testing environment."""
+        cache.clear()
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.flavour = create_flavour(user=self.user)
+
+    def test_repeated_read_served_from_cache(self):
+        """Test a repeated list read runs no query and returns same bytes."""
+        first = self.client.get(FLAVOUR_URL)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(FLAVOUR_URL)
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second["Content-Type"], first["Content-Type"])
+        self.assertEqual(second["ETag"], first["ETag"])
+
+    def test_write_invalidates_cached_detail(self):
+        """Test an update is visible on the next detail read."""
+        url = flavour_detail_url(self.flavour.id)
+        self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(url, {"title": "Changed"})
+        response = self.client.get(url)
+
+        self.assertEqual(response.json()["title"], "Changed")
+
+    def test_tag_rename_invalidates_cache(self):
+        """Test renaming a tag of the user drops their cached responses."""
+        tag = Tag.objects.create(user=self.user, name="Vegan")
+        first = self.client.get(FLAVOUR_URL)
+
+        tag.name = "Vegetarian"
+        with self.captureOnCommitCallbacks(execute=True):
+            tag.save()
+        second = self.client.get(FLAVOUR_URL)
+
+        self.assertNotEqual(first["ETag"], second["ETag"])
+
+    def test_browsable_api_not_cached(self):
+        """Test HTML responses are never cached."""
+        self.client.get(FLAVOUR_URL, HTTP_ACCEPT="text/html")
+
+        with self.assertNumQueries(2):
+            self.client.get(FLAVOUR_URL, HTTP_ACCEPT="text/html")
+
+    @override_settings(FLAVOUR_RESPONSE_CACHE_MAX_BYTES=10)
+    def test_large_responses_not_cached(self):
+        """Test bodies over the size limit are not stored."""
+        self.client.get(FLAVOUR_URL)
+
+        with self.assertNumQueries(2):
+            self.client.get(FLAVOUR_URL)
+
+    @override_settings(FLAVOUR_RESPONSE_CACHE_TTL=0)
+    def test_cache_can_be_disabled(self):
+        """Test a TTL of 0 turns the response cache off."""
+        self.client.get(FLAVOUR_URL)
+
+        with self.assertNumQueries(2):
+            self.client.get(FLAVOUR_URL)
+
+    def test_waits_for_concurrent_rebuild(self):
+        """Test a request that loses the rebuild lock waits for the entry."""
+        first = self.client.get(FLAVOUR_URL)
+        key = RESPONSE_KEY.format(etag=first["ETag"])
+        cache.delete(key)
+
+        def rebuilt_elsewhere(seconds):
+            cache.set(key, (first["Content-Type"], b"rebuilt"))
+
+        with patch("flavour.caching.cache.add", return_value=False), patch(
+            "flavour.caching.time.sleep", side_effect=rebuilt_elsewhere
+        ), self.assertNumQueries(0):
+            response = self.client.get(FLAVOUR_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, b"rebuilt")
+        self.assertIsNone(cache.get(LOCK_KEY.format(etag=first["ETag"])))
+
+    def test_stops_waiting_when_lock_released(self):
+        """Test waiting ends once the rebuild lock is gone without an entry."""
+        first = self.client.get(FLAVOUR_URL)
+        lock_key = LOCK_KEY.format(etag=first["ETag"])
+        cache.delete(RESPONSE_KEY.format(etag=first["ETag"]))
+        cache.set(lock_key, True)
+
+        # The lock holder finishes without storing its response.
+        with patch(
+            "flavour.caching.time.sleep", side_effect=lambda _: cache.delete(lock_key)
+        ) as sleep:
+            response = self.client.get(FLAVOUR_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(sleep.call_count, 1)
+
+
+class HttpCacheSwitchTests(TestCase):
+    """Test ETags and the response cache need a cache shared by workers."""
+
+    def setUp(self):
+        """Setting up testing environment."""
+        cache.clear()
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    @override_settings(FLAVOUR_HTTP_CACHE="auto")
+    def test_auto_off_with_process_local_cache(self):
+        """Test "auto" serves no ETags with the default LocMemCache."""
+        response = self.client.get(FLAVOUR_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.has_header("ETag"))
+        self.assertFalse(http_cache_enabled())
+
+    def test_auto_on_with_shared_cache(self):
+        """Test "auto" turns them on for a backend other processes see."""
+        backend = "django.core.cache.backends.memcached.PyMemcacheCache"
+        caches = {"default": {"BACKEND": backend, "LOCATION": "cache:11211"}}
+
+        with override_settings(FLAVOUR_HTTP_CACHE="auto", CACHES=caches):
+            self.assertTrue(http_cache_enabled())
+        with override_settings(FLAVOUR_HTTP_CACHE="off", CACHES=caches):
+            self.assertFalse(http_cache_enabled())
@@ -0,0 +1,124 @@
+"""
+Tests for streaming flavour exports.
+"""
+
+import csv
+import io
+import json
+import tracemalloc
+
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Flavour, Tag
+
+from .test_flavour_api import create_flavour, create_user
+
+EXPORT_URL = reverse("flavour:flavour-export")
+
+
+def read(response):
+    """Consume a streaming response and return its text."""
+    return b"".join(response.streaming_content).decode()
+
+
+class FlavourExportTests(TestCase):
+    """Test exporting flavours in each format."""
+
+    def setUp(self):
+        """Setting up testing environment."""
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.flavour = create_flavour(user=self.user, title="Mango, Lassi")
+        self.flavour.tags.add(
+            Tag.objects.create(user=self.user, name="Drink"),
+            Tag.objects.create(user=self.user, name="Sweet"),
+        )
+        create_flavour(user=create_user(email="other@example.com"))
+
+    def test_export_json(self):
+        """Test JSON export is an array of the user's flavours."""
+        response = self.client.get(EXPORT_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/json")
+        data = json.loads(read(response))
+        self.assertEqual(len(data), 1)
+        self.assertEqual(data[0]["title"], "Mango, Lassi")
+        self.assertEqual(data[0]["price"], "10.50")
+        self.assertEqual(data[0]["description"], self.flavour.description)
+        self.assertEqual([tag["name"] for tag in data[0]["tags"]], ["Drink", "Sweet"])
+
+    def test_export_ndjson(self):
+        """Test NDJSON export has one flavour per line."""
+        create_flavour(user=self.user, title="Second")
+
+        response = self.client.get(EXPORT_URL, {"type": "ndjson"})
+
+        lines = read(response).splitlines()
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(
+            [json.loads(line)["title"] for line in lines], ["Second", "Mango, Lassi"]
+        )
+
+    def test_export_csv(self):
+        """Test CSV export has a header and joined tag names."""
+        response = self.client.get(EXPORT_URL, {"type": "csv"})
+
+        rows = list(csv.DictReader(io.StringIO(read(response))))
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["title"], "Mango, Lassi")
+        self.assertEqual(rows[0]["tags"], "Drink|Sweet")
+
+    def test_export_empty_csv_has_header(self):
+        """Test a user without flavours still gets a CSV header."""
+        Flavour.objects.filter(user=self.user).delete()
+
+        response = self.client.get(EXPORT_URL, {"type": "csv"})
+
+        self.assertTrue(read(response).startswith("id,title,price"))
+
+    def test_unknown_type_fails(self):
+        """Test an unknown export type is rejected."""
+        response = self.client.get(EXPORT_URL, {"type": "xml"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class FlavourExportMemoryTests(TestCase):
+    """Test exports keep memory bounded for large catalogs."""
+
+    ROWS = 200_000
+
+    def test_export_peak_memory_is_bounded(self):
+        """Test exporting 200k flavours never holds them all in memory."""
+        user = create_user()
+        # Generate the rows inside the database; bulk_create would dominate.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO core_flavour"
+                " (user_id, title, time_minutes, price, description, link)"
+                " WITH RECURSIVE seq(i) AS"
+                " (SELECT 1 UNION ALL SELECT i + 1 FROM seq WHERE i < %s)"
+                " SELECT %s, 'Flavour ' || i, i %% 120, 4.20, %s, '' FROM seq",
+                [self.ROWS, user.id, "A reasonably long description " * 4],
+            )
+        client = APIClient()
+        client.force_authenticate(user)
+
+        tracemalloc.start()
+        try:
+            response = client.get(EXPORT_URL, {"type": "ndjson"})
+            lines = sum(chunk.count(b"\n") for chunk in response.streaming_content)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(lines, self.ROWS)
+        # The full export is ~40MB of text; a few chunks fit well under this.
+        self.assertLess(peak, 16 * 1024 * 1024)
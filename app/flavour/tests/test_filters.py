@@ -0,0 +1,104 @@
+"""
+Tests for filtering flavours by tags, price and preparation time.
+"""
+
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Tag
+
+from .test_flavour_api import FLAVOUR_URL, create_flavour, create_user
+
+
+def result_titles(response):
+    """Return the titles of a paginated list response."""
+    return sorted(item["title"] for item in response.data["results"])
+
+
+class FlavourFilterTests(TestCase):
+    """Test the attribute filters of the flavour list."""
+
+    def setUp(self):
+        """Setting up testing environment."""
+        cache.clear()
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        self.vegan = Tag.objects.create(user=self.user, name="Vegan")
+        self.sweet = Tag.objects.create(user=self.user, name="Sweet")
+        self.sorbet = create_flavour(
+            user=self.user, title="Sorbet", price=Decimal("4.00"), time_minutes=5
+        )
+        self.sorbet.tags.add(self.vegan, self.sweet)
+        self.kulfi = create_flavour(
+            user=self.user, title="Kulfi", price=Decimal("6.00"), time_minutes=30
+        )
+        self.kulfi.tags.add(self.sweet)
+        create_flavour(
+            user=self.user, title="Dal", price=Decimal("3.00"), time_minutes=40
+        ).tags.add(self.vegan)
+
+    def test_filter_by_any_tag(self):
+        """Test flavours with any of the given tags are returned once."""
+        response = self.client.get(
+            FLAVOUR_URL, {"tags": f"{self.vegan.id},{self.sweet.id}"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(result_titles(response), ["Dal", "Kulfi", "Sorbet"])
+
+    def test_filter_by_all_tags(self):
+        """Test tags_match=all only returns flavours with every tag."""
+        response = self.client.get(
+            FLAVOUR_URL,
+            {"tags": f"{self.vegan.id},{self.sweet.id}", "tags_match": "all"},
+        )
+
+        self.assertEqual(result_titles(response), ["Sorbet"])
+
+    def test_filter_by_price_range(self):
+        """Test price_min and price_max are inclusive bounds."""
+        response = self.client.get(FLAVOUR_URL, {"price_min": "4", "price_max": "6"})
+
+        self.assertEqual(result_titles(response), ["Kulfi", "Sorbet"])
+
+    def test_filter_by_time_range(self):
+        """Test time_min and time_max are inclusive bounds."""
+        response = self.client.get(FLAVOUR_URL, {"time_max": "30"})
+
+        self.assertEqual(result_titles(response), ["Kulfi", "Sorbet"])
+
+    def test_filters_combine(self):
+        """Test 'tagged sweet under 5 in under 10 minutes' style questions."""
+        response = self.client.get(
+            FLAVOUR_URL,
+            {"tags": str(self.sweet.id), "price_max": "5", "time_max": "10"},
+        )
+
+        self.assertEqual(result_titles(response), ["Sorbet"])
+
+    def test_filters_combine_with_search(self):
+        """Test attribute filters narrow down search results."""
+        response = self.client.get(FLAVOUR_URL, {"search": "sample", "price_min": "5"})
+
+        self.assertEqual(result_titles(response), ["Kulfi"])
+
+    def test_invalid_filters_fail(self):
+        """Test malformed filter values are rejected with a 400."""
+        for params in [
+            {"tags": "1,vegan"},
+            {"tags": "-1"},
+            {"tags": "99999999999999999999999"},
+            {"tags_match": "some"},
+            {"price_min": "cheap"},
+            {"time_min": "50", "time_max": "10"},
+        ]:
+            with self.subTest(params=params):
+                response = self.client.get(FLAVOUR_URL, params)
+
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -2,19 +2,29 @@
 Tests for flavour APIs.
 """
 
+import json
 from decimal import Decimal
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.db.models import Prefetch
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
 
-from core.models import Flavour
+from core.models import Flavour, Tag
 
-from ..serializers import FlavourDetailSerializer, FlavourSerializer
+from ..serializers import (
+    FastFlavourListSerializer,
+    FlavourDetailSerializer,
+    FlavourSerializer,
+)
 
 FLAVOUR_URL = reverse("flavour:flavour-list")
+BULK_URL = reverse("flavour:flavour-bulk-create")
+MULTI_GET_URL = reverse("flavour:flavour-multi-get")
 
 
 def flavour_detail_url(flavour_id):
@@ -65,6 +75,7 @@ class PrivateFlavourAPITests(TestCase):
 
     def setUp(self):
         """Setting up testing environrment."""
+        cache.clear()
         self.user = create_user()
         self.client = APIClient()
         self.client.force_authenticate(self.user)
@@ -79,7 +90,7 @@ class PrivateFlavourAPITests(TestCase):
         serializer = FlavourSerializer(flavour, many=True)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data, serializer.data)
+        self.assertEqual(response.data["results"], serializer.data)
 
     def test_retrive_flavour_for_user(self):
         """Test retrieving flavour for specific user."""
@@ -99,7 +110,7 @@ class PrivateFlavourAPITests(TestCase):
         serializer = FlavourSerializer(db_flavour_data, many=True)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data, serializer.data)
+        self.assertEqual(response.data["results"], serializer.data)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
@@ -229,3 +240,461 @@ class PrivateFlavourAPITests(TestCase):
 
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
         self.assertTrue(is_flavour_present)
+
+
+@override_settings(FLAVOUR_PAGE_SIZE=2, FLAVOUR_MAX_PAGE_SIZE=3)
+class FlavourPaginationTests(TestCase):
+    """Test cursor pagination of the flavour list endpoint."""
+
+    def setUp(self):
+        """Setting up testing environment."""
+        cache.clear()
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_list_is_paginated_with_cursor(self):
+        """Test list returns a page of flavours and an opaque next cursor."""
+        flavours = [create_flavour(user=self.user, title=f"F{i}") for i in range(5)]
+
+        response = self.client.get(FLAVOUR_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["id"] for item in response.data["results"]],
+            [flavours[4].id, flavours[3].id],
+        )
+        self.assertIsNone(response.data["previous"])
+        self.assertIn("cursor=", response.data["next"])
+
+    def test_walking_all_pages(self):
+        """Test following next cursors returns every flavour exactly once."""
+        flavours = [create_flavour(user=self.user, title=f"F{i}") for i in range(5)]
+
+        seen = []
+        url = FLAVOUR_URL
+        while url:
+            response = self.client.get(url)
+            seen.extend(item["id"] for item in response.data["results"])
+            url = response.data["next"]
+
+        self.assertEqual(seen, [flavour.id for flavour in reversed(flavours)])
+
+    def test_pages_stable_during_inserts(self):
+        """Test rows inserted while paging do not shift the next page."""
+        flavours = [create_flavour(user=self.user, title=f"F{i}") for i in range(4)]
+
+        first = self.client.get(FLAVOUR_URL)
+        create_flavour(user=self.user, title="Inserted")
+        second = self.client.get(first.data["next"])
+
+        self.assertEqual(
+            [item["id"] for item in second.data["results"]],
+            [flavours[1].id, flavours[0].id],
+        )
+
+    def test_page_size_param_is_capped(self):
+        """Test 'page_size' query param is honoured up to the maximum."""
+        for i in range(5):
+            create_flavour(user=self.user, title=f"F{i}")
+
+        response = self.client.get(FLAVOUR_URL, {"page_size": 1})
+        self.assertEqual(len(response.data["results"]), 1)
+
+        response = self.client.get(FLAVOUR_URL, {"page_size": 100})
+        self.assertEqual(len(response.data["results"]), 3)
+
+
+@override_settings(FLAVOUR_BULK_MAX_ITEMS=3)
+class BulkFlavourAPITests(TestCase):
+    """Test bulk create, update and delete of flavours."""
+
+    def setUp(self):
+        """Setting up testing environment."""
+        cache.clear()
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_bulk_create(self):
+        """Test creating several flavours in one request."""
+        payload = [
+            {"title": "First", "time_minutes": 5, "price": "1.50"},
+            {"title": "Second", "time_minutes": 10, "price": "2.50"},
+        ]
+
+        response = self.client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        flavours = Flavour.objects.filter(user=self.user).order_by("id")
+        self.assertEqual([f.title for f in flavours], ["First", "Second"])
+        self.assertEqual(
+            [item["id"] for item in response.data], [f.id for f in flavours]
+        )
+
+    def test_bulk_create_reports_errors_per_item(self):
+        """Test an invalid item fails the batch with errors at its index."""
+        payload = [
+            {"title": "First", "time_minutes": 5, "price": "1.50"},
+            {"title": "Second", "price": "2.50"},
+        ]
+
+        response = self.client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn("time_minutes", response.data[1])
+        self.assertFalse(Flavour.objects.exists())
+
+    def test_bulk_create_over_limit_fails(self):
+        """Test batches bigger than the maximum are rejected."""
+        payload = [
+            {"title": f"F{i}", "time_minutes": 5, "price": "1.50"} for i in range(4)
+        ]
+
+        response = self.client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Flavour.objects.exists())
+
+    def test_bulk_update(self):
+        """Test partially updating several flavours by id."""
+        first = create_flavour(user=self.user, title="First")
+        second = create_flavour(user=self.user, title="Second")
+        payload = [
+            {"id": first.id, "title": "First updated"},
+            {"id": second.id, "time_minutes": 99},
+        ]
+
+        response = self.client.patch(BULK_URL, payload, format="json")
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.title, "First updated")
+        self.assertEqual(second.time_minutes, 99)
+
+    def test_bulk_update_other_user_flavour_fails(self):
+        """Test flavours of another user can't be updated in bulk."""
+        other_user = create_user(email="other@example.com")
+        mine = create_flavour(user=self.user, title="Mine")
+        theirs = create_flavour(user=other_user, title="Theirs")
+        payload = [
+            {"id": mine.id, "title": "Changed"},
+            {"id": theirs.id, "title": "Changed"},
+        ]
+
+        response = self.client.patch(BULK_URL, payload, format="json")
+
+        mine.refresh_from_db()
+        theirs.refresh_from_db()
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn("id", response.data[1])
+        self.assertEqual(mine.title, "Mine")
+        self.assertEqual(theirs.title, "Theirs")
+
+    def test_bulk_delete(self):
+        """Test deleting own flavours by id and reporting missing ids."""
+        other_user = create_user(email="other@example.com")
+        mine = create_flavour(user=self.user)
+        theirs = create_flavour(user=other_user)
+
+        response = self.client.delete(
+            BULK_URL, {"ids": [mine.id, theirs.id]}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["deleted"], [mine.id])
+        self.assertEqual(response.data["missing"], [theirs.id])
+        self.assertFalse(Flavour.objects.filter(id=mine.id).exists())
+        self.assertTrue(Flavour.objects.filter(id=theirs.id).exists())
+
+    @override_settings(FLAVOUR_HTTP_CACHE="on")
+    def test_bulk_create_invalidates_list_cache(self):
+        """Test flavours created in bulk show up in the next list read."""
+        self.client.get(FLAVOUR_URL)
+        payload = [{"title": "New", "time_minutes": 5, "price": "1.50"}]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(BULK_URL, payload, format="json")
+        response = self.client.get(FLAVOUR_URL)
+
+        self.assertEqual(len(response.json()["results"]), 1)
+
+    def test_bulk_delete_out_of_range_ids_fail(self):
+        """Test ids outside the primary key range return a 400."""
+        for ids in [[0], [2**63]]:
+            with self.subTest(ids=ids):
+                response = self.client.delete(BULK_URL, {"ids": ids}, format="json")
+
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(FLAVOUR_HTTP_CACHE="on")
+    def test_bulk_delete_invalidates_list_cache(self):
+        """Test flavours deleted in bulk are gone from the next list read."""
+        flavour = create_flavour(user=self.user)
+        self.client.get(FLAVOUR_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(BULK_URL, {"ids": [flavour.id]}, format="json")
+        response = self.client.get(FLAVOUR_URL)
+
+        self.assertEqual(response.json()["results"], [])
+
+
+@override_settings(FLAVOUR_MULTI_GET_MAX_IDS=3)
+class MultiGetFlavourAPITests(TestCase):
+    """Test fetching many flavours by id in one request."""
+
+    def setUp(self):
+        """Setting up testing environment."""
+        cache.clear()
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_multi_get_keeps_input_order(self):
+        """Test details are returned in the order the ids were given."""
+        first = create_flavour(user=self.user, title="First")
+        second = create_flavour(user=self.user, title="Second")
+
+        response = self.client.get(MULTI_GET_URL, {"ids": f"{second.id},{first.id}"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        expected = FlavourDetailSerializer([second, first], many=True).data
+        self.assertEqual(response.data["results"], expected)
+        self.assertEqual(response.data["missing"], [])
+
+    def test_multi_get_reports_missing(self):
+        """Test unknown ids and other users' flavours are reported missing."""
+        flavour = create_flavour(user=self.user)
+        other = create_flavour(user=create_user(email="other@example.com"))
+
+        response = self.client.get(
+            MULTI_GET_URL, {"ids": f"{other.id},{flavour.id},999999"}
+        )
+
+        self.assertEqual(
+            [item["id"] for item in response.data["results"]], [flavour.id]
+        )
+        self.assertEqual(response.data["missing"], [other.id, 999999])
+
+    def test_multi_get_query_count_constant(self):
+        """Test flavours and their tags are read with one query each."""
+        ids = []
+        for i in range(3):
+            flavour = create_flavour(user=self.user, title=f"F{i}")
+            flavour.tags.add(Tag.objects.create(user=self.user, name=f"T{i}"))
+            ids.append(str(flavour.id))
+
+        with self.assertNumQueries(2):
+            self.client.get(MULTI_GET_URL, {"ids": ",".join(ids)})
+
+    def test_multi_get_sparse_fields(self):
+        """Test ?fields= narrows multi-get results too."""
+        flavour = create_flavour(user=self.user)
+
+        response = self.client.get(
+            MULTI_GET_URL, {"ids": str(flavour.id), "fields": "id,title"}
+        )
+
+        self.assertEqual(
+            response.data["results"], [{"id": flavour.id, "title": flavour.title}]
+        )
+
+    def test_multi_get_invalid_ids_fail(self):
+        """Test missing, malformed, out of range and too many ids return a 400."""
+        for params in [
+            {},
+            {"ids": "1,two"},
+            {"ids": "1,2,3,4"},
+            {"ids": "0"},
+            {"ids": "99999999999999999999999"},
+        ]:
+            with self.subTest(params=params):
+                response = self.client.get(MULTI_GET_URL, params)
+
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class FlavourTagsAPITests(TestCase):
+    """Test nested tags on flavours."""
+
+    def setUp(self):
+        """Setting up testing environment."""
+        cache.clear()
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_create_flavour_with_new_tags(self):
+        """Test creating a flavour creates its new tags."""
+        payload = {
+            "title": "Mango Lassi",
+            "time_minutes": 10,
+            "price": "2.50",
+            "tags": [{"name": "Drink"}, {"name": "Sweet"}],
+        }
+
+        response = self.client.post(FLAVOUR_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        flavour = Flavour.objects.get(id=response.data["id"])
+        self.assertEqual(
+            sorted(tag.name for tag in flavour.tags.all()), ["Drink", "Sweet"]
+        )
+
+    def test_create_flavour_with_existing_tag(self):
+        """Test creating a flavour reuses the user's existing tag."""
+        tag = Tag.objects.create(user=self.user, name="Drink")
+        payload = {
+            "title": "Mango Lassi",
+            "time_minutes": 10,
+            "price": "2.50",
+            "tags": [{"name": "Drink"}],
+        }
+
+        response = self.client.post(FLAVOUR_URL, payload, format="json")
+
+        flavour = Flavour.objects.get(id=response.data["id"])
+        self.assertEqual(list(flavour.tags.all()), [tag])
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 1)
+
+    def test_update_flavour_tags(self):
+        """Test updating a flavour replaces its tags."""
+        flavour = create_flavour(user=self.user)
+        flavour.tags.add(Tag.objects.create(user=self.user, name="Breakfast"))
+
+        response = self.client.patch(
+            flavour_detail_url(flavour.id),
+            {"tags": [{"name": "Lunch"}]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([tag.name for tag in flavour.tags.all()], ["Lunch"])
+
+    def test_clear_flavour_tags(self):
+        """Test an empty tag list clears a flavour's tags."""
+        flavour = create_flavour(user=self.user)
+        flavour.tags.add(Tag.objects.create(user=self.user, name="Breakfast"))
+
+        self.client.patch(flavour_detail_url(flavour.id), {"tags": []}, format="json")
+
+        self.assertFalse(flavour.tags.exists())
+
+    def test_list_query_count_constant(self):
+        """Test listing flavours takes the same queries for any tag count."""
+        for count in (3, 10):
+            cache.clear()
+            for i in range(count):
+                flavour = create_flavour(user=self.user, title=f"F{count}-{i}")
+                flavour.tags.add(
+                    *[
+                        Tag.objects.create(user=self.user, name=f"T{count}-{i}-{j}")
+                        for j in range(3)
+                    ]
+                )
+
+            # One query for the page of flavours, one for all of their tags.
+            with self.assertNumQueries(2):
+                response = self.client.get(FLAVOUR_URL)
+
+            self.assertEqual(len(response.data["results"][0]["tags"]), 3)
+
+    def test_bulk_create_with_tags(self):
+        """Test bulk created flavours get their nested tags."""
+        payload = [
+            {"title": "A", "time_minutes": 5, "price": "1.50", "tags": [{"name": "X"}]},
+            {"title": "B", "time_minutes": 5, "price": "1.50", "tags": [{"name": "X"}]},
+        ]
+
+        response = self.client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(response.data[0]["tags"][0]["name"], "X")
+
+    def test_create_query_count_independent_of_tags(self):
+        """Test creating a flavour takes the same queries for any tag count."""
+        Tag.objects.create(user=self.user, name="Existing")
+
+        for count in (2, 20):
+            payload = {
+                "title": f"Flavour {count}",
+                "time_minutes": 10,
+                "price": "2.50",
+                "tags": [{"name": "Existing"}]
+                + [{"name": f"New {count}-{i}"} for i in range(count)],
+            }
+
+            # Insert flavour, read tags, insert missing tags, read them back,
+            # insert links and read tags for the response, plus 4 savepoint
+            # statements from the nested atomic blocks.
+            with self.assertNumQueries(10):
+                response = self.client.post(FLAVOUR_URL, payload, format="json")
+
+            self.assertEqual(len(response.data["tags"]), count + 1)
+
+    def test_bulk_create_resolves_tags_once(self):
+        """Test bulk created flavours share one batch of tag queries."""
+        Tag.objects.create(user=self.user, name="Shared")
+        payload = [
+            {
+                "title": f"F{i}",
+                "time_minutes": 5,
+                "price": "1.50",
+                "tags": [{"name": "Shared"}, {"name": f"Own {i}"}],
+            }
+            for i in range(5)
+        ]
+
+        response = self.client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 6)
+        self.assertEqual(Flavour.tags.through.objects.count(), 10)
+
+
+class FastFlavourListSerializerTests(TestCase):
+    """Test the fast list path renders exactly like FlavourSerializer."""
+
+    def setUp(self):
+        """Create flavours with awkward prices and some tags."""
+        self.user = create_user()
+        tags = [Tag.objects.create(user=self.user, name=f"T{i}") for i in range(3)]
+        for i, price in enumerate(["0", "1.5", "10.50", "999.99", "3.10"]):
+            flavour = create_flavour(
+                user=self.user, title=f"F{i}", price=Decimal(price), link=""
+            )
+            flavour.tags.add(*tags[i % 3 :])
+
+    def test_same_json_as_model_serializer(self):
+        """Test both serializers render byte for byte the same JSON."""
+        queryset = Flavour.objects.filter(user=self.user).order_by("-id")
+        fast = FastFlavourListSerializer(FlavourSerializer)
+
+        expected = FlavourSerializer(
+            queryset.prefetch_related(
+                Prefetch("tags", queryset=Tag.objects.order_by("id"))
+            ),
+            many=True,
+        ).data
+        actual = fast.to_representation(list(fast.values(queryset)))
+
+        self.assertEqual(JSONRenderer().render(actual), JSONRenderer().render(expected))
+
+    def test_list_endpoint_uses_fast_path(self):
+        """Test the list endpoint matches FlavourSerializer output."""
+        cache.clear()
+        client = APIClient()
+        client.force_authenticate(self.user)
+        queryset = Flavour.objects.filter(user=self.user).order_by("-id")
+
+        response = client.get(FLAVOUR_URL)
+
+        expected = FlavourSerializer(queryset, many=True).data
+        self.assertEqual(
+            response.json()["results"], json.loads(JSONRenderer().render(expected))
+        )
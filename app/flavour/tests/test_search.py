@@ -0,0 +1,131 @@
+"""
+Tests for full-text search of flavours.
+"""
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Flavour
+
+from .test_flavour_api import FLAVOUR_URL, create_flavour, create_user
+
+
+def result_titles(response):
+    """Return the titles of a paginated list response."""
+    return [item["title"] for item in response.data["results"]]
+
+
+class FlavourSearchTests(TestCase):
+    """Test the 'search' query param of the flavour list."""
+
+    def setUp(self):
+        """Setting up testing environment."""
+        cache.clear()
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_search_matches_title_and_description(self):
+        """Test search finds words in either the title or the description."""
+        create_flavour(user=self.user, title="Mango Lassi", description="Sweet")
+        create_flavour(user=self.user, title="Kulfi", description="Frozen mango")
+        create_flavour(user=self.user, title="Masala Chai", description="Spiced")
+
+        response = self.client.get(FLAVOUR_URL, {"search": "mango"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertCountEqual(result_titles(response), ["Mango Lassi", "Kulfi"])
+
+    def test_search_requires_every_term(self):
+        """Test a multi-word search only matches flavours with all words."""
+        create_flavour(user=self.user, title="Mango Lassi")
+        create_flavour(user=self.user, title="Sweet Lassi")
+
+        response = self.client.get(FLAVOUR_URL, {"search": "mango lassi"})
+
+        self.assertEqual(result_titles(response), ["Mango Lassi"])
+
+    def test_search_results_are_ranked(self):
+        """Test flavours matching the terms more often come first."""
+        create_flavour(user=self.user, title="Chai", description="Mango aroma")
+        create_flavour(user=self.user, title="Mango", description="Mango mango")
+
+        response = self.client.get(FLAVOUR_URL, {"search": "mango"})
+
+        self.assertEqual(result_titles(response), ["Mango", "Chai"])
+        self.assertIsNone(response.data["next"])
+        self.assertIsNone(response.data["previous"])
+
+    def test_search_pages_through_every_match(self):
+        """Test next and previous links page through more than one page."""
+        for i in range(5):
+            create_flavour(user=self.user, title=f"Mango {i}")
+        create_flavour(user=self.user, title="Chai")
+
+        first = self.client.get(FLAVOUR_URL, {"search": "mango", "page_size": 2})
+        self.assertIsNone(first.data["previous"])
+        titles, response = result_titles(first), first
+        while response.data["next"]:
+            response = self.client.get(response.data["next"])
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            titles += result_titles(response)
+
+        self.assertCountEqual(titles, [f"Mango {i}" for i in range(5)])
+        previous = self.client.get(response.data["previous"]).json()["results"]
+        self.assertEqual([item["title"] for item in previous], titles[2:4])
+
+    def test_search_limited_to_user(self):
+        """Test search never returns another user's flavours."""
+        other_user = create_user(email="other@example.com")
+        create_flavour(user=other_user, title="Mango Lassi")
+
+        response = self.client.get(FLAVOUR_URL, {"search": "mango"})
+
+        self.assertEqual(result_titles(response), [])
+
+    def test_search_index_follows_updates_and_deletes(self):
+        """Test edited and deleted flavours are searched by current content."""
+        flavour = create_flavour(user=self.user, title="Mango Lassi")
+        deleted = create_flavour(user=self.user, title="Mango Kulfi")
+
+        flavour.title = "Rose Lassi"
+        flavour.save()
+        deleted.delete()
+
+        self.assertEqual(
+            result_titles(self.client.get(FLAVOUR_URL, {"search": "mango"})), []
+        )
+        self.assertEqual(
+            result_titles(self.client.get(FLAVOUR_URL, {"search": "rose"})),
+            ["Rose Lassi"],
+        )
+
+    def test_search_syntax_is_not_interpreted(self):
+        """Test quotes and operators in the search are treated as text."""
+        create_flavour(user=self.user, title="Mango Lassi")
+
+        response = self.client.get(FLAVOUR_URL, {"search": 'mango" OR "*'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(FLAVOUR_PAGE_SIZE=2)
+    def test_search_returns_top_page(self):
+        """Test search returns at most one page of the best matches."""
+        for i in range(3):
+            create_flavour(user=self.user, title=f"Mango {i}")
+
+        response = self.client.get(FLAVOUR_URL, {"search": "mango"})
+
+        self.assertEqual(len(response.data["results"]), 2)
+
+    def test_blank_search_lists_everything(self):
+        """Test an empty search param is ignored."""
+        create_flavour(user=self.user, title="Mango Lassi")
+        create_flavour(user=self.user, title="Masala Chai")
+
+        response = self.client.get(FLAVOUR_URL, {"search": " "})
+
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertEqual(Flavour.objects.count(), 2)
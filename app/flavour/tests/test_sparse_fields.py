@@ -0,0 +1,131 @@
+"""
+Tests for sparse fieldsets on flavour list and detail.
+"""
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Tag
+
+from .test_flavour_api import (
+    FLAVOUR_URL,
+    create_flavour,
+    create_user,
+    flavour_detail_url,
+)
+
+
+class SparseFieldsTests(TestCase):
+    """Test ?fields= and ?exclude= narrow the SELECT and the output."""
+
+    def setUp(self):
+        """Setting up testing environment."""
+        cache.clear()
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.flavour = create_flavour(user=self.user, description="Long text")
+        self.flavour.tags.add(Tag.objects.create(user=self.user, name="Vegan"))
+
+    def get(self, url, params=None):
+        """GET `url` and return the response and the SQL it ran."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        return response, " ".join(query["sql"] for query in queries)
+
+    def test_list_defers_description_by_default(self):
+        """Test the list never reads or renders description by default."""
+        response, sql = self.get(FLAVOUR_URL)
+
+        self.assertNotIn("description", response.data["results"][0])
+        self.assertNotIn('"description"', sql)
+
+    def test_list_fields(self):
+        """Test ?fields= limits list items and columns to the given fields."""
+        response, sql = self.get(FLAVOUR_URL, {"fields": "id,title"})
+
+        self.assertEqual(
+            response.data["results"],
+            [{"id": self.flavour.id, "title": self.flavour.title}],
+        )
+        self.assertNotIn('"price"', sql)
+        self.assertNotIn("core_flavour_tags", sql)
+
+    def test_list_can_ask_for_description(self):
+        """Test lists include description when it is requested."""
+        response, _ = self.get(FLAVOUR_URL, {"fields": "title,description"})
+
+        self.assertEqual(
+            response.data["results"],
+            [{"title": self.flavour.title, "description": "Long text"}],
+        )
+
+    def test_list_tags_without_id(self):
+        """Test tags are rendered even when the id isn't."""
+        response, _ = self.get(FLAVOUR_URL, {"fields": "title,tags"})
+
+        item = response.data["results"][0]
+        self.assertEqual(list(item), ["title", "tags"])
+        self.assertEqual([tag["name"] for tag in item["tags"]], ["Vegan"])
+
+    def test_list_fields_without_id_pages(self):
+        """Test pages can be followed when neither id nor tags are rendered."""
+        for i in range(4):
+            create_flavour(user=self.user, title=f"Flavour {i}")
+
+        titles, url, params = [], FLAVOUR_URL, {"fields": "title", "page_size": 2}
+        while url:
+            response, _ = self.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertTrue(
+                all(list(item) == ["title"] for item in response.data["results"])
+            )
+            titles += [item["title"] for item in response.data["results"]]
+            url, params = response.data["next"], None
+
+        self.assertEqual(len(titles), 5)
+        self.assertEqual(len(set(titles)), 5)
+
+    def test_detail_fields(self):
+        """Test ?fields= on detail skips the description column and tags."""
+        response, sql = self.get(
+            flavour_detail_url(self.flavour.id), {"fields": "id,title"}
+        )
+
+        self.assertEqual(
+            response.data, {"id": self.flavour.id, "title": "Sample Title Name"}
+        )
+        self.assertNotIn('"description"', sql)
+        self.assertNotIn("core_flavour_tags", sql)
+
+    def test_detail_exclude(self):
+        """Test ?exclude= drops fields from the full detail representation."""
+        response, sql = self.get(
+            flavour_detail_url(self.flavour.id), {"exclude": "description,tags"}
+        )
+
+        self.assertEqual(
+            list(response.data), ["id", "title", "price", "time_minutes", "link"]
+        )
+        self.assertNotIn('"description"', sql)
+
+    def test_unknown_field_fails(self):
+        """Test naming a field that doesn't exist returns a 400."""
+        for params in [{"fields": "id,secret"}, {"exclude": "user"}]:
+            with self.subTest(params=params):
+                response, _ = self.get(FLAVOUR_URL, params)
+
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_writes_return_every_field(self):
+        """Test ?fields= doesn't narrow the response of an update."""
+        url = flavour_detail_url(self.flavour.id)
+
+        response = self.client.patch(f"{url}?fields=id", {"title": "Changed"})
+
+        self.assertEqual(response.data["title"], "Changed")
+        self.assertIn("description", response.data)
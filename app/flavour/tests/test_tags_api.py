@@ -0,0 +1,97 @@
+"""
+Tests for tag APIs.
+"""
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Tag
+
+from ..serializers import TagSerializer
+from .test_flavour_api import create_user
+
+TAGS_URL = reverse("flavour:tag-list")
+
+
+def tag_detail_url(tag_id):
+    """Returns custom tag URL."""
+    return reverse("flavour:tag-detail", args=[tag_id])
+
+
+class PublicTagsAPITests(TestCase):
+    """Test case of Tag API for un-authorized user."""
+
+    def setUp(self):
+        """Setting up test environment."""
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        """Test auth is required for retrieving tags."""
+        response = self.client.get(TAGS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateTagsAPITests(TestCase):
+    """Test cases of Tag API for authorized user."""
+
+    def setUp(self):
+        """Setting up testing environment."""
+        cache.clear()
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_retrieve_tags(self):
+        """Test retrieving a list of tags."""
+        Tag.objects.create(user=self.user, name="Vegan")
+        Tag.objects.create(user=self.user, name="Dessert")
+
+        response = self.client.get(TAGS_URL)
+
+        tags = Tag.objects.all().order_by("-name")
+        serializer = TagSerializer(tags, many=True)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, serializer.data)
+
+    def test_tags_limited_to_user(self):
+        """Test list of tags is limited to authenticated user."""
+        other_user = create_user(email="other@example.com")
+        Tag.objects.create(user=other_user, name="Fruity")
+        tag = Tag.objects.create(user=self.user, name="Comfort Food")
+
+        response = self.client.get(TAGS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]["name"], tag.name)
+        self.assertEqual(response.data[0]["id"], tag.id)
+
+    def test_create_tag(self):
+        """Test creating a tag."""
+        response = self.client.post(TAGS_URL, {"name": "Spicy"})
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Tag.objects.filter(user=self.user, name="Spicy").exists())
+
+    def test_update_tag(self):
+        """Test updating a tag."""
+        tag = Tag.objects.create(user=self.user, name="After Dinner")
+
+        response = self.client.patch(tag_detail_url(tag.id), {"name": "Dessert"})
+
+        tag.refresh_from_db()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(tag.name, "Dessert")
+
+    def test_delete_tag(self):
+        """Test deleting a tag."""
+        tag = Tag.objects.create(user=self.user, name="Breakfast")
+
+        response = self.client.delete(tag_detail_url(tag.id))
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Tag.objects.filter(id=tag.id).exists())
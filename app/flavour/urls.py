@@ -5,10 +5,11 @@ URls mapping for Flavour API.
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import FlavourViewSet
+from .views import FlavourViewSet, TagViewSet
 
 router = DefaultRouter()
 router.register("flavours", FlavourViewSet)
+router.register("tags", TagViewSet)
 
 app_name = "flavour"
 
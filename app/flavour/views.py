@@ -1,27 +1,110 @@
 from django.shortcuts import render
 
 # Create your views here.
-from rest_framework import viewsets
-from rest_framework.authentication import TokenAuthentication
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Prefetch, prefetch_related_objects
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
-from core.models import Flavour
+from core.models import Flavour, Tag
+from core.profiling import ProfileMixin
+from user.authentication import (
+    CachedTokenAuthentication,
+    SignedTokenAuthentication,
+)
 
-from .serializers import FlavourDetailSerializer, FlavourSerializer
+from .caching import CachedReadMixin, bump_version
+from .exports import EXPORTERS, export_response
+from .filters import FlavourAttributeFilter, FlavourSearchFilter
+from .pagination import FlavourCursorPagination
+from .serializers import (
+    FlavourBulkDeleteSerializer,
+    FlavourDetailSerializer,
+    FlavourMultiGetSerializer,
+    FlavourSerializer,
+    TagSerializer,
+    get_fast_serializer,
+    select_fields,
+    set_flavour_tags,
+)
 
 
-class FlavourViewSet(viewsets.ModelViewSet):
+class FastListMixin:
+    """List through FastFlavourListSerializer instead of the ModelSerializer."""
+
+    def list(self, request, *args, **kwargs):
+        serializer = self.get_fast_serializer()
+        queryset = serializer.values(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer.to_representation(page))
+
+        return Response(serializer.to_representation(list(queryset)))
+
+    def get_fast_serializer(self):
+        """Return the fast serializer the list is rendered with."""
+        return get_fast_serializer(self.get_serializer_class())
+
+
+class FlavourViewSet(
+    ProfileMixin, CachedReadMixin, FastListMixin, viewsets.ModelViewSet
+):
     """View for managing Flavour API."""
 
     serializer_class = FlavourSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication, SignedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = FlavourCursorPagination
+    filter_backends = [FlavourAttributeFilter, FlavourSearchFilter]
 
     queryset = Flavour.objects.all()
 
+    # Actions whose output can be narrowed with ?fields= and ?exclude=.
+    sparse_actions = ["list", "retrieve", "multi_get"]
+
     def get_queryset(self):
         """Return flavour query only for authenticated user."""
-        return self.queryset.filter(user=self.request.user).order_by("-id")
+        queryset = self.queryset.filter(user=self.request.user).order_by("-id")
+        if self.action not in self.sparse_actions:
+            return queryset.defer("search_vector").prefetch_related(
+                self.tags_prefetch()
+            )
+
+        # Read only the columns that will be rendered; lists leave out
+        # the unbounded description unless it is asked for.
+        fields = self.get_sparse_fields()
+        queryset = queryset.only("id", *[name for name in fields if name != "tags"])
+        if "tags" in fields:
+            queryset = queryset.prefetch_related(self.tags_prefetch())
+        return queryset
+
+    def get_sparse_fields(self):
+        """Return the names of the fields to render for a read action."""
+        if not hasattr(self, "_sparse_fields"):
+            self._sparse_fields = select_fields(
+                self.request.query_params,
+                allowed=FlavourDetailSerializer.Meta.fields,
+                default=self.get_serializer_class().Meta.fields,
+            )
+        return self._sparse_fields
+
+    def get_serializer(self, *args, **kwargs):
+        """Prune the serializer to the requested fields on read actions."""
+        if self.action in self.sparse_actions:
+            kwargs.setdefault("fields", self.get_sparse_fields())
+        return super().get_serializer(*args, **kwargs)
+
+    def get_fast_serializer(self):
+        """Return the fast serializer for the requested fields."""
+        return get_fast_serializer(FlavourDetailSerializer, self.get_sparse_fields())
+
+    def tags_prefetch(self):
+        """Prefetch tags in id order, the order the fast list path uses too."""
+        return Prefetch("tags", queryset=Tag.objects.order_by("id"))
 
     def get_serializer_class(self):
         """Overrides the above 'serializer_class' and returns serializer class depending on list or detail request."""
@@ -32,3 +115,166 @@ class FlavourViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         """Override default create method for creating Flavour through API."""
         serializer.save(user=self.request.user)
+
+    @action(detail=False, methods=["get"], url_path="export")
+    def export(self, request):
+        """Stream every flavour of the user as JSON, NDJSON or CSV."""
+        export_format = request.query_params.get("type", "json")
+        if export_format not in EXPORTERS:
+            msg = f"Unknown export type, expected one of: {', '.join(EXPORTERS)}."
+            return Response({"detail": msg}, status=status.HTTP_400_BAD_REQUEST)
+
+        return export_response(self.filter_queryset(self.get_queryset()), export_format)
+
+    @action(detail=False, methods=["get"], url_path="multi")
+    def multi_get(self, request):
+        """Return the details of the user's flavours in `?ids=`, in that order."""
+        return self.conditional_response(self.get_many, request)
+
+    def get_many(self, request):
+        """Build the multi-get response; ids the user can't see are missing."""
+        params = FlavourMultiGetSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        ids = params.validated_data["ids"]
+
+        flavours = self.get_queryset().in_bulk(ids)
+        found = [flavours[i] for i in ids if i in flavours]
+        return Response(
+            {
+                "results": self.get_serializer(found, many=True).data,
+                "missing": [i for i in ids if i not in flavours],
+            }
+        )
+
+    def check_batch_size(self, items):
+        """Return a 400 response if `items` isn't a list within the limit."""
+        max_items = settings.FLAVOUR_BULK_MAX_ITEMS
+        if not isinstance(items, list) or not items:
+            msg = "Expected a non-empty list of items."
+        elif len(items) > max_items:
+            msg = f"Ensure this list has no more than {max_items} items."
+        else:
+            return None
+        return Response({"detail": msg}, status=status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk_create(self, request):
+        """Create a list of flavours in one transaction."""
+        error = self.check_batch_size(request.data)
+        if error:
+            return error
+
+        serializer = self.get_serializer(data=request.data, many=True)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        tags = [item.pop("tags", []) for item in serializer.validated_data]
+        flavours = [
+            Flavour(user=request.user, **item) for item in serializer.validated_data
+        ]
+        with transaction.atomic():
+            if connection.features.can_return_rows_from_bulk_insert:
+                Flavour.objects.bulk_create(flavours)
+            else:
+                # Without INSERT ... RETURNING there is no way to learn the
+                # new ids from a multi-row insert, so save row by row.
+                for flavour in flavours:
+                    flavour.save()
+            set_flavour_tags(request.user, zip(flavours, tags), replace=False)
+        bump_version(request.user.pk)
+        prefetch_related_objects(flavours, self.tags_prefetch())
+
+        data = self.get_serializer(flavours, many=True).data
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    @bulk_create.mapping.patch
+    def bulk_update(self, request):
+        """Partially update a list of the user's flavours, matched by id."""
+        error = self.check_batch_size(request.data)
+        if error:
+            return error
+
+        ids = [item.get("id") for item in request.data if isinstance(item, dict)]
+        flavours = self.get_queryset().in_bulk(
+            [flavour_id for flavour_id in ids if isinstance(flavour_id, int)]
+        )
+
+        serializers, errors = [], []
+        for item in request.data:
+            flavour = flavours.get(item.get("id")) if isinstance(item, dict) else None
+            if flavour is None:
+                errors.append({"id": ["Flavour not found."]})
+                continue
+
+            serializer = self.get_serializer(flavour, data=item, partial=True)
+            serializer.is_valid()
+            serializers.append(serializer)
+            errors.append(serializer.errors)
+
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        fields, tags = set(), []
+        for serializer in serializers:
+            validated_data = dict(serializer.validated_data)
+            tags.append(validated_data.pop("tags", None))
+            for attr, value in validated_data.items():
+                setattr(serializer.instance, attr, value)
+                fields.add(attr)
+
+        updated = [serializer.instance for serializer in serializers]
+        with transaction.atomic():
+            if fields:
+                Flavour.objects.bulk_update(updated, sorted(fields))
+            set_flavour_tags(request.user, zip(updated, tags))
+        bump_version(request.user.pk)
+        prefetch_related_objects(updated, self.tags_prefetch())
+
+        return Response(self.get_serializer(updated, many=True).data)
+
+    @bulk_create.mapping.delete
+    def bulk_delete(self, request):
+        """Delete the user's flavours in the given id list."""
+        serializer = FlavourBulkDeleteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data["ids"]
+
+        error = self.check_batch_size(ids)
+        if error:
+            return error
+
+        with transaction.atomic():
+            queryset = self.get_queryset().filter(id__in=ids)
+            deleted = set(queryset.values_list("id", flat=True))
+            queryset.delete()
+
+        return Response(
+            {
+                "deleted": [i for i in ids if i in deleted],
+                "missing": [i for i in ids if i not in deleted],
+            }
+        )
+
+
+class TagViewSet(
+    mixins.ListModelMixin,
+    mixins.CreateModelMixin,
+    mixins.UpdateModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    """View for managing Tag API."""
+
+    serializer_class = TagSerializer
+    authentication_classes = [CachedTokenAuthentication, SignedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    queryset = Tag.objects.all()
+
+    def get_queryset(self):
+        """Return tags only for authenticated user."""
+        return self.queryset.filter(user=self.request.user).order_by("-name")
+
+    def perform_create(self, serializer):
+        """Create the tag for the authenticated user."""
+        serializer.save(user=self.request.user)
@@ -0,0 +1,177 @@
+"""
+Authentication classes for the API.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext as _
+from rest_framework import exceptions
+from rest_framework.authentication import (
+    BaseAuthentication,
+    TokenAuthentication,
+    get_authorization_header,
+)
+
+from . import tokens
+
+
+class TokenCache:
+    """Bounded LRU cache of token key -> (user, token) with a TTL per entry.
+
+    Signed tokens have no key of their own, so SignedTokenAuthentication
+    stores users under 'uid:<id>' with no token.
+
+    The cache lives in the worker process. Entries are dropped through
+    signals (see `user.signals`) when a token is deleted or rotated and
+    whenever its user is saved or deleted, which covers deactivation.
+    Writes that skip signals, e.g. `QuerySet.update()`, or that happen in
+    another worker are only picked up once the entry's TTL runs out.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._keys_by_user = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return cached (user, token) for `key` or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, user, token = entry
+            if expires_at <= time.monotonic():
+                self._discard(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return user, token
+
+    def set(self, key, user, token):
+        """Cache `user` and `token` for `key`, evicting the oldest entries."""
+        expires_at = time.monotonic() + settings.AUTH_TOKEN_CACHE_TTL
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (expires_at, user, token)
+            self._keys_by_user.setdefault(user.pk, set()).add(key)
+
+            while len(self._entries) > settings.AUTH_TOKEN_CACHE_MAX_SIZE:
+                oldest_key = next(iter(self._entries))
+                self._discard(oldest_key)
+
+    def invalidate_user(self, user_id):
+        """Drop every cached token that belongs to `user_id`."""
+        with self._lock:
+            for key in list(self._keys_by_user.get(user_id, ())):
+                self._discard(key)
+
+    def clear(self):
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Return hit/miss counters and current size of the cache."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+            }
+
+    def _discard(self, key):
+        """Remove `key` from both indexes. Caller must hold the lock."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+
+        user_id = entry[1].pk
+        keys = self._keys_by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[user_id]
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication that skips the Token/User query on a cache hit."""
+
+    def authenticate_credentials(self, key):
+        """Return (user, token) for `key`, from the cache when possible."""
+        cached = token_cache.get(key)
+        if cached is None:
+            user, token = super().authenticate_credentials(key)
+            token_cache.set(key, user, token)
+            cached = (user, token)
+
+        # Hand out copies so one request can't leak changes into another.
+        user, token = copy.copy(cached[0]), copy.copy(cached[1])
+        token.user = user
+        return user, token
+
+
+class SignedTokenAuthentication(BaseAuthentication):
+    """Authenticate signed access tokens sent as 'Authorization: Bearer <token>'.
+
+    The signature and expiry are checked on CPU only. The user is read
+    through `token_cache`, so the database is only hit on a cache miss,
+    and a token is rejected once its user's `token_generation` moved on.
+    """
+
+    keyword = "Bearer"
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+
+        if len(auth) != 2:
+            msg = _("Invalid token header.")
+            raise exceptions.AuthenticationFailed(msg)
+
+        try:
+            payload = tokens.read_token(auth[1].decode(), tokens.ACCESS)
+        except (UnicodeError, tokens.InvalidToken):
+            raise exceptions.AuthenticationFailed(_("Invalid token."))
+
+        user = self.get_user(payload["uid"])
+        if user is None or not user.is_active:
+            raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+        if user.token_generation != payload["gen"]:
+            raise exceptions.AuthenticationFailed(_("Token has been revoked."))
+
+        return (user, payload)
+
+    def get_user(self, user_id):
+        """Return a copy of the user for `user_id`, from the cache if possible."""
+        key = f"uid:{user_id}"
+        cached = token_cache.get(key)
+        if cached is None:
+            user = get_user_model().objects.filter(pk=user_id).first()
+            if user is None:
+                return None
+            token_cache.set(key, user, None)
+            cached = (user, None)
+
+        return copy.copy(cached[0])
+
+    def authenticate_header(self, request):
+        return self.keyword
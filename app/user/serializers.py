@@ -6,6 +6,8 @@ from django.contrib.auth import authenticate, get_user_model
 from django.utils.translation import gettext as _
 from rest_framework import serializers
 
+from . import tokens
+
 
 class UserSerializer(serializers.ModelSerializer):
     """Serializer for the user object."""
@@ -62,3 +64,28 @@ class AuthTokenSerializer(serializers.Serializer):
 
         attrs["user"] = user
         return attrs
+
+
+class RefreshTokenSerializer(serializers.Serializer):
+    """Serializer for exchanging a refresh token for a new access token."""
+
+    refresh = serializers.CharField(trim_whitespace=False)
+
+    def validate(self, attrs):
+        """Verify the refresh token and resolve its user."""
+        msg = _("Invalid or expired refresh token.")
+        try:
+            payload = tokens.read_token(attrs["refresh"], tokens.REFRESH)
+        except tokens.InvalidToken:
+            raise serializers.ValidationError(msg, code="authorization")
+
+        user = get_user_model().objects.filter(pk=payload["uid"]).first()
+        if (
+            user is None
+            or not user.is_active
+            or user.token_generation != payload["gen"]
+        ):
+            raise serializers.ValidationError(msg, code="authorization")
+
+        attrs["user"] = user
+        return attrs
@@ -0,0 +1,24 @@
+"""
+Signal handlers for the user app.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import token_cache
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def invalidate_token_cache_for_token(sender, instance, **kwargs):
+    """Drop cached tokens of the owner when a token is rotated or deleted."""
+    token_cache.invalidate_user(instance.user_id)
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_token_cache_for_user(sender, instance, **kwargs):
+    """Drop cached tokens when a user is changed, deactivated or deleted."""
+    token_cache.invalidate_user(instance.pk)
@@ -0,0 +1,206 @@
+"""
+Tests for the cached token authentication.
+"""
+
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from .. import tokens
+from ..authentication import token_cache
+
+ME_URL = reverse("user:me")
+SIGNED_TOKEN_URL = reverse("user:token-signed")
+REFRESH_URL = reverse("user:token-refresh")
+LOGOUT_URL = reverse("user:logout")
+FLAVOUR_URL = reverse("flavour:flavour-list")
+
+
+def create_user(**params):
+    """Creates users directly into the database"""
+    return get_user_model().objects.create_user(**params)
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Test token lookups are cached and invalidated."""
+
+    def setUp(self):
+        """Create a user with a token and clear the cache."""
+        token_cache.clear()
+        self.user = create_user(email="test@example.com", password="testPass123")
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def test_second_request_skips_database(self):
+        """Test a cached token authenticates without any query."""
+        self.client.get(ME_URL)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["email"], self.user.email)
+        self.assertEqual(token_cache.stats()["hits"], 1)
+        self.assertEqual(token_cache.stats()["misses"], 1)
+
+    def test_deleted_token_is_rejected(self):
+        """Test deleting a token invalidates its cache entry."""
+        self.client.get(ME_URL)
+
+        self.token.delete()
+        response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_is_rejected(self):
+        """Test deactivating a user invalidates their cached tokens."""
+        self.client.get(ME_URL)
+
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(AUTH_TOKEN_CACHE_MAX_SIZE=1)
+    def test_cache_is_bounded(self):
+        """Test the least recently used token is evicted past the limit."""
+        other_user = create_user(email="other@example.com", password="testPass123")
+        other_token = Token.objects.create(user=other_user)
+
+        self.client.get(ME_URL)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {other_token.key}")
+        self.client.get(ME_URL)
+
+        self.assertEqual(token_cache.stats()["size"], 1)
+        self.assertIsNone(token_cache.get(self.token.key))
+
+    @override_settings(AUTH_TOKEN_CACHE_TTL=30)
+    def test_entry_expires_after_ttl(self):
+        """Test entries are not served once their TTL has passed."""
+        with patch("user.authentication.time.monotonic", return_value=100.0):
+            self.client.get(ME_URL)
+
+        with patch("user.authentication.time.monotonic", return_value=131.0):
+            self.assertIsNone(token_cache.get(self.token.key))
+
+
+class SignedTokenAuthenticationTests(TestCase):
+    """Test signed stateless access and refresh tokens."""
+
+    def setUp(self):
+        """Create a user and obtain a signed token pair."""
+        token_cache.clear()
+        self.user = create_user(email="test@example.com", password="testPass123")
+        self.client = APIClient()
+        response = self.client.post(
+            SIGNED_TOKEN_URL,
+            {"email": "test@example.com", "password": "testPass123"},
+        )
+        self.tokens = response.data
+
+    def authenticate(self, access):
+        """Send `access` as the bearer token on following requests."""
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+
+    def test_issue_token_pair(self):
+        """Test valid credentials return an access and a refresh token."""
+        self.assertIn("access", self.tokens)
+        self.assertIn("refresh", self.tokens)
+
+    def test_access_token_authenticates(self):
+        """Test a signed access token authenticates user and flavour views."""
+        self.authenticate(self.tokens["access"])
+
+        me = self.client.get(ME_URL)
+        flavours = self.client.get(FLAVOUR_URL)
+
+        self.assertEqual(me.status_code, status.HTTP_200_OK)
+        self.assertEqual(me.data["email"], self.user.email)
+        self.assertEqual(flavours.status_code, status.HTTP_200_OK)
+
+    def test_cached_user_needs_no_query(self):
+        """Test verifying a signed token with a warm cache is query free."""
+        self.authenticate(self.tokens["access"])
+        self.client.get(ME_URL)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_token_auth_still_accepted(self):
+        """Test DB-backed tokens keep working next to signed tokens."""
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+        response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_tampered_token_is_rejected(self):
+        """Test changing any character of the token breaks the signature."""
+        access = self.tokens["access"]
+        self.authenticate(access[:-1] + ("A" if access[-1] != "A" else "B"))
+
+        response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refresh_token_is_not_an_access_token(self):
+        """Test a refresh token can't be used to authenticate requests."""
+        self.authenticate(self.tokens["refresh"])
+
+        response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(SIGNED_TOKEN_ACCESS_LIFETIME=60)
+    def test_expired_access_token_is_rejected(self):
+        """Test an access token is rejected after its lifetime."""
+        with patch("user.tokens.time.time", return_value=1000.0):
+            access = tokens.issue_token(self.user, tokens.ACCESS)
+        self.authenticate(access)
+
+        response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refresh_issues_new_access_token(self):
+        """Test a refresh token is exchanged for a working access token."""
+        response = self.client.post(REFRESH_URL, {"refresh": self.tokens["refresh"]})
+        self.authenticate(response.data["access"])
+
+        me = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(me.status_code, status.HTTP_200_OK)
+
+    def test_logout_revokes_signed_tokens(self):
+        """Test logging out rejects earlier access and refresh tokens."""
+        self.authenticate(self.tokens["access"])
+
+        response = self.client.post(LOGOUT_URL)
+        me = self.client.get(ME_URL)
+        refresh = self.client.post(REFRESH_URL, {"refresh": self.tokens["refresh"]})
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(me.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(refresh.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_deactivated_user_is_rejected(self):
+        """Test signed tokens stop working once the user is deactivated."""
+        self.authenticate(self.tokens["access"])
+        self.client.get(ME_URL)
+
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,69 @@
+"""
+Signed stateless access and refresh tokens.
+
+A token is `django.core.signing` JSON signed with HMAC over SECRET_KEY and
+carries the user id, the user's `token_generation` at issue time, the
+token type and an expiry. Verifying one needs no storage; bumping
+`User.token_generation` revokes every token issued before the bump.
+"""
+
+import time
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import F
+
+ACCESS = "access"
+REFRESH = "refresh"
+
+SALT = "user.tokens"
+
+
+class InvalidToken(Exception):
+    """Raised when a signed token is malformed, tampered with or expired."""
+
+
+def issue_token(user, token_type):
+    """Return a signed token of `token_type` for `user`."""
+    if token_type == ACCESS:
+        lifetime = settings.SIGNED_TOKEN_ACCESS_LIFETIME
+    else:
+        lifetime = settings.SIGNED_TOKEN_REFRESH_LIFETIME
+
+    payload = {
+        "uid": user.pk,
+        "gen": user.token_generation,
+        "typ": token_type,
+        "exp": int(time.time()) + lifetime,
+    }
+    return signing.dumps(payload, salt=SALT)
+
+
+def issue_token_pair(user):
+    """Return a fresh access and refresh token for `user`."""
+    return {
+        ACCESS: issue_token(user, ACCESS),
+        REFRESH: issue_token(user, REFRESH),
+    }
+
+
+def read_token(value, token_type):
+    """Verify `value` and return its payload, raising InvalidToken if bad."""
+    try:
+        payload = signing.loads(value, salt=SALT)
+    except signing.BadSignature:
+        raise InvalidToken("Invalid signature.")
+
+    if not isinstance(payload, dict) or payload.get("typ") != token_type:
+        raise InvalidToken("Wrong token type.")
+    if payload["exp"] <= time.time():
+        raise InvalidToken("Token has expired.")
+
+    return payload
+
+
+def revoke_tokens(user):
+    """Invalidate every signed token issued to `user` so far."""
+    user.token_generation = F("token_generation") + 1
+    user.save(update_fields=["token_generation"])
+    user.refresh_from_db(fields=["token_generation"])
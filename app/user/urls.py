@@ -10,5 +10,16 @@ app_name = "user"
 urlpatterns = [
     path("create/", views.CreateUserView.as_view(), name="create"),
     path("token/", views.CreateTokenView.as_view(), name="token"),
+    path(
+        "token/signed/",
+        views.CreateSignedTokenView.as_view(),
+        name="token-signed",
+    ),
+    path(
+        "token/refresh/",
+        views.RefreshSignedTokenView.as_view(),
+        name="token-refresh",
+    ),
+    path("logout/", views.LogoutView.as_view(), name="logout"),
     path("me/", views.ManageUserView.as_view(), name="me"),
 ]
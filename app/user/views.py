@@ -2,32 +2,91 @@
 Views for the user API.
 """
 
-from rest_framework import authentication, generics, permissions
+from rest_framework import generics, permissions, status
+from rest_framework.authtoken.models import Token
 from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.response import Response
 from rest_framework.settings import api_settings
+from rest_framework.views import APIView
 
-from .serializers import AuthTokenSerializer, UserSerializer
+from core.profiling import ProfileMixin
 
+from . import tokens
+from .authentication import CachedTokenAuthentication, SignedTokenAuthentication
+from .serializers import AuthTokenSerializer, RefreshTokenSerializer, UserSerializer
 
-class CreateUserView(generics.CreateAPIView):
+
+class CreateUserView(ProfileMixin, generics.CreateAPIView):
     """Create a new user in the system."""
 
     serializer_class = UserSerializer
 
 
-class CreateTokenView(ObtainAuthToken):
+class CreateTokenView(ProfileMixin, ObtainAuthToken):
     """Create a new auth token for the user."""
 
     serializer_class = AuthTokenSerializer
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    parser_classes = api_settings.DEFAULT_PARSER_CLASSES
+
+
+class CreateSignedTokenView(ProfileMixin, ObtainAuthToken):
+    """Create signed access and refresh tokens for the user."""
+
+    serializer_class = AuthTokenSerializer
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    parser_classes = api_settings.DEFAULT_PARSER_CLASSES
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.serializer_class(
+            data=request.data, context={"request": request}
+        )
+        serializer.is_valid(raise_exception=True)
+        user = serializer.validated_data["user"]
+
+        return Response(tokens.issue_token_pair(user))
+
+
+class RefreshSignedTokenView(ProfileMixin, generics.GenericAPIView):
+    """Exchange a signed refresh token for a new access token."""
+
+    serializer_class = RefreshTokenSerializer
+    authentication_classes = []
+    permission_classes = []
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user = serializer.validated_data["user"]
+
+        return Response({tokens.ACCESS: tokens.issue_token(user, tokens.ACCESS)})
+
+
+class LogoutView(ProfileMixin, APIView):
+    """Revoke all signed tokens and the auth token of the user."""
+
+    authentication_classes = [
+        CachedTokenAuthentication,
+        SignedTokenAuthentication,
+    ]
+    permission_classes = [
+        permissions.IsAuthenticated,
+    ]
+
+    def post(self, request, *args, **kwargs):
+        tokens.revoke_tokens(request.user)
+        Token.objects.filter(user=request.user).delete()
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class ManageUserView(generics.RetrieveUpdateAPIView):
+class ManageUserView(ProfileMixin, generics.RetrieveUpdateAPIView):
     """Retrieve's and updates authenticated user data."""
 
     serializer_class = UserSerializer
     authentication_classes = [
-        authentication.TokenAuthentication,
+        CachedTokenAuthentication,
+        SignedTokenAuthentication,
     ]
     permission_classes = [
         permissions.IsAuthenticated,